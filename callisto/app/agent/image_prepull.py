@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from ...libs.domains.config import ImagePrePullConfig, PodConfig
+from ...libs.services.image_prepull import ImagePrePullService
+from ...libs.services.k8s.service import K8sService
+from ...libs.services.state import StateService
+from ...libs.services.task_runner import TaskRunnerService
+
+
+async def init_image_prepull_service(
+    k8s_service: K8sService,
+    task_runner_service: TaskRunnerService,
+    state_service: StateService,
+    pod_config: PodConfig,
+    prepull_config: ImagePrePullConfig,
+) -> ImagePrePullService:
+    image_prepull_service = ImagePrePullService(
+        k8s_service=k8s_service,
+        task_runner_service=task_runner_service,
+        pod_config=pod_config,
+        prepull_config=prepull_config,
+        status_document=state_service.status_document,
+        metrics_registry=state_service.metrics_registry,
+        instance_id=state_service.instance_id,
+    )
+    await image_prepull_service.run_background_tasks()
+    return image_prepull_service
@@ -1,20 +1,73 @@
 from __future__ import annotations
 
-from ...libs.domains.config import K8sConfig
+from prometheus_client import CollectorRegistry
+
+from ...libs.domains.config import (
+    ImageLocalityConfig,
+    K8sCircuitBreakerConfig,
+    K8sConfig,
+    K8sRateLimitConfig,
+    NodeAvoidanceConfig,
+    PodDeletionConfig,
+    PodReadinessConfig,
+)
+from ...libs.services.k8s.circuit_breaker import K8sCircuitBreaker
 from ...libs.services.k8s.client import K8sClient
+from ...libs.services.k8s.prober import K8sApiProber
+from ...libs.services.k8s.rate_limiter import K8sRateLimiter
+from ...libs.services.k8s.retry import K8sRetry
 from ...libs.services.k8s.service import K8sService
-from ...libs.services.pod_event import PodEventService
+from ...libs.services.state import StateService
 from ...libs.services.task_runner import TaskRunnerService
 
 
-async def init_k8s_service(k8s_config: K8sConfig, task_runner_service: TaskRunnerService) -> K8sService:
-    k8s_client = await K8sClient.init(in_cluster=k8s_config.in_cluster, task_runner_service=task_runner_service)
+async def init_k8s_service(
+    k8s_config: K8sConfig,
+    rate_limit_config: K8sRateLimitConfig,
+    circuit_breaker_config: K8sCircuitBreakerConfig,
+    deletion_config: PodDeletionConfig,
+    readiness_config: PodReadinessConfig,
+    node_avoidance_config: NodeAvoidanceConfig,
+    image_locality_config: ImageLocalityConfig,
+    task_runner_service: TaskRunnerService,
+    metrics_registry: CollectorRegistry,
+    instance_id: str,
+) -> K8sService:
+    k8s_client = await K8sClient.init(
+        in_cluster=k8s_config.in_cluster,
+        rate_limiter=K8sRateLimiter(
+            config=rate_limit_config, metrics_registry=metrics_registry, instance_id=instance_id
+        ),
+        retry=K8sRetry(metrics_registry=metrics_registry, instance_id=instance_id),
+        circuit_breaker=K8sCircuitBreaker(config=circuit_breaker_config),
+    )
 
     k8s_service = K8sService(
         k8s_client=k8s_client,
         namespace=k8s_config.namespace,
-        pod_event_service=PodEventService(),
         task_runner_service=task_runner_service,
+        instance_id=instance_id,
+        deletion_config=deletion_config,
+        readiness_config=readiness_config,
+        node_avoidance_config=node_avoidance_config,
+        image_locality_config=image_locality_config,
+        metrics_registry=metrics_registry,
+        pod_field_selector=k8s_config.pod_field_selector,
+        node_pool_label=k8s_config.node_pool_label,
     )
     await k8s_service.run_background_tasks()
     return k8s_service
+
+
+async def init_k8s_api_prober(
+    k8s_service: K8sService, task_runner_service: TaskRunnerService, state_service: StateService, interval: float
+) -> K8sApiProber:
+    k8s_api_prober = K8sApiProber(
+        k8s_service=k8s_service,
+        task_runner_service=task_runner_service,
+        interval=interval,
+        metrics_registry=state_service.metrics_registry,
+        instance_id=state_service.instance_id,
+    )
+    await k8s_api_prober.run_background_tasks()
+    return k8s_api_prober
@@ -12,8 +12,23 @@ from .runner import run_agent
 
 if t.TYPE_CHECKING:
     from ...libs.domains.config import (
+        ImageLocalityConfig,
+        ImagePrePullConfig,
+        K8sCircuitBreakerConfig,
         K8sConfig,
+        K8sRateLimitConfig,
+        MetricsConfig,
+        NodeAvoidanceConfig,
         PodConfig,
+        PodDeletionConfig,
+        PodGcConfig,
+        PodHedgeConfig,
+        PodPoolConfig,
+        PodReadinessConfig,
+        PodRecycleConfig,
+        ReplicaConfig,
+        SessionReaperConfig,
+        WebDriverConfig,
         WebOptions,
     )
 
@@ -22,7 +37,22 @@ def main(
     web_parameters: WebOptions,
     log_level_name: str,
     k8s_config: K8sConfig,
+    k8s_rate_limit_config: K8sRateLimitConfig,
+    k8s_circuit_breaker_config: K8sCircuitBreakerConfig,
+    pod_deletion_config: PodDeletionConfig,
+    pod_readiness_config: PodReadinessConfig,
+    node_avoidance_config: NodeAvoidanceConfig,
+    image_locality_config: ImageLocalityConfig,
+    image_prepull_config: ImagePrePullConfig,
     pod_config: PodConfig,
+    pod_pool_config: PodPoolConfig,
+    pod_hedge_config: PodHedgeConfig,
+    pod_recycle_config: PodRecycleConfig,
+    pod_gc_config: PodGcConfig,
+    session_reaper_config: SessionReaperConfig,
+    replica_config: ReplicaConfig,
+    metrics_config: MetricsConfig,
+    webdriver_config: WebDriverConfig,
     callisto_domain: str | None,
     instance_id: str,
     sentry_dsn: str,
@@ -39,7 +69,22 @@ def main(
             web_parameters=web_parameters,
             log_level=log_level,
             k8s_config=k8s_config,
+            k8s_rate_limit_config=k8s_rate_limit_config,
+            k8s_circuit_breaker_config=k8s_circuit_breaker_config,
+            pod_deletion_config=pod_deletion_config,
+            pod_readiness_config=pod_readiness_config,
+            node_avoidance_config=node_avoidance_config,
+            image_locality_config=image_locality_config,
+            image_prepull_config=image_prepull_config,
             pod_config=pod_config,
+            pod_pool_config=pod_pool_config,
+            pod_hedge_config=pod_hedge_config,
+            pod_recycle_config=pod_recycle_config,
+            pod_gc_config=pod_gc_config,
+            session_reaper_config=session_reaper_config,
+            replica_config=replica_config,
+            metrics_config=metrics_config,
+            webdriver_config=webdriver_config,
             callisto_domain=callisto_domain,
             instance_id=instance_id,
             sentry_dsn=sentry_dsn,
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from ...libs.domains.config import PodGcConfig
+from ...libs.services.k8s.service import K8sService
+from ...libs.services.pod_gc import PodGarbageCollector
+from ...libs.services.pod_pool import PodPoolService
+from ...libs.services.pod_recycle import PodRecycleService
+from ...libs.services.state import StateService
+from ...libs.services.task_runner import TaskRunnerService
+
+
+async def init_pod_garbage_collector(
+    k8s_service: K8sService,
+    state_service: StateService,
+    pod_pool_service: PodPoolService,
+    pod_recycle_service: PodRecycleService,
+    task_runner_service: TaskRunnerService,
+    gc_config: PodGcConfig,
+) -> PodGarbageCollector:
+    pod_garbage_collector = PodGarbageCollector(
+        k8s_service=k8s_service,
+        state_service=state_service,
+        pod_pool_service=pod_pool_service,
+        pod_recycle_service=pod_recycle_service,
+        task_runner_service=task_runner_service,
+        gc_config=gc_config,
+        metrics_registry=state_service.metrics_registry,
+        instance_id=state_service.instance_id,
+    )
+    await pod_garbage_collector.run_background_tasks()
+    return pod_garbage_collector
@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from ...libs.domains.config import PodHedgeConfig
+from ...libs.services.pod_hedge import PodHedgeService
+from ...libs.services.state import StateService
+
+
+def init_pod_hedge_service(hedge_config: PodHedgeConfig, state_service: StateService) -> PodHedgeService:
+    return PodHedgeService(
+        hedge_config=hedge_config,
+        metrics_registry=state_service.metrics_registry,
+        instance_id=state_service.instance_id,
+    )
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from ...libs.domains.config import PodConfig, PodPoolConfig
+from ...libs.services.image_prepull import ImagePrePullService
+from ...libs.services.k8s.service import K8sService
+from ...libs.services.pod_pool import PodPoolService
+from ...libs.services.state import StateService
+from ...libs.services.task_runner import TaskRunnerService
+
+
+async def init_pod_pool_service(
+    k8s_service: K8sService,
+    task_runner_service: TaskRunnerService,
+    state_service: StateService,
+    pod_config: PodConfig,
+    pool_config: PodPoolConfig,
+    image_prepull_service: ImagePrePullService,
+) -> PodPoolService:
+    pod_pool_service = PodPoolService(
+        k8s_service=k8s_service,
+        task_runner_service=task_runner_service,
+        pod_config=pod_config,
+        pool_config=pool_config,
+        image_prepull_service=image_prepull_service,
+        metrics_registry=state_service.metrics_registry,
+        instance_id=state_service.instance_id,
+    )
+    await pod_pool_service.run_background_tasks()
+    return pod_pool_service
@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from ...libs.domains.config import ReplicaConfig
+from ...libs.services.replica import ReplicaService
+from ...libs.services.state import StateService
+
+
+def init_replica_service(replica_config: ReplicaConfig, state_service: StateService) -> ReplicaService:
+    return ReplicaService(
+        config=replica_config,
+        metrics_registry=state_service.metrics_registry,
+        instance_id=state_service.instance_id,
+    )
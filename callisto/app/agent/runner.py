@@ -4,8 +4,23 @@ import typing as t
 
 from ...libs.domains import consts
 from ...libs.domains.config import (
+    ImageLocalityConfig,
+    ImagePrePullConfig,
+    K8sCircuitBreakerConfig,
     K8sConfig,
+    K8sRateLimitConfig,
+    MetricsConfig,
+    NodeAvoidanceConfig,
     PodConfig,
+    PodDeletionConfig,
+    PodGcConfig,
+    PodHedgeConfig,
+    PodPoolConfig,
+    PodReadinessConfig,
+    PodRecycleConfig,
+    ReplicaConfig,
+    SessionReaperConfig,
+    WebDriverConfig,
     WebOptions,
 )
 from ...libs.domains.logging import GraylogParameters
@@ -13,14 +28,22 @@ from ...libs.services.webdriver.protocol import WebDriverProtocol
 from ...libs.use_cases.health_check import HealthCheckUseCase
 from ...libs.use_cases.metrics import MetricsUseCase
 from ...libs.use_cases.session import SessionUseCase
+from ...libs.use_cases.session_query import SessionQueryUseCase
 from ...libs.use_cases.status import StatusUseCase
 from ...libs.use_cases.webdriver_logs import WebdriverLogsUseCase
 from .api import run_api
-from .k8s import init_k8s_service
+from .image_prepull import init_image_prepull_service
+from .k8s import init_k8s_api_prober, init_k8s_service
 from .logger import get_default_logging_config, init_logger
+from .pod_gc import init_pod_garbage_collector
+from .pod_hedge import init_pod_hedge_service
+from .pod_pool import init_pod_pool_service
+from .pod_recycle import init_pod_recycle_service
+from .replica import init_replica_service
 from .scheduler import init_scheduler
 from .sentry import init_sentry
-from .state import init_state_service
+from .session_reaper import init_session_reaper
+from .state import init_metrics_registry, init_state_service
 from .task_runner import init_task_runner_service
 from .webdriver import init_webdriver_service
 
@@ -29,7 +52,22 @@ async def run_agent(
     web_parameters: WebOptions,
     log_level: int,
     k8s_config: K8sConfig,
+    k8s_rate_limit_config: K8sRateLimitConfig,
+    k8s_circuit_breaker_config: K8sCircuitBreakerConfig,
+    pod_deletion_config: PodDeletionConfig,
+    pod_readiness_config: PodReadinessConfig,
+    node_avoidance_config: NodeAvoidanceConfig,
+    image_locality_config: ImageLocalityConfig,
+    image_prepull_config: ImagePrePullConfig,
     pod_config: PodConfig,
+    pod_pool_config: PodPoolConfig,
+    pod_hedge_config: PodHedgeConfig,
+    pod_recycle_config: PodRecycleConfig,
+    pod_gc_config: PodGcConfig,
+    session_reaper_config: SessionReaperConfig,
+    replica_config: ReplicaConfig,
+    metrics_config: MetricsConfig,
+    webdriver_config: WebDriverConfig,
     callisto_domain: str | None,
     instance_id: str,
     sentry_dsn: str,
@@ -42,26 +80,105 @@ async def run_agent(
 
     scheduler = init_scheduler()
     task_runner_service = await init_task_runner_service(scheduler)
-    k8s_service = await init_k8s_service(k8s_config=k8s_config, task_runner_service=task_runner_service)
-    state_service = init_state_service(k8s_service=k8s_service, instance_id=instance_id)
+    metrics_registry = init_metrics_registry()
+    k8s_service = await init_k8s_service(
+        k8s_config=k8s_config,
+        rate_limit_config=k8s_rate_limit_config,
+        circuit_breaker_config=k8s_circuit_breaker_config,
+        deletion_config=pod_deletion_config,
+        readiness_config=pod_readiness_config,
+        node_avoidance_config=node_avoidance_config,
+        image_locality_config=image_locality_config,
+        task_runner_service=task_runner_service,
+        metrics_registry=metrics_registry,
+        instance_id=instance_id,
+    )
+    state_service = init_state_service(
+        k8s_service=k8s_service, metrics_registry=metrics_registry, instance_id=instance_id
+    )
+    await init_k8s_api_prober(
+        k8s_service=k8s_service,
+        task_runner_service=task_runner_service,
+        state_service=state_service,
+        interval=metrics_config.k8s_probe_interval,
+    )
+
+    webdriver_service = init_webdriver_service(
+        task_runner_service, pod_config=pod_config, webdriver_config=webdriver_config, state_service=state_service
+    )
+    image_prepull_service = await init_image_prepull_service(
+        k8s_service=k8s_service,
+        task_runner_service=task_runner_service,
+        state_service=state_service,
+        pod_config=pod_config,
+        prepull_config=image_prepull_config,
+    )
+    pod_pool_service = await init_pod_pool_service(
+        k8s_service=k8s_service,
+        task_runner_service=task_runner_service,
+        state_service=state_service,
+        pod_config=pod_config,
+        pool_config=pod_pool_config,
+        image_prepull_service=image_prepull_service,
+    )
+    pod_hedge_service = init_pod_hedge_service(hedge_config=pod_hedge_config, state_service=state_service)
+    pod_recycle_service = await init_pod_recycle_service(
+        k8s_service=k8s_service,
+        task_runner_service=task_runner_service,
+        state_service=state_service,
+        pod_config=pod_config,
+        recycle_config=pod_recycle_config,
+        image_prepull_service=image_prepull_service,
+    )
+    await init_pod_garbage_collector(
+        k8s_service=k8s_service,
+        state_service=state_service,
+        pod_pool_service=pod_pool_service,
+        pod_recycle_service=pod_recycle_service,
+        task_runner_service=task_runner_service,
+        gc_config=pod_gc_config,
+    )
 
-    webdriver_service = init_webdriver_service(task_runner_service, pod_config=pod_config)
+    replica_service = init_replica_service(replica_config=replica_config, state_service=state_service)
+
+    session_use_case = SessionUseCase(
+        k8s_service=k8s_service,
+        webdriver_service=webdriver_service,
+        pod_config=pod_config,
+        state_service=state_service,
+        task_runner_service=task_runner_service,
+        webdriver_protocol=WebDriverProtocol(callisto_domain=callisto_domain),
+        pod_pool_service=pod_pool_service,
+        pod_hedge_service=pod_hedge_service,
+        pod_recycle_service=pod_recycle_service,
+        replica_service=replica_service,
+        image_prepull_service=image_prepull_service,
+    )
+    await init_session_reaper(
+        session_use_case=session_use_case,
+        k8s_service=k8s_service,
+        webdriver_service=webdriver_service,
+        state_service=state_service,
+        task_runner_service=task_runner_service,
+        reaper_config=session_reaper_config,
+    )
+
+    # before the API accepts requests for the restored sessions
+    await state_service.restore_sessions()
 
     web_runner = await run_api(
         host=web_parameters.host,
         port=web_parameters.port,
         app_state={
-            consts.HEALTH_CHECK_USE_CASE_KEY: HealthCheckUseCase(),
-            consts.METRICS_USE_CASE_KEY: MetricsUseCase(state_service=state_service),
-            consts.SESSION_USE_CASE_KEY: SessionUseCase(
-                k8s_service=k8s_service,
-                webdriver_service=webdriver_service,
-                pod_config=pod_config,
-                state_service=state_service,
-                task_runner_service=task_runner_service,
-                webdriver_protocol=WebDriverProtocol(callisto_domain=callisto_domain),
+            consts.HEALTH_CHECK_USE_CASE_KEY: HealthCheckUseCase(k8s_service=k8s_service),
+            consts.METRICS_USE_CASE_KEY: MetricsUseCase(
+                state_service=state_service, cache_ttl=metrics_config.cache_ttl
+            ),
+            consts.SESSION_USE_CASE_KEY: session_use_case,
+            consts.SESSION_QUERY_USE_CASE_KEY: SessionQueryUseCase(
+                state_service=state_service, k8s_service=k8s_service
             ),
-            consts.STATUS_USE_CASE_KEY: StatusUseCase(state_service=state_service),
+            consts.STATUS_USE_CASE_KEY: StatusUseCase(state_service=state_service, replica_service=replica_service),
             consts.WEBDRIVER_LOGS_USE_CASE_KEY: WebdriverLogsUseCase(k8s_service),
         },
     )
@@ -70,6 +187,8 @@ async def run_agent(
         (
             scheduler.close,
             web_runner.cleanup,
+            webdriver_service.client.close,
+            replica_service.close,
         )
     )
 
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from ...libs.domains.config import SessionReaperConfig
+from ...libs.services.k8s.service import K8sService
+from ...libs.services.state import StateService
+from ...libs.services.task_runner import TaskRunnerService
+from ...libs.services.webdriver.service import WebDriverService
+from ...libs.use_cases.session import SessionUseCase
+from ...libs.use_cases.session_reaper import SessionReaperUseCase
+
+
+async def init_session_reaper(
+    session_use_case: SessionUseCase,
+    k8s_service: K8sService,
+    webdriver_service: WebDriverService,
+    state_service: StateService,
+    task_runner_service: TaskRunnerService,
+    reaper_config: SessionReaperConfig,
+) -> SessionReaperUseCase:
+    session_reaper = SessionReaperUseCase(
+        session_use_case=session_use_case,
+        k8s_service=k8s_service,
+        webdriver_service=webdriver_service,
+        state_service=state_service,
+        task_runner_service=task_runner_service,
+        reaper_config=reaper_config,
+        metrics_registry=state_service.metrics_registry,
+        instance_id=state_service.instance_id,
+    )
+    await session_reaper.run_background_tasks()
+    return session_reaper
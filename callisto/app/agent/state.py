@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+from prometheus_client import CollectorRegistry
+
 from ...libs.services.k8s.service import K8sService
 from ...libs.services.state import StateService
 
 
-def init_state_service(k8s_service: K8sService, instance_id: str) -> StateService:
-    return StateService(k8s_service=k8s_service, instance_id=instance_id)
+def init_metrics_registry() -> CollectorRegistry:
+    return CollectorRegistry(auto_describe=True)
+
+
+def init_state_service(k8s_service: K8sService, metrics_registry: CollectorRegistry, instance_id: str) -> StateService:
+    return StateService(k8s_service=k8s_service, metrics_registry=metrics_registry, instance_id=instance_id)
@@ -1,15 +1,26 @@
 from __future__ import annotations
 
-from ...libs.domains.config import PodConfig
+from ...libs.domains.config import PodConfig, WebDriverConfig
+from ...libs.services.state import StateService
 from ...libs.services.task_runner import TaskRunnerService
 from ...libs.services.webdriver.client import WebDriverClient
 from ...libs.services.webdriver.service import WebDriverService
 
 
-def init_webdriver_service(task_runner_service: TaskRunnerService, pod_config: PodConfig) -> WebDriverService:
+def init_webdriver_service(
+    task_runner_service: TaskRunnerService,
+    pod_config: PodConfig,
+    webdriver_config: WebDriverConfig,
+    state_service: StateService,
+) -> WebDriverService:
     return WebDriverService(
-        client=WebDriverClient(),
+        client=WebDriverClient(
+            config=webdriver_config,
+            metrics_registry=state_service.metrics_registry,
+            instance_id=state_service.instance_id,
+        ),
         task_runner_service=task_runner_service,
         webdriver_path=pod_config.webdriver_path,
         webdriver_port=pod_config.webdriver_port,
+        ready_timeout=webdriver_config.ready_timeout,
     )
@@ -6,8 +6,24 @@ import click
 import yaml
 
 from ..libs.domains.config import (
+    ImageLocalityConfig,
+    ImagePrePullConfig,
+    K8sCircuitBreakerConfig,
     K8sConfig,
+    K8sRateLimitConfig,
+    MetricsConfig,
+    NodeAvoidanceConfig,
     PodConfig,
+    PodDeletionConfig,
+    PodGcConfig,
+    PodHedgeConfig,
+    PodPoolConfig,
+    PodReadinessConfig,
+    PodRecycleConfig,
+    RateLimit,
+    ReplicaConfig,
+    SessionReaperConfig,
+    WebDriverConfig,
     WebOptions,
 )
 from ..libs.domains.logging import GraylogParameters
@@ -18,6 +34,21 @@ def read_pod_manifest(ctx: click.Context, param: click.Option | click.Parameter,
     return yaml.safe_load(value)
 
 
+def read_rate_limits(ctx: click.Context, param: click.Option | click.Parameter, value: str) -> dict[str, RateLimit]:
+    """`verb=qps/burst,...`, e.g. `create=20/40,delete=10/20`"""
+    rate_limits = {}
+
+    for item in filter(None, value.split(",")):
+        try:
+            verb, limit = item.split("=")
+            qps, burst = limit.split("/")
+            rate_limits[verb.strip()] = RateLimit(qps=float(qps), burst=int(burst))
+        except ValueError:
+            raise click.BadParameter(f"Rate limit `{item}` should look like `verb=qps/burst`")
+
+    return rate_limits
+
+
 @click.command()
 @click.option(
     "--web-api-host",
@@ -64,6 +95,92 @@ def read_pod_manifest(ctx: click.Context, param: click.Option | click.Parameter,
     show_default=True,
     show_envvar=True,
 )
+@click.option(
+    "--k8s-pod-field-selector",
+    envvar="K8S_POD_FIELD_SELECTOR",
+    default=None,
+    help="Field selector added to pod list/watch requests, e.g. `status.phase!=Succeeded`",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--k8s-node-pool-label",
+    envvar="K8S_NODE_POOL_LABEL",
+    default="cloud.google.com/gke-nodepool",
+    help="Node label naming the node pool, pod startup metrics are labelled with it. Disabled if empty",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--k8s-qps",
+    envvar="K8S_QPS",
+    default=50.0,
+    help="Client-side limit of kube-api requests per second. 0 disables the limit",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--k8s-burst",
+    envvar="K8S_BURST",
+    default=100,
+    help="Client-side burst of kube-api requests",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--k8s-verb-rate-limits",
+    envvar="K8S_VERB_RATE_LIMITS",
+    callback=read_rate_limits,
+    default="create=25/50,get=50/100,list=5/10,watch=5/10,delete=20/40",
+    help="Client-side kube-api limits per verb as `verb=qps/burst,...`",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--k8s-circuit-failure-ratio",
+    envvar="K8S_CIRCUIT_FAILURE_RATIO",
+    type=float,
+    default=0.5,
+    help="Share of failed or slow kube-api calls which opens the circuit, 0 disables the circuit breaker",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--k8s-circuit-min-calls",
+    envvar="K8S_CIRCUIT_MIN_CALLS",
+    type=int,
+    default=20,
+    help="Minimal number of kube-api calls in the window to open the circuit",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--k8s-circuit-window",
+    envvar="K8S_CIRCUIT_WINDOW",
+    type=float,
+    default=30.0,
+    help="Window of recent kube-api calls in seconds",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--k8s-circuit-slow-call-duration",
+    envvar="K8S_CIRCUIT_SLOW_CALL_DURATION",
+    type=float,
+    default=10.0,
+    help="Kube-api calls longer than this number of seconds count as failed",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--k8s-circuit-open-duration",
+    envvar="K8S_CIRCUIT_OPEN_DURATION",
+    type=float,
+    default=15.0,
+    help="Seconds the circuit stays open before a probe call",
+    show_default=True,
+    show_envvar=True,
+)
 @click.option(
     "--pod-webdriver-path",
     envvar="POD_WEBDRIVER_PATH",
@@ -80,6 +197,54 @@ def read_pod_manifest(ctx: click.Context, param: click.Option | click.Parameter,
     show_default=True,
     show_envvar=True,
 )
+@click.option(
+    "--webdriver-connections-limit",
+    envvar="WEBDRIVER_CONNECTIONS_LIMIT",
+    default=100,
+    help="Total limit of simultaneous connections to browser pods webdrivers",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--webdriver-connections-limit-per-host",
+    envvar="WEBDRIVER_CONNECTIONS_LIMIT_PER_HOST",
+    default=4,
+    help="Limit of simultaneous connections to a single browser pod webdriver",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--webdriver-keepalive-timeout",
+    envvar="WEBDRIVER_KEEPALIVE_TIMEOUT",
+    default=30.0,
+    help="Seconds to keep idle webdriver connections open",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--webdriver-connect-timeout",
+    envvar="WEBDRIVER_CONNECT_TIMEOUT",
+    default=5.0,
+    help="Webdriver connection timeout in seconds",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--webdriver-read-timeout",
+    envvar="WEBDRIVER_READ_TIMEOUT",
+    default=120.0,
+    help="Webdriver response read timeout in seconds",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--webdriver-ready-timeout",
+    envvar="WEBDRIVER_READY_TIMEOUT",
+    default=15.0,
+    help="Seconds to wait for the pod webdriver `/status` to report ready before the pod is thrown away",
+    show_default=True,
+    show_envvar=True,
+)
 @click.option(
     "--pod-manifest",
     envvar="POD_MANIFEST",
@@ -90,6 +255,421 @@ def read_pod_manifest(ctx: click.Context, param: click.Option | click.Parameter,
     show_default=True,
     show_envvar=True,
 )
+@click.option(
+    "--pod-delete-batch-size",
+    envvar="POD_DELETE_BATCH_SIZE",
+    default=50,
+    help="Maximum number of pods deleted by one K8s API request",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--pod-delete-flush-interval",
+    envvar="POD_DELETE_FLUSH_INTERVAL",
+    default=0.1,
+    help="Seconds to coalesce pod deletions before they are sent to K8s API",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--pod-delete-concurrency",
+    envvar="POD_DELETE_CONCURRENCY",
+    default=4,
+    help="Maximum number of pod deletion requests sent at the same time",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--pod-delete-grace-period",
+    envvar="POD_DELETE_GRACE_PERIOD",
+    type=int,
+    default=None,
+    help="Pod termination grace period in seconds. The pod manifest value is used if left empty",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--pod-ready-timeout",
+    envvar="POD_READY_TIMEOUT",
+    type=float,
+    default=300.0,
+    help="Seconds a pod may take to become Ready",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--pod-fail-fast-reasons",
+    envvar="POD_FAIL_FAST_REASONS",
+    default="ImagePullBackOff,ErrImageNeverPull,InvalidImageName,CreateContainerConfigError,CrashLoopBackOff,Unschedulable",
+    help="Comma-separated waiting container reasons and pod conditions which fail a pod before it is Ready",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--pod-unschedulable-min-age",
+    envvar="POD_UNSCHEDULABLE_MIN_AGE",
+    default=120.0,
+    help="Seconds a pod must be pending before the Unschedulable condition fails it",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--node-avoidance-enabled",
+    envvar="NODE_AVOIDANCE_ENABLED",
+    is_flag=True,
+    default=False,
+    help="Prefer other nodes than the ones which are much slower than the others to start browser pods or fail them",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--node-stats-half-life",
+    envvar="NODE_STATS_HALF_LIFE",
+    type=float,
+    default=1800.0,
+    help="Seconds after which the weight of a pod startup observation of a node halves",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--node-avoidance-min-samples",
+    envvar="NODE_AVOIDANCE_MIN_SAMPLES",
+    type=float,
+    default=5.0,
+    help="Minimal decayed number of pod startups on a node to avoid it",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--node-avoidance-latency-factor",
+    envvar="NODE_AVOIDANCE_LATENCY_FACTOR",
+    type=float,
+    default=2.0,
+    help="A node is avoided if its mean pod startup latency exceeds the median of the nodes by this factor",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--node-avoidance-max-failure-ratio",
+    envvar="NODE_AVOIDANCE_MAX_FAILURE_RATIO",
+    type=float,
+    default=0.5,
+    help="A node is avoided if this share of its pods fails to become Ready",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--node-avoidance-max-nodes",
+    envvar="NODE_AVOIDANCE_MAX_NODES",
+    type=int,
+    default=3,
+    help="Maximum number of avoided nodes",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--image-locality-enabled",
+    envvar="IMAGE_LOCALITY_ENABLED",
+    is_flag=True,
+    default=False,
+    help="Prefer nodes which already hold the images of the pod manifest, nodes are watched for their images",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--image-locality-weight",
+    envvar="IMAGE_LOCALITY_WEIGHT",
+    type=click.IntRange(1, 100),
+    default=50,
+    help="Weight of the preferred node affinity towards nodes holding the images",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--image-locality-max-nodes",
+    envvar="IMAGE_LOCALITY_MAX_NODES",
+    type=int,
+    default=100,
+    help="Maximum number of nodes listed in the node affinity",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--image-prepull-enabled",
+    envvar="IMAGE_PREPULL_ENABLED",
+    is_flag=True,
+    default=False,
+    help="Pull the images of the pod manifest on every node with a daemon set before sessions use them",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--image-prepull-daemon-set",
+    envvar="IMAGE_PREPULL_DAEMON_SET",
+    default="callisto-image-prepull",
+    help="Name of the pre-pull daemon set",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--image-prepull-min-node-ratio",
+    envvar="IMAGE_PREPULL_MIN_NODE_RATIO",
+    type=click.FloatRange(0, 1),
+    default=0.8,
+    help="Share of nodes which must hold the images of a new pod manifest before sessions switch to it",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--image-prepull-interval",
+    envvar="IMAGE_PREPULL_INTERVAL",
+    type=float,
+    default=15.0,
+    help="Seconds between checks of the pre-pull progress",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--image-prepull-pause-image",
+    envvar="IMAGE_PREPULL_PAUSE_IMAGE",
+    default="registry.k8s.io/pause:3.9",
+    help="Image of the container which keeps pre-pull pods running",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--image-prepull-helper-image",
+    envvar="IMAGE_PREPULL_HELPER_IMAGE",
+    default="busybox:1.36",
+    help="Image with a static busybox at /bin/busybox, it runs in the pulled images instead of their own commands",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--pod-pool-size",
+    envvar="POD_POOL_SIZE",
+    default=0,
+    help="Number of idle Ready browser pods to keep in the warm pool. The pool is disabled if 0",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--pod-pool-max-size",
+    envvar="POD_POOL_MAX_SIZE",
+    default=0,
+    help="Maximum number of pods the warm pool may grow to under load. Equals to pod pool size if less",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--pod-pool-refill-concurrency",
+    envvar="POD_POOL_REFILL_CONCURRENCY",
+    default=4,
+    help="Maximum number of pool pods created at the same time",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--pod-hedge-enabled",
+    envvar="POD_HEDGE_ENABLED",
+    is_flag=True,
+    default=False,
+    help="Launch a second pod if the first one is not Ready in time. The first Ready pod serves the session",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--pod-hedge-percentile",
+    envvar="POD_HEDGE_PERCENTILE",
+    default=95.0,
+    help="Percentile of recent pod readiness durations after which a hedge pod is launched",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--pod-hedge-min-delay",
+    envvar="POD_HEDGE_MIN_DELAY",
+    default=10.0,
+    help="Minimal seconds to wait for the first pod before a hedge pod is launched",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--pod-hedge-max-ratio",
+    envvar="POD_HEDGE_MAX_RATIO",
+    default=0.1,
+    help="Maximum share of the pods waiting for readiness which have a hedge pod at the same time",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--pod-recycle-enabled",
+    envvar="POD_RECYCLE_ENABLED",
+    is_flag=True,
+    default=False,
+    help="Reset and reuse browser pods for the next sessions instead of deleting them",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--pod-recycle-max-reuses",
+    envvar="POD_RECYCLE_MAX_REUSES",
+    default=10,
+    help="Maximum number of sessions served by a recycled pod",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--pod-recycle-max-age",
+    envvar="POD_RECYCLE_MAX_AGE",
+    default=1800.0,
+    help="Maximum age of a recycled pod in seconds",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--pod-gc-enabled",
+    envvar="POD_GC_ENABLED",
+    is_flag=True,
+    default=False,
+    help="Periodically delete orphaned, stuck Pending and too old browser pods of this instance",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--pod-gc-dry-run",
+    envvar="POD_GC_DRY_RUN",
+    is_flag=True,
+    default=False,
+    help="Only log and count the pods the garbage collector would delete",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--pod-gc-interval",
+    envvar="POD_GC_INTERVAL",
+    type=float,
+    default=60.0,
+    help="Seconds between garbage collector runs",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--pod-gc-grace-period",
+    envvar="POD_GC_GRACE_PERIOD",
+    type=float,
+    default=600.0,
+    help="Pods younger than this number of seconds are never collected",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--pod-gc-pending-timeout",
+    envvar="POD_GC_PENDING_TIMEOUT",
+    type=float,
+    default=900.0,
+    help="Seconds after which a Pending pod nobody waits for is collected",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--pod-gc-max-session-age",
+    envvar="POD_GC_MAX_SESSION_AGE",
+    type=float,
+    default=0.0,
+    help="Seconds after which a session pod is collected, 0 means no limit",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--pod-gc-max-deletions",
+    envvar="POD_GC_MAX_DELETIONS",
+    type=int,
+    default=20,
+    help="Maximum number of pods deleted by a garbage collector run",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--session-reaper-enabled",
+    envvar="SESSION_REAPER_ENABLED",
+    is_flag=True,
+    default=False,
+    help="Delete sessions whose url and title have not changed for the idle timeout",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--session-idle-timeout",
+    envvar="SESSION_IDLE_TIMEOUT",
+    type=float,
+    default=1800.0,
+    help="Seconds without observed activity after which a session is deleted by the reaper",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--session-reaper-interval",
+    envvar="SESSION_REAPER_INTERVAL",
+    type=float,
+    default=60.0,
+    help="Seconds between probes of active sessions",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--session-reaper-concurrency",
+    envvar="SESSION_REAPER_CONCURRENCY",
+    type=int,
+    default=10,
+    help="Maximum number of webdriver probes at the same time",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--replica-peers",
+    envvar="REPLICA_PEERS",
+    default="",
+    help="Comma-separated instance ids of all callisto replicas. `/status` of every replica shows their sessions",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--replica-peer-url-template",
+    envvar="REPLICA_PEER_URL_TEMPLATE",
+    default="",
+    help="URL of a replica by its `{instance_id}`, e.g. `http://{instance_id}.callisto:8080`. "
+    "Session deletions are forwarded to the replica owning the pod. Disabled if empty",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--replica-timeout",
+    envvar="REPLICA_TIMEOUT",
+    type=float,
+    default=5.0,
+    help="Timeout of requests to other replicas in seconds",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--metrics-cache-ttl",
+    envvar="METRICS_CACHE_TTL",
+    type=float,
+    default=5.0,
+    help="Seconds for which `/metrics` output is reused by the next scrapes",
+    show_default=True,
+    show_envvar=True,
+)
+@click.option(
+    "--k8s-probe-interval",
+    envvar="K8S_PROBE_INTERVAL",
+    type=float,
+    default=10.0,
+    help="Seconds between background kube-api availability probes. Disabled if 0",
+    show_default=True,
+    show_envvar=True,
+)
 @click.option(
     "--callisto-domain",
     envvar="CALLISTO_DOMAIN",
@@ -117,7 +697,60 @@ def read_pod_manifest(ctx: click.Context, param: click.Option | click.Parameter,
 def run_with_options(**options: t.Any) -> None:
     web_parameters = WebOptions(options["web_api_host"], options["web_api_port"])
     log_level = options["log_level"]
-    k8s_config = K8sConfig(in_cluster=options["k8s_in_cluster"], namespace=options["k8s_namespace"])
+    k8s_config = K8sConfig(
+        in_cluster=options["k8s_in_cluster"],
+        namespace=options["k8s_namespace"],
+        pod_field_selector=options["k8s_pod_field_selector"],
+        node_pool_label=options["k8s_node_pool_label"] or None,
+    )
+
+    k8s_rate_limit_config = K8sRateLimitConfig(
+        total=RateLimit(qps=options["k8s_qps"], burst=options["k8s_burst"]),
+        verbs=options["k8s_verb_rate_limits"],
+    )
+
+    k8s_circuit_breaker_config = K8sCircuitBreakerConfig(
+        failure_ratio=options["k8s_circuit_failure_ratio"],
+        min_calls=options["k8s_circuit_min_calls"],
+        window=options["k8s_circuit_window"],
+        slow_call_duration=options["k8s_circuit_slow_call_duration"],
+        open_duration=options["k8s_circuit_open_duration"],
+    )
+
+    pod_deletion_config = PodDeletionConfig(
+        batch_size=options["pod_delete_batch_size"],
+        flush_interval=options["pod_delete_flush_interval"],
+        concurrency=options["pod_delete_concurrency"],
+        grace_period=options["pod_delete_grace_period"],
+    )
+
+    pod_readiness_config = PodReadinessConfig(
+        timeout=options["pod_ready_timeout"],
+        fail_fast_reasons=frozenset(filter(None, map(str.strip, options["pod_fail_fast_reasons"].split(",")))),
+        unschedulable_min_age=options["pod_unschedulable_min_age"],
+    )
+
+    node_avoidance_config = NodeAvoidanceConfig(
+        enabled=options["node_avoidance_enabled"],
+        half_life=options["node_stats_half_life"],
+        min_samples=options["node_avoidance_min_samples"],
+        latency_factor=options["node_avoidance_latency_factor"],
+        max_failure_ratio=options["node_avoidance_max_failure_ratio"],
+        max_nodes=options["node_avoidance_max_nodes"],
+    )
+    image_locality_config = ImageLocalityConfig(
+        enabled=options["image_locality_enabled"],
+        weight=options["image_locality_weight"],
+        max_nodes=options["image_locality_max_nodes"],
+    )
+    image_prepull_config = ImagePrePullConfig(
+        enabled=options["image_prepull_enabled"],
+        daemon_set_name=options["image_prepull_daemon_set"],
+        min_node_ratio=options["image_prepull_min_node_ratio"],
+        interval=options["image_prepull_interval"],
+        pause_image=options["image_prepull_pause_image"],
+        helper_image=options["image_prepull_helper_image"],
+    )
 
     pod_config = PodConfig(
         webdriver_path=options["pod_webdriver_path"],
@@ -125,6 +758,62 @@ def run_with_options(**options: t.Any) -> None:
         manifest=options["pod_manifest"],
     )
 
+    webdriver_config = WebDriverConfig(
+        connections_limit=options["webdriver_connections_limit"],
+        connections_limit_per_host=options["webdriver_connections_limit_per_host"],
+        keepalive_timeout=options["webdriver_keepalive_timeout"],
+        connect_timeout=options["webdriver_connect_timeout"],
+        read_timeout=options["webdriver_read_timeout"],
+        ready_timeout=options["webdriver_ready_timeout"],
+    )
+
+    pod_pool_config = PodPoolConfig(
+        target_size=options["pod_pool_size"],
+        max_size=max(options["pod_pool_max_size"], options["pod_pool_size"]),
+        refill_concurrency=options["pod_pool_refill_concurrency"],
+    )
+
+    pod_hedge_config = PodHedgeConfig(
+        enabled=options["pod_hedge_enabled"],
+        percentile=options["pod_hedge_percentile"],
+        min_delay=options["pod_hedge_min_delay"],
+        max_ratio=options["pod_hedge_max_ratio"],
+    )
+
+    pod_recycle_config = PodRecycleConfig(
+        enabled=options["pod_recycle_enabled"],
+        max_reuses=options["pod_recycle_max_reuses"],
+        max_age=options["pod_recycle_max_age"],
+    )
+
+    pod_gc_config = PodGcConfig(
+        enabled=options["pod_gc_enabled"],
+        dry_run=options["pod_gc_dry_run"],
+        interval=options["pod_gc_interval"],
+        grace_period=options["pod_gc_grace_period"],
+        pending_timeout=options["pod_gc_pending_timeout"],
+        max_session_age=options["pod_gc_max_session_age"],
+        max_deletions=options["pod_gc_max_deletions"],
+    )
+
+    session_reaper_config = SessionReaperConfig(
+        enabled=options["session_reaper_enabled"],
+        idle_timeout=options["session_idle_timeout"],
+        interval=options["session_reaper_interval"],
+        concurrency=options["session_reaper_concurrency"],
+    )
+
+    replica_config = ReplicaConfig(
+        peers=tuple(filter(None, map(str.strip, options["replica_peers"].split(",")))),
+        peer_url_template=options["replica_peer_url_template"],
+        timeout=options["replica_timeout"],
+    )
+
+    metrics_config = MetricsConfig(
+        cache_ttl=options["metrics_cache_ttl"],
+        k8s_probe_interval=options["k8s_probe_interval"],
+    )
+
     graylog_config: GraylogParameters | None = None
     if options["graylog_host"]:
         graylog_config = GraylogParameters(host=options["graylog_host"], port=options["graylog_port"])
@@ -133,7 +822,22 @@ def run_with_options(**options: t.Any) -> None:
         web_parameters=web_parameters,
         log_level_name=log_level,
         k8s_config=k8s_config,
+        k8s_rate_limit_config=k8s_rate_limit_config,
+        k8s_circuit_breaker_config=k8s_circuit_breaker_config,
+        pod_deletion_config=pod_deletion_config,
+        pod_readiness_config=pod_readiness_config,
+        node_avoidance_config=node_avoidance_config,
+        image_locality_config=image_locality_config,
+        image_prepull_config=image_prepull_config,
         pod_config=pod_config,
+        pod_pool_config=pod_pool_config,
+        pod_hedge_config=pod_hedge_config,
+        pod_recycle_config=pod_recycle_config,
+        pod_gc_config=pod_gc_config,
+        session_reaper_config=session_reaper_config,
+        replica_config=replica_config,
+        metrics_config=metrics_config,
+        webdriver_config=webdriver_config,
         callisto_domain=options["callisto_domain"],
         instance_id=options["instance_id"],
         sentry_dsn=options["sentry_dsn"],
@@ -14,6 +14,96 @@ class WebOptions:
 class K8sConfig:
     in_cluster: bool
     namespace: str
+    # additional field selector for pod list/watch calls, e.g. `spec.nodeName!=`
+    pod_field_selector: str | None
+    # label of nodes naming their node pool, e.g. `cloud.google.com/gke-nodepool`
+    node_pool_label: str | None
+
+
+@dc.dataclass(frozen=True)
+class RateLimit:
+    # non-positive qps disables the limit
+    qps: float
+    burst: int
+
+
+@dc.dataclass(frozen=True)
+class K8sRateLimitConfig:
+    # shared by all kube-api calls
+    total: RateLimit
+    # per verb: create, get, list, watch, delete
+    verbs: dict[str, RateLimit]
+
+
+@dc.dataclass(frozen=True)
+class K8sCircuitBreakerConfig:
+    # the circuit opens when the share of failed or slow calls within `window` seconds reaches `failure_ratio`
+    # and there were at least `min_calls` calls, a non-positive `failure_ratio` disables the circuit breaker
+    failure_ratio: float
+    min_calls: int
+    window: float
+    slow_call_duration: float
+    # seconds before a probe call is let through
+    open_duration: float
+
+
+@dc.dataclass(frozen=True)
+class PodDeletionConfig:
+    # deletions are coalesced for `flush_interval` seconds and sent in batches of up to `batch_size` pods
+    batch_size: int
+    flush_interval: float
+    concurrency: int
+    # `None` keeps the grace period of the pod manifest
+    grace_period: int | None
+
+
+@dc.dataclass(frozen=True)
+class PodReadinessConfig:
+    # seconds a pod may take to become Ready
+    timeout: float
+    # waiting container reasons and pod conditions which fail readiness immediately, e.g. `ImagePullBackOff`
+    fail_fast_reasons: frozenset[str]
+    # seconds a pod must be pending before `Unschedulable` fails it, the cluster autoscaler may be adding a node
+    unschedulable_min_age: float
+
+
+@dc.dataclass(frozen=True)
+class NodeAvoidanceConfig:
+    enabled: bool
+    # weight of every observation halves after this number of seconds, so avoided nodes are trusted again
+    half_life: float
+    # nodes with fewer (decayed) observations are never avoided
+    min_samples: float
+    # a node is avoided if its mean pod startup latency exceeds the median of the nodes by this factor
+    latency_factor: float
+    # or if this share of its pods fails to become Ready
+    max_failure_ratio: float
+    # at most this number of the worst nodes is avoided
+    max_nodes: int
+
+
+@dc.dataclass(frozen=True)
+class ImageLocalityConfig:
+    enabled: bool
+    # weight of the preference for nodes holding the images of the pod manifest, 1-100
+    weight: int
+    # at most this number of nodes is listed in the node affinity
+    max_nodes: int
+
+
+@dc.dataclass(frozen=True)
+class ImagePrePullConfig:
+    enabled: bool
+    # name of the daemon set pulling the images of the pod manifest on every node
+    daemon_set_name: str
+    # sessions switch to a new pod manifest once this share of nodes holds its images
+    min_node_ratio: float
+    # seconds between checks of the rollout progress
+    interval: float
+    # image of the container keeping the pre-pull pods alive
+    pause_image: str
+    # image with a static busybox, copied into the pre-pull pods, so the pulled images need no shell
+    helper_image: str
 
 
 @dc.dataclass(frozen=True)
@@ -21,3 +111,88 @@ class PodConfig:
     manifest: dict[str, t.Any]
     webdriver_path: str
     webdriver_port: int
+
+
+@dc.dataclass(frozen=True)
+class PodPoolConfig:
+    # number of idle Ready pods to keep in the pool, 0 disables the pool
+    target_size: int
+    # upper limit of pods owned by the pool (idle and refilling)
+    max_size: int
+    refill_concurrency: int
+
+    @property
+    def enabled(self) -> bool:
+        return self.target_size > 0
+
+
+@dc.dataclass(frozen=True)
+class PodRecycleConfig:
+    enabled: bool
+    # a pod is deleted instead of being recycled once it has served `max_reuses` sessions or is older than `max_age`
+    max_reuses: int
+    max_age: float
+
+
+@dc.dataclass(frozen=True)
+class PodGcConfig:
+    enabled: bool
+    # log and count orphaned pods without deleting them
+    dry_run: bool
+    interval: float
+    # pods younger than this are never collected, they may be still in creation
+    grace_period: float
+    # Pending pods nobody waits for are collected after this number of seconds
+    pending_timeout: float
+    # sessions older than this are deleted, 0 means no limit
+    max_session_age: float
+    # deletions per run
+    max_deletions: int
+
+
+@dc.dataclass(frozen=True)
+class WebDriverConfig:
+    connections_limit: int
+    connections_limit_per_host: int
+    keepalive_timeout: float
+    connect_timeout: float
+    read_timeout: float
+    # overall deadline for the webdriver `/status` polling before a session is created
+    ready_timeout: float
+
+
+@dc.dataclass(frozen=True)
+class SessionReaperConfig:
+    enabled: bool
+    # a session is deleted when its url and title have not changed for this number of seconds
+    idle_timeout: float
+    interval: float
+    # webdriver probes at the same time
+    concurrency: int
+
+
+@dc.dataclass(frozen=True)
+class PodHedgeConfig:
+    enabled: bool
+    # a second pod is launched if the first one is not Ready within this percentile of recent readiness durations
+    percentile: float
+    min_delay: float
+    # hedge pods launched at once as a share of the pods waiting for readiness
+    max_ratio: float
+
+
+@dc.dataclass(frozen=True)
+class ReplicaConfig:
+    # instance ids of all callisto replicas, the own one is skipped
+    peers: tuple[str, ...]
+    # url of a replica by its instance id, e.g. `http://{instance_id}.callisto:8080`. Forwarding is off if empty
+    peer_url_template: str
+    timeout: float
+
+
+@dc.dataclass(frozen=True)
+class MetricsConfig:
+    # `/metrics` output is reused by scrapes within this number of seconds
+    cache_ttl: float
+    # seconds between kube-api availability probes, probing is off if 0
+    k8s_probe_interval: float
@@ -4,5 +4,6 @@ from __future__ import annotations
 HEALTH_CHECK_USE_CASE_KEY = "__health_check_use_case_key__"
 METRICS_USE_CASE_KEY = "__metrics_use_case_key__"
 SESSION_USE_CASE_KEY = "__session_use_case_key__"
+SESSION_QUERY_USE_CASE_KEY = "__session_query_use_case_key__"
 STATUS_USE_CASE_KEY = "__status_use_case_key__"
 WEBDRIVER_LOGS_USE_CASE_KEY = "__webdriver_logs_use_case_key__"
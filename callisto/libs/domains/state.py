@@ -4,7 +4,7 @@ import dataclasses as dc
 from enum import Enum
 
 
-@dc.dataclass
+@dc.dataclass(slots=True)
 class SessionState:
     patched_session_id: str
     browser_name: str
@@ -13,6 +13,9 @@ class SessionState:
     vnc_enabled: bool
     screen_resolution: str
     timezone: str
+    node_name: str = ""
+    # unix time
+    created_at: float = 0.0
 
 
 class SessionStage(Enum):
@@ -31,7 +34,10 @@ class SessionStageStep(Enum):
     CREATING_POD = "creating_pod"
     WAITING_FOR_POD_READY = "waiting_for_pod_ready"
     GETTING_POD = "getting_pod"
+    WAITING_FOR_WEBDRIVER_READY = "waiting_for_webdriver_ready"
+    PROBING_WEBDRIVER_STATUS = "probing_webdriver_status"
     CREATING_WEBDRIVER_SESSION = "creating_webdriver_session"
 
     # deleting session
+    RESETTING_POD = "resetting_pod"
     DELETING_POD = "deleting_pod"
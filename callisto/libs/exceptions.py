@@ -20,6 +20,22 @@ class K8SEmptyPodIp(BaseError):
     pass
 
 
+class K8sWatchExpired(BaseError):
+    pass
+
+
+class K8sPodNotReady(BaseError):
+    def __init__(self, message: str, reason: str) -> None:
+        super().__init__(message)
+        self.reason = reason
+
+
+class K8sApiUnavailable(BaseError):
+    def __init__(self, message: str, retry_after: float) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
 class WebDriverException(BaseError):
     pass
 
@@ -30,3 +46,7 @@ class ValidationError(BaseError):
 
 class SessionNotFound(BaseError):
     pass
+
+
+class ReplicaException(BaseError):
+    pass
@@ -1,16 +1,19 @@
 from __future__ import annotations
 
+import math
 import typing as t
 from contextlib import contextmanager
 
 from aiohttp.typedefs import Handler, Middleware
 from aiohttp.web import (
     HTTPInternalServerError,
+    HTTPServiceUnavailable,
     json_response,
     middleware,
 )
 from aiohttp.web_response import StreamResponse
 
+from .exceptions import K8sApiUnavailable
 from .services.log import logger
 
 
@@ -28,6 +31,14 @@ async def error_middleware(request: Request, handler: Handler) -> StreamResponse
     """logs an exception and returns an error message to the client"""
     try:
         return await handler(request)
+    except K8sApiUnavailable as e:
+        # load shedding, the client is expected to retry later
+        logger.warning(str(e))
+        return json_response(
+            text=str(e),
+            status=HTTPServiceUnavailable.status_code,
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
     except Exception as e:
         logger.exception(e)
         return json_response(text=str(e), status=HTTPInternalServerError.status_code)
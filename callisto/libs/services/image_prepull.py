@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import typing as t
+
+from prometheus_client import CollectorRegistry, Gauge
+from sentry_sdk import capture_exception
+
+from .k8s.service import K8sService
+from .log import l_ctx, logger
+
+
+if t.TYPE_CHECKING:
+    from kubernetes_asyncio.client import V1DaemonSet  # type: ignore
+
+    from ..domains.config import ImagePrePullConfig, PodConfig
+    from .status_document import StatusDocument
+    from .task_runner import TaskRunnerService
+
+
+class ImagePrePullService:
+    """Pulls the images of the pod manifest on the nodes with a daemon set before sessions use them.
+
+    The daemon set has an init container per image of the manifest, so its pod on a node is Ready once
+    the node holds all the images. The init containers run a static busybox copied from the helper image,
+    as the images may have no shell (e.g. distroless sidecars). When the configured pod manifest changes,
+    the daemon set is rolled out and sessions keep the previous manifest until `min_node_ratio` of the nodes
+    hold the new images.
+    The manifest in use is stored in an annotation of the daemon set for restarted instances.
+    """
+
+    NAME_LABEL = "app.kubernetes.io/name"
+    MANIFEST_HASH_ANNOTATION = "callisto/manifest-hash"
+    MANIFEST_ANNOTATION = "callisto/pod-manifest"
+    STATUS_SECTION = "image_prepull"
+    # the helper busybox is copied to a volume and runs in every pulled image, it exits as soon as the image is pulled
+    HELPER_VOLUME = "prepull-helper"
+    HELPER_PATH = "/callisto-prepull"
+    HELPER_COMMAND = ["cp", "/bin/busybox", f"{HELPER_PATH}/busybox"]
+    PREPULL_COMMAND = [f"{HELPER_PATH}/busybox", "true"]
+    CONTAINER_RESOURCES = {"requests": {"cpu": "1m", "memory": "8Mi"}}
+    # fields of the pod manifest copied to the daemon set, so it runs on the nodes of browser pods
+    SCHEDULING_FIELDS = ("nodeSelector", "tolerations", "imagePullSecrets", "priorityClassName")
+
+    def __init__(
+        self,
+        k8s_service: K8sService,
+        task_runner_service: TaskRunnerService,
+        pod_config: PodConfig,
+        prepull_config: ImagePrePullConfig,
+        status_document: StatusDocument,
+        metrics_registry: CollectorRegistry,
+        instance_id: str,
+    ) -> None:
+        self.k8s_service = k8s_service
+        self.task_runner_service = task_runner_service
+        self.pod_config = pod_config
+        self.prepull_config = prepull_config
+        self.status_document = status_document
+        self.instance_id = instance_id
+
+        # the configured manifest and the one sessions use until its images are pulled
+        self.target_hash = k8s_service.get_manifest_hash(pod_config.manifest)
+        self.manifest = pod_config.manifest
+        self.manifest_hash = self.target_hash
+        self.desired_nodes = 0
+        self.ready_nodes = 0
+        # nodes whose pre-pull pod fails, e.g. a missing image, the rollout does not progress on them
+        self.failing_nodes = 0
+        self.rolled_out = False
+
+        self.prepull_nodes = Gauge(
+            "callisto_image_prepull_nodes",
+            "Nodes which should hold, which hold and which fail to pull the images of the configured pod manifest",
+            ["instance_id", "state"],
+            registry=metrics_registry,
+        )
+        self.prepull_switched = Gauge(
+            "callisto_image_prepull_switched",
+            "Whether sessions use the configured pod manifest or still the previous one",
+            ["instance_id"],
+            registry=metrics_registry,
+        )
+
+    @property
+    def switched(self) -> bool:
+        return self.manifest_hash == self.target_hash
+
+    def is_outdated(self, manifest_hash: str) -> bool:
+        """Whether sessions switched from the manifest to another one"""
+        return self.prepull_config.enabled and manifest_hash != self.manifest_hash
+
+    async def run_background_tasks(self) -> None:
+        if self.prepull_config.enabled:
+            # before the first session, a restarted instance keeps using the manifest stored in the daemon set
+            await self.sync()
+            await self.task_runner_service.run_in_background(self.watch_rollout)
+
+    async def watch_rollout(self) -> None:
+        while True:
+            await asyncio.sleep(self.prepull_config.interval)
+            await self.sync()
+
+    async def sync(self) -> None:
+        try:
+            await self.check_progress()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception(e)
+            capture_exception(e)
+
+    async def roll_out(self) -> None:
+        """Create the daemon set or update it to the images of the configured manifest.
+        Sessions use the manifest stored in the daemon set until the images are pulled.
+        """
+        name = self.prepull_config.daemon_set_name
+        daemon_set = await self.k8s_service.get_daemon_set(name)
+        if daemon_set is None:
+            # no images were pulled before, there is no other manifest to use
+            await self.k8s_service.create_daemon_set(self.get_daemon_set_spec())
+            logger.info("image pre-pull daemon set created", extra=l_ctx(name=name, manifest_hash=self.target_hash))
+            self.rolled_out = True
+            return
+
+        annotations = daemon_set.metadata.annotations or {}
+        if annotations.get(self.MANIFEST_ANNOTATION):
+            self._use_manifest(json.loads(annotations[self.MANIFEST_ANNOTATION]))
+
+        if annotations.get(self.MANIFEST_HASH_ANNOTATION) != self.target_hash:
+            spec = self.get_daemon_set_spec()
+            await self.k8s_service.patch_daemon_set(
+                name,
+                [
+                    {"op": "replace", "path": "/spec/template", "value": spec["spec"]["template"]},
+                    {
+                        "op": "add",
+                        "path": "/metadata/annotations",
+                        "value": {**annotations, self.MANIFEST_HASH_ANNOTATION: self.target_hash},
+                    },
+                ],
+            )
+            logger.info(
+                "image pre-pull daemon set rolled out",
+                extra=l_ctx(name=name, manifest_hash=self.target_hash, active_manifest_hash=self.manifest_hash),
+            )
+        self.rolled_out = True
+
+    async def check_progress(self) -> None:
+        """Count the nodes holding the images and switch sessions to the configured manifest when enough do"""
+        if not self.rolled_out:
+            await self.roll_out()
+
+        name = self.prepull_config.daemon_set_name
+        daemon_set = await self.k8s_service.get_daemon_set(name)
+        if daemon_set is None:
+            logger.warning("image pre-pull daemon set is gone", extra=l_ctx(name=name))
+            self.rolled_out = False
+            return
+
+        annotations = daemon_set.metadata.annotations or {}
+        if annotations.get(self.MANIFEST_HASH_ANNOTATION) != self.target_hash:
+            # another instance rolled out its manifest, e.g. a newer release during a rolling update
+            logger.debug("image pre-pull daemon set is rolled out by another instance", extra=l_ctx(name=name))
+            return
+
+        pods = await self.k8s_service.list_pods(
+            label_selector=f"{self.NAME_LABEL}={name},{K8sService.MANIFEST_HASH_LABEL}={self.target_hash}"
+        )
+        self.desired_nodes = self._get_desired_nodes(daemon_set)
+        self.ready_nodes = sum(1 for pod in pods if self.k8s_service.k8s_client.is_pod_ready(pod))
+        failures = [failure for failure in map(self.k8s_service.get_pod_failure, pods) if failure is not None]
+        self.failing_nodes = len(failures)
+        if failures:
+            reason, message = failures[0]
+            logger.warning(
+                "image pre-pull pods fail",
+                extra=l_ctx(name=name, failing_nodes=self.failing_nodes, reason=reason, error=message),
+            )
+
+        if not self.switched and self.get_ready_ratio(daemon_set) >= self.prepull_config.min_node_ratio:
+            self._use_manifest(self.pod_config.manifest)
+            await self.k8s_service.patch_daemon_set(
+                name,
+                [
+                    {
+                        "op": "add",
+                        "path": "/metadata/annotations",
+                        "value": {**annotations, self.MANIFEST_ANNOTATION: json.dumps(self.pod_config.manifest)},
+                    }
+                ],
+            )
+            logger.info(
+                "sessions switched to the pod manifest",
+                extra=l_ctx(manifest_hash=self.target_hash, ready_nodes=self.ready_nodes, nodes=self.desired_nodes),
+            )
+        self._update_status()
+
+    def get_ready_ratio(self, daemon_set: V1DaemonSet) -> float:
+        if self.desired_nodes:
+            return self.ready_nodes / self.desired_nodes
+
+        # no nodes to pull the images on (e.g. the node pool is scaled to zero), nothing to wait for
+        status = daemon_set.status
+        observed = status is not None and (status.observed_generation or 0) >= (daemon_set.metadata.generation or 0)
+        return 1.0 if observed else 0.0
+
+    def get_daemon_set_spec(self) -> dict[str, t.Any]:
+        manifest = self.pod_config.manifest
+        pod_spec = manifest.get("spec") or {}
+        containers = [*(pod_spec.get("initContainers") or []), *(pod_spec.get("containers") or [])]
+        images = list(dict.fromkeys(container["image"] for container in containers if container.get("image")))
+
+        helper_mounts = [{"name": self.HELPER_VOLUME, "mountPath": self.HELPER_PATH}]
+        template_spec: dict[str, t.Any] = {
+            **{field: pod_spec[field] for field in self.SCHEDULING_FIELDS if field in pod_spec},
+            "initContainers": [
+                {
+                    "name": "helper",
+                    "image": self.prepull_config.helper_image,
+                    "command": self.HELPER_COMMAND,
+                    "resources": self.CONTAINER_RESOURCES,
+                    "volumeMounts": helper_mounts,
+                },
+                *(
+                    {
+                        "name": f"image-{i}",
+                        "image": image,
+                        "imagePullPolicy": "IfNotPresent",
+                        "command": self.PREPULL_COMMAND,
+                        "resources": self.CONTAINER_RESOURCES,
+                        "volumeMounts": helper_mounts,
+                    }
+                    for i, image in enumerate(images)
+                ),
+            ],
+            "containers": [
+                {"name": "pause", "image": self.prepull_config.pause_image, "resources": self.CONTAINER_RESOURCES}
+            ],
+            "volumes": [{"name": self.HELPER_VOLUME, "emptyDir": {}}],
+            "terminationGracePeriodSeconds": 0,
+        }
+        node_affinity = (pod_spec.get("affinity") or {}).get("nodeAffinity")
+        if node_affinity:
+            template_spec["affinity"] = {"nodeAffinity": node_affinity}
+
+        name = self.prepull_config.daemon_set_name
+        selector = {self.NAME_LABEL: name}
+        return {
+            "apiVersion": "apps/v1",
+            "kind": "DaemonSet",
+            "metadata": {
+                "name": name,
+                "labels": {**selector, K8sService.MANAGED_BY_LABEL: K8sService.MANAGED_BY_VALUE},
+                "annotations": {
+                    self.MANIFEST_HASH_ANNOTATION: self.target_hash,
+                    self.MANIFEST_ANNOTATION: json.dumps(manifest),
+                },
+            },
+            "spec": {
+                "selector": {"matchLabels": selector},
+                # every node pulls the new images at once
+                "updateStrategy": {"type": "RollingUpdate", "rollingUpdate": {"maxUnavailable": "100%"}},
+                "template": {
+                    "metadata": {"labels": {**selector, K8sService.MANIFEST_HASH_LABEL: self.target_hash}},
+                    "spec": template_spec,
+                },
+            },
+        }
+
+    @staticmethod
+    def _get_desired_nodes(daemon_set: V1DaemonSet) -> int:
+        status = daemon_set.status
+        return (status.desired_number_scheduled or 0) if status is not None else 0
+
+    def _use_manifest(self, manifest: dict[str, t.Any]) -> None:
+        self.manifest = manifest
+        self.manifest_hash = self.k8s_service.get_manifest_hash(manifest)
+
+    def _update_status(self) -> None:
+        self.status_document.set_section(
+            self.STATUS_SECTION,
+            {
+                "manifest_hash": self.target_hash,
+                "active_manifest_hash": self.manifest_hash,
+                "switched": self.switched,
+                "desired_nodes": self.desired_nodes,
+                "ready_nodes": self.ready_nodes,
+                "failing_nodes": self.failing_nodes,
+            },
+        )
+        self.prepull_nodes.labels(instance_id=self.instance_id, state="desired").set(self.desired_nodes)
+        self.prepull_nodes.labels(instance_id=self.instance_id, state="ready").set(self.ready_nodes)
+        self.prepull_nodes.labels(instance_id=self.instance_id, state="failing").set(self.failing_nodes)
+        self.prepull_switched.labels(instance_id=self.instance_id).set(int(self.switched))
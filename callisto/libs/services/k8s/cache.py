@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import typing as t
+
+
+if t.TYPE_CHECKING:
+    from kubernetes_asyncio.client import V1Pod  # type: ignore
+
+
+class PodCache:
+    """In-memory copy of namespace pods, kept up to date by a list+watch (informer-like)"""
+
+    def __init__(self) -> None:
+        self.pods: dict[str, V1Pod] = {}
+        # resourceVersion to resume the watch from. `None` means a relist is needed
+        self.resource_version: str | None = None
+
+    @property
+    def synced(self) -> bool:
+        return self.resource_version is not None
+
+    def replace(self, pods: t.Iterable[V1Pod], resource_version: str) -> None:
+        self.pods = {pod.metadata.name: pod for pod in pods}
+        self.resource_version = resource_version
+
+    def set(self, pod: V1Pod) -> None:
+        self.pods[pod.metadata.name] = pod
+
+    def remove(self, pod_name: str) -> None:
+        self.pods.pop(pod_name, None)
+
+    def get(self, pod_name: str) -> V1Pod | None:
+        return self.pods.get(pod_name)
+
+    def list(self) -> list[V1Pod]:
+        return list(self.pods.values())
+
+    def invalidate(self) -> None:
+        self.resource_version = None
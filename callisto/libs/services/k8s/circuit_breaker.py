@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import collections
+import time
+import typing as t
+from enum import Enum
+
+from ...exceptions import K8sApiUnavailable
+from ..log import l_ctx, logger
+
+
+if t.TYPE_CHECKING:
+    from ...domains.config import K8sCircuitBreakerConfig
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class K8sCircuitBreaker:
+    """Fails kube-api calls of session requests fast while kube-api is degraded.
+
+    The circuit opens when at least `min_calls` calls were made within the last `window` seconds
+    and the share of failed or slow calls reaches `failure_ratio`.
+    After `open_duration` seconds one probe call is let through (half-open state):
+    the circuit closes if it succeeds and opens again if it fails.
+    """
+
+    def __init__(self, config: K8sCircuitBreakerConfig) -> None:
+        self.config = config
+        self.state = CircuitState.CLOSED
+        # (finished at, failed or slow)
+        self.calls: collections.deque[tuple[float, bool]] = collections.deque()
+        self.opened_at = 0.0
+        self.probe_started_at: float | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.failure_ratio > 0
+
+    @property
+    def retry_after(self) -> float:
+        return max(self.opened_at + self.config.open_duration - time.monotonic(), 0)
+
+    def get_state(self) -> CircuitState:
+        if self.state == CircuitState.OPEN and self.retry_after == 0:
+            self.state = CircuitState.HALF_OPEN
+            self.probe_started_at = None
+            logger.info("k8s api circuit is half-open")
+
+        return self.state
+
+    def check(self) -> None:
+        """Raise `K8sApiUnavailable` if the call should not be made"""
+        state = self.get_state()
+        if state == CircuitState.CLOSED:
+            return
+
+        now = time.monotonic()
+        if state == CircuitState.HALF_OPEN and (
+            # a probe could be cancelled without a result
+            self.probe_started_at is None
+            or now - self.probe_started_at > self.config.open_duration
+        ):
+            self.probe_started_at = now
+            return
+
+        raise K8sApiUnavailable(
+            f"K8s api is unavailable, circuit is {state.value}",
+            retry_after=self.retry_after or self.config.open_duration,
+        )
+
+    def record(self, duration: float, failed: bool) -> None:
+        if not self.enabled:
+            return
+
+        failed = failed or duration > self.config.slow_call_duration
+        state = self.get_state()
+
+        if state == CircuitState.HALF_OPEN:
+            if failed:
+                self._open()
+            else:
+                self._close()
+            return
+
+        now = time.monotonic()
+        self.calls.append((now, failed))
+        while self.calls and self.calls[0][0] < now - self.config.window:
+            self.calls.popleft()
+
+        if state == CircuitState.CLOSED and len(self.calls) >= self.config.min_calls:
+            failure_ratio = sum(failed for _, failed in self.calls) / len(self.calls)
+            if failure_ratio >= self.config.failure_ratio:
+                self._open()
+
+    def _open(self) -> None:
+        logger.warning("k8s api circuit is open", extra=l_ctx(open_duration=self.config.open_duration))
+        self.state = CircuitState.OPEN
+        self.opened_at = time.monotonic()
+        self.probe_started_at = None
+
+    def _close(self) -> None:
+        logger.info("k8s api circuit is closed")
+        self.state = CircuitState.CLOSED
+        self.calls.clear()
+        self.probe_started_at = None
@@ -1,13 +1,10 @@
 from __future__ import annotations
 
+import time
 import typing as t
 from http import HTTPStatus
 
-from aiohttp import (
-    ClientConnectorError,
-    ClientResponse,
-    StreamReader,
-)
+from aiohttp import ClientResponse, StreamReader
 from kubernetes_asyncio import (  # type: ignore
     client,
     config,
@@ -15,17 +12,28 @@ from kubernetes_asyncio import (  # type: ignore
 )
 from kubernetes_asyncio.client.rest import ApiException  # type: ignore
 
-from ...exceptions import K8SForbidden, K8sPodNotFound
+from ...exceptions import (
+    K8SForbidden,
+    K8sPodNotFound,
+    K8sWatchExpired,
+)
 from ..log import l_ctx, logger
-from ..task_runner import TaskRunnerService
+from .circuit_breaker import K8sCircuitBreaker
+from .rate_limiter import K8sRateLimiter, Lane
+from .retry import K8sRetry
 
 
 if t.TYPE_CHECKING:
     from kubernetes_asyncio.client import (  # type: ignore
+        AppsV1Api,
         CoreApi,
         CoreV1Api,
         V1APIVersions,
+        V1DaemonSet,
+        V1Node,
+        V1NodeList,
         V1Pod,
+        V1PodList,
         V1Status,
     )
 
@@ -33,22 +41,40 @@ ReplicasCount: t.TypeAlias = dict[str, int]
 T = t.TypeVar("T")
 
 
-LISTENING_EVENT_TYPE = "MODIFIED"
-SKIP_EVENT_TYPES = ("ADDED", "DELETED")
+DELETED_EVENT_TYPE = "DELETED"
+EVENT_TYPES = ("ADDED", "MODIFIED", DELETED_EVENT_TYPE)
+BOOKMARK_EVENT_TYPE = "BOOKMARK"
 
 
 class K8sClient:
     RUNNING_PHASE_NAME = "Running"
     READY_CONDITION_TYPE = "Ready"
     CONDITION_STATUS_OK = "True"
+    # the server closes the watch after this timeout, and we resume it from the last seen resourceVersion
+    WATCH_TIMEOUT = 300
+    # rate limiter verbs of operations which are not verbs themselves
+    OPERATION_VERBS = {"logs": "get"}
 
-    def __init__(self, core_client: CoreApi, v1_client: CoreV1Api, task_runner_service: TaskRunnerService) -> None:
+    def __init__(
+        self,
+        core_client: CoreApi,
+        v1_client: CoreV1Api,
+        apps_client: AppsV1Api,
+        rate_limiter: K8sRateLimiter,
+        retry: K8sRetry,
+        circuit_breaker: K8sCircuitBreaker,
+    ) -> None:
         self.core_client = core_client
         self.v1_client = v1_client
-        self.task_runner_service = task_runner_service
+        self.apps_client = apps_client
+        self.rate_limiter = rate_limiter
+        self.retry = retry
+        self.circuit_breaker = circuit_breaker
 
     @classmethod
-    async def init(cls, in_cluster: bool, task_runner_service: TaskRunnerService) -> K8sClient:
+    async def init(
+        cls, in_cluster: bool, rate_limiter: K8sRateLimiter, retry: K8sRetry, circuit_breaker: K8sCircuitBreaker
+    ) -> K8sClient:
         if in_cluster:
             # auth inside k8s cluster
             config.load_incluster_config()
@@ -59,40 +85,99 @@ class K8sClient:
         api_client = client.ApiClient()
         core_client = client.CoreApi(api_client)
         v1_client = client.CoreV1Api(api_client)
+        apps_client = client.AppsV1Api(api_client)
 
-        return cls(core_client=core_client, v1_client=v1_client, task_runner_service=task_runner_service)
+        return cls(
+            core_client=core_client,
+            v1_client=v1_client,
+            apps_client=apps_client,
+            rate_limiter=rate_limiter,
+            retry=retry,
+            circuit_breaker=circuit_breaker,
+        )
 
-    async def _retry(self, *, func: t.Callable[..., t.Any], **kwargs: t.Any) -> t.Any:
-        """Retry on:
-        ClientConnectorError - when kube-api unavailable
-        ApiException - some random errors
+    async def _retry(self, *, operation: str, lane: Lane, func: t.Callable[..., t.Any], **kwargs: t.Any) -> t.Any:
+        """Retry by the policy of the operation, see `K8sRetry`.
+        Every attempt waits for the rate limiter and is recorded by the circuit breaker.
+        User calls fail with `K8sApiUnavailable` while the circuit is open, background calls are still made.
         """
-        return await self.task_runner_service.run_with_retry(
-            func=func, tries=8, pause=15, retry_exc=(ClientConnectorError, ApiException), **kwargs
-        )
+        verb = self.OPERATION_VERBS.get(operation, operation)
+
+        async def limited_func(**func_kwargs: t.Any) -> t.Any:
+            if lane == Lane.USER:
+                self.circuit_breaker.check()
+
+            await self.rate_limiter.acquire(verb, lane)
+            return await self._record(func, **func_kwargs)
+
+        return await self.retry.call(operation, limited_func, **kwargs)
+
+    async def _record(self, func: t.Callable[..., t.Awaitable[T]], **kwargs: t.Any) -> T:
+        """Call and record the outcome in the circuit breaker, errors worth a retry count as failures"""
+        start_time = time.monotonic()
+        try:
+            result = await func(**kwargs)
+        except Exception as e:
+            self.circuit_breaker.record(time.monotonic() - start_time, failed=self.retry.is_retryable(e))
+            raise e
+
+        self.circuit_breaker.record(time.monotonic() - start_time, failed=False)
+        return result
 
     async def get_api_versions(self) -> V1APIVersions:
-        return await self.core_client.get_api_versions()
+        await self.rate_limiter.acquire("get", Lane.BACKGROUND)
+        return await self._record(self.core_client.get_api_versions)
 
-    async def get_pod(self, namespace: str, name: str) -> V1Pod:
+    async def get_pod(self, namespace: str, name: str, lane: Lane = Lane.USER) -> V1Pod:
         try:
-            return await self._retry(func=self.v1_client.read_namespaced_pod, name=name, namespace=namespace)
+            return await self._retry(
+                operation="get", lane=lane, func=self.v1_client.read_namespaced_pod, name=name, namespace=namespace
+            )
         except ApiException as e:
             if e.status == 404:
                 raise K8sPodNotFound(f"Pod `{name}` in namespace `{namespace}` not found") from e
             raise e
 
-    async def create_pod(self, namespace: str, spec: dict[str, t.Any]) -> V1Pod:
+    async def get_node(self, name: str, lane: Lane = Lane.BACKGROUND) -> V1Node:
+        return await self._retry(operation="get", lane=lane, func=self.v1_client.read_node, name=name)
+
+    async def create_pod(self, namespace: str, spec: dict[str, t.Any], lane: Lane = Lane.USER) -> V1Pod:
         try:
-            return await self._retry(func=self.v1_client.create_namespaced_pod, namespace=namespace, body=spec)
+            return await self._retry(
+                operation="create", lane=lane, func=self.v1_client.create_namespaced_pod, namespace=namespace, body=spec
+            )
         except ApiException as e:
             if e.status == 403:
                 raise K8SForbidden(f"Can't create pod in namespace {namespace}. Pod manifest: {spec}") from e
             raise e
 
-    async def delete_pod(self, namespace: str, name: str) -> V1Status:
+    async def patch_pod(self, namespace: str, name: str, body: dict[str, t.Any], lane: Lane = Lane.BACKGROUND) -> V1Pod:
         try:
-            return await self._retry(func=self.v1_client.delete_namespaced_pod, namespace=namespace, name=name)
+            return await self._retry(
+                operation="patch",
+                lane=lane,
+                func=self.v1_client.patch_namespaced_pod,
+                namespace=namespace,
+                name=name,
+                body=body,
+            )
+        except ApiException as e:
+            if e.status == 403:
+                raise K8SForbidden(f"Can't patch pod {name} in namespace {namespace}") from e
+            if e.status == 404:
+                raise K8sPodNotFound(f"Pod `{name}` in namespace `{namespace}` not found") from e
+            raise e
+
+    async def delete_pod(self, namespace: str, name: str, grace_period_seconds: int | None = None) -> V1Status:
+        try:
+            return await self._retry(
+                operation="delete",
+                lane=Lane.BACKGROUND,
+                func=self.v1_client.delete_namespaced_pod,
+                namespace=namespace,
+                name=name,
+                grace_period_seconds=grace_period_seconds,
+            )
         except ApiException as e:
             if e.status == 403:
                 raise K8SForbidden(f"Can't delete pod {name} in namespace {namespace}") from e
@@ -100,43 +185,150 @@ class K8sClient:
                 raise K8sPodNotFound(f"Pod `{name}` in namespace `{namespace}` not found") from e
             raise e
 
+    async def delete_pods(
+        self, namespace: str, label_selector: str, grace_period_seconds: int | None = None
+    ) -> V1Status:
+        try:
+            return await self._retry(
+                operation="delete",
+                lane=Lane.BACKGROUND,
+                func=self.v1_client.delete_collection_namespaced_pod,
+                namespace=namespace,
+                label_selector=label_selector,
+                grace_period_seconds=grace_period_seconds,
+            )
+        except ApiException as e:
+            if e.status == 403:
+                raise K8SForbidden(f"Can't delete pods {label_selector} in namespace {namespace}") from e
+            raise e
+
+    async def list_pods(
+        self, namespace: str, label_selector: str | None = None, field_selector: str | None = None
+    ) -> V1PodList:
+        return await self._retry(
+            operation="list",
+            lane=Lane.BACKGROUND,
+            func=self.v1_client.list_namespaced_pod,
+            namespace=namespace,
+            label_selector=label_selector,
+            field_selector=field_selector,
+        )
+
+    async def list_nodes(self) -> V1NodeList:
+        return await self._retry(operation="list", lane=Lane.BACKGROUND, func=self.v1_client.list_node)
+
+    async def get_daemon_set(self, namespace: str, name: str) -> V1DaemonSet | None:
+        """`None` if there is no such daemon set"""
+        try:
+            return await self._retry(
+                operation="get",
+                lane=Lane.BACKGROUND,
+                func=self.apps_client.read_namespaced_daemon_set,
+                name=name,
+                namespace=namespace,
+            )
+        except ApiException as e:
+            if e.status == 404:
+                return None
+            raise e
+
+    async def create_daemon_set(self, namespace: str, body: dict[str, t.Any]) -> V1DaemonSet:
+        try:
+            return await self._retry(
+                operation="create",
+                lane=Lane.BACKGROUND,
+                func=self.apps_client.create_namespaced_daemon_set,
+                namespace=namespace,
+                body=body,
+            )
+        except ApiException as e:
+            if e.status == 403:
+                raise K8SForbidden(f"Can't create daemon set in namespace {namespace}") from e
+            raise e
+
+    async def patch_daemon_set(self, namespace: str, name: str, body: list[dict[str, t.Any]]) -> V1DaemonSet:
+        """Apply a JSON patch, lists of the daemon set are replaced instead of being merged"""
+        return await self._retry(
+            operation="patch",
+            lane=Lane.BACKGROUND,
+            func=self.apps_client.patch_namespaced_daemon_set,
+            name=name,
+            namespace=namespace,
+            body=body,
+        )
+
     def is_pod_ready(self, pod: V1Pod) -> bool:
         if pod.status.phase == self.RUNNING_PHASE_NAME:
-            for condition in pod.status.conditions:
+            for condition in pod.status.conditions or []:
                 if condition.type == self.READY_CONDITION_TYPE and condition.status == self.CONDITION_STATUS_OK:
                     return True
 
         return False
 
-    async def watch_pod_ready_events(self, namespace: str) -> t.AsyncIterator[str]:
-        while True:
-            try:
-                async for event in watch.Watch().stream(
-                    self.v1_client.list_namespaced_pod,
-                    namespace=namespace,
-                ):
-                    if event["type"] == LISTENING_EVENT_TYPE:
-                        if self.is_pod_ready(event["object"]):
-                            pod_name = event["object"].metadata.name
-                            logger.debug("pod is ready", extra=l_ctx(namespace=namespace, pod=pod_name))
-                            yield pod_name
-                    elif event["type"] in SKIP_EVENT_TYPES:
-                        pass
-                    else:
-                        logger.warning("unhandled event", extra=l_ctx(event=event))
-            except ApiException as e:
-                if e.status == HTTPStatus.GONE:
-                    # Clusters using etcd 3 preserve changes in the last 5 minutes by default.
-                    # Clients must handle the case by recognizing the status code 410 Gone,
-                    # clearing their local cache, performing a list operation,
-                    # and starting the watch from the resourceVersion returned by that new list operation
-                    # (see https://kubernetes.io/docs/reference/using-api/api-concepts/#efficient-detection-of-changes)
-                    pass
+    async def watch_pod_events(
+        self,
+        namespace: str,
+        resource_version: str,
+        label_selector: str | None = None,
+        field_selector: str | None = None,
+    ) -> t.AsyncIterator[tuple[str, V1Pod | None, str]]:
+        """Yield (event type, pod, resourceVersion) starting from the given resourceVersion.
+        Pod is `None` for bookmarks, they only move the resourceVersion forward.
+        """
+        async for event in self._watch_events(
+            self.v1_client.list_namespaced_pod,
+            resource_version=resource_version,
+            namespace=namespace,
+            label_selector=label_selector,
+            field_selector=field_selector,
+        ):
+            yield event
+
+    async def watch_node_events(self, resource_version: str) -> t.AsyncIterator[tuple[str, V1Node | None, str]]:
+        """Yield (event type, node, resourceVersion) like `watch_pod_events`"""
+        async for event in self._watch_events(self.v1_client.list_node, resource_version=resource_version):
+            yield event
+
+    async def _watch_events(
+        self, func: t.Callable[..., t.Any], resource_version: str, **kwargs: t.Any
+    ) -> t.AsyncIterator[tuple[str, t.Any, str]]:
+        await self.rate_limiter.acquire("watch", Lane.BACKGROUND)
+
+        stream = watch.Watch()
+        try:
+            async for event in stream.stream(
+                func,
+                resource_version=resource_version,
+                allow_watch_bookmarks=True,
+                timeout_seconds=self.WATCH_TIMEOUT,
+                **kwargs,
+            ):
+                if event["type"] in EVENT_TYPES:
+                    yield event["type"], event["object"], stream.resource_version
+                elif event["type"] == BOOKMARK_EVENT_TYPE:
+                    yield event["type"], None, stream.resource_version
                 else:
-                    raise e
+                    logger.warning("unhandled event", extra=l_ctx(event=event))
+        except ApiException as e:
+            if e.status == HTTPStatus.GONE:
+                # Clusters using etcd 3 preserve changes in the last 5 minutes by default.
+                # Clients must handle the case by recognizing the status code 410 Gone,
+                # clearing their local cache, performing a list operation,
+                # and starting the watch from the resourceVersion returned by that new list operation
+                # (see https://kubernetes.io/docs/reference/using-api/api-concepts/#efficient-detection-of-changes)
+                raise K8sWatchExpired(f"Resource version {resource_version} is too old") from e
+            raise e
+        finally:
+            await stream.close()
 
     async def get_pod_logs_stream(self, namespace: str, name: str) -> StreamReader:
-        resp: ClientResponse = await self.v1_client.read_namespaced_pod_log(
-            name=name, namespace=namespace, follow=True, _preload_content=False
+        resp: ClientResponse = await self._retry(
+            operation="logs",
+            lane=Lane.USER,
+            func=self.v1_client.read_namespaced_pod_log,
+            name=name,
+            namespace=namespace,
+            follow=True,
+            _preload_content=False,
         )
         return resp.content
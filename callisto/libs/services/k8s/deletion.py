@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import asyncio
+import collections
+import time
+import typing as t
+from functools import partial
+
+from prometheus_client import (
+    CollectorRegistry,
+    Gauge,
+    Histogram,
+)
+
+from ..log import l_ctx, logger
+from ..task_runner import TaskRunnerService
+from .cache import PodCache
+from .client import K8sClient
+
+
+if t.TYPE_CHECKING:
+    from ...domains.config import PodDeletionConfig
+
+
+class PodDeletionQueue:
+    """Coalesces pod deletions into batches.
+
+    Pods are queued for `flush_interval` seconds, then deleted by `delete_collection` with a label selector
+    on the pod id label, `batch_size` pods per request and at most `concurrency` requests at the same time.
+    Pods which are unknown to the pod cache (or created without the pod id label) are deleted one by one.
+    Repeated deletions of a queued pod wait for the same result.
+    """
+
+    FLUSH_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+    def __init__(
+        self,
+        k8s_client: K8sClient,
+        namespace: str,
+        pod_cache: PodCache,
+        pod_id_label: str,
+        task_runner_service: TaskRunnerService,
+        config: PodDeletionConfig,
+        metrics_registry: CollectorRegistry,
+        instance_id: str,
+    ) -> None:
+        self.k8s_client = k8s_client
+        self.namespace = namespace
+        self.pod_cache = pod_cache
+        self.pod_id_label = pod_id_label
+        self.task_runner_service = task_runner_service
+        self.config = config
+        self.instance_id = instance_id
+
+        self.queue: collections.deque[str] = collections.deque()
+        # queued and in-flight deletions
+        self.pending: dict[str, asyncio.Future[None]] = {}
+        self._flush_scheduled = False
+        self._semaphore = asyncio.Semaphore(max(config.concurrency, 1))
+
+        self.queue_depth = Gauge(
+            "callisto_pod_deletion_queue_depth",
+            "Pods waiting for deletion",
+            ["instance_id"],
+            registry=metrics_registry,
+        )
+        self.flush_duration = Histogram(
+            "callisto_pod_deletion_flush_duration",
+            "Duration of pod deletion batches",
+            ["instance_id", "succeeded"],
+            buckets=self.FLUSH_BUCKETS,
+            registry=metrics_registry,
+        )
+
+    async def delete(self, name: str) -> None:
+        future = self.pending.get(name)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self.pending[name] = future
+            self.queue.append(name)
+            self._update_metrics()
+
+            if not self._flush_scheduled:
+                self._flush_scheduled = True
+                await self.task_runner_service.run_in_background(self._flush)
+
+        # the result is shared between callers, a cancelled caller must not cancel it for others
+        await asyncio.shield(future)
+
+    async def _flush(self) -> None:
+        await asyncio.sleep(self.config.flush_interval)
+        self._flush_scheduled = False
+
+        while self.queue:
+            batch = [self.queue.popleft() for _ in range(min(self.config.batch_size, len(self.queue)))]
+            self._update_metrics()
+
+            await self._semaphore.acquire()
+            await self.task_runner_service.run_in_background(partial(self._delete_batch, names=batch))
+
+    async def _delete_batch(self, names: list[str]) -> None:
+        start_time = time.monotonic()
+        errors: dict[str, BaseException | None] = {}
+
+        try:
+            pod_ids = {name: pod_id for name in names if (pod_id := self._get_pod_id(name)) is not None}
+            if pod_ids:
+                try:
+                    await self.k8s_client.delete_pods(
+                        namespace=self.namespace,
+                        label_selector=f"{self.pod_id_label} in ({','.join(pod_ids.values())})",
+                        grace_period_seconds=self.config.grace_period,
+                    )
+                except Exception as e:
+                    errors.update(dict.fromkeys(pod_ids, e))
+                else:
+                    errors.update(dict.fromkeys(pod_ids))
+
+            single_names = [name for name in names if name not in pod_ids]
+            results = await asyncio.gather(
+                *[
+                    self.k8s_client.delete_pod(
+                        namespace=self.namespace, name=name, grace_period_seconds=self.config.grace_period
+                    )
+                    for name in single_names
+                ],
+                return_exceptions=True,
+            )
+            for name, result in zip(single_names, results):
+                errors[name] = result if isinstance(result, BaseException) else None
+        finally:
+            self._semaphore.release()
+            succeeded = len(errors) == len(names) and not any(errors.values())
+            self.flush_duration.labels(instance_id=self.instance_id, succeeded=succeeded).observe(
+                time.monotonic() - start_time
+            )
+
+            for name in names:
+                future = self.pending.pop(name)
+                if name not in errors:
+                    # the batch was cancelled
+                    future.cancel()
+                elif errors[name] is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(t.cast(BaseException, errors[name]))
+                    # mark the exception as retrieved, callers get it from `delete`
+                    future.exception()
+
+        logger.debug(
+            "pods deleted",
+            extra=l_ctx(pods=len(names), failed=len([error for error in errors.values() if error is not None])),
+        )
+
+    def _get_pod_id(self, name: str) -> str | None:
+        pod = self.pod_cache.get(name)
+        if pod is None:
+            return None
+
+        return (pod.metadata.labels or {}).get(self.pod_id_label)
+
+    def _update_metrics(self) -> None:
+        self.queue_depth.labels(instance_id=self.instance_id).set(len(self.queue))
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import random
+import typing as t
+
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Histogram,
+)
+
+
+if t.TYPE_CHECKING:
+    from kubernetes_asyncio.client import V1Node  # type: ignore
+
+    from ...domains.config import ImageLocalityConfig
+
+
+DEFAULT_REGISTRY = "docker.io"
+DEFAULT_TAG = "latest"
+
+
+def normalize_image(image: str) -> str:
+    """Image reference as kubelet reports it, `selenoid/chrome` is `docker.io/selenoid/chrome:latest`"""
+    name, digest_separator, digest = image.partition("@")
+    # a colon before the last slash is a registry port, not a tag
+    if not digest_separator and ":" not in name.rsplit("/", 1)[-1]:
+        name = f"{name}:{DEFAULT_TAG}"
+
+    domain, slash, _ = name.partition("/")
+    if not slash:
+        name = f"{DEFAULT_REGISTRY}/library/{name}"
+    elif "." not in domain and ":" not in domain and domain != "localhost":
+        name = f"{DEFAULT_REGISTRY}/{name}"
+
+    return f"{name}{digest_separator}{digest}"
+
+
+class NodeImageCache:
+    """Images present on the nodes, kept up to date by a list+watch of nodes.
+    Only image names are kept, node objects are dropped.
+    """
+
+    def __init__(self) -> None:
+        self.node_images: dict[str, frozenset[str]] = {}
+        # image -> names of the nodes holding it
+        self.image_nodes: dict[str, set[str]] = {}
+        # names of the nodes which are not cordoned
+        self.schedulable_nodes: set[str] = set()
+        # resourceVersion to resume the watch from. `None` means a relist is needed
+        self.resource_version: str | None = None
+
+    @property
+    def synced(self) -> bool:
+        return self.resource_version is not None
+
+    def replace(self, nodes: t.Iterable[V1Node], resource_version: str) -> None:
+        self.node_images = {}
+        self.image_nodes = {}
+        self.schedulable_nodes = set()
+        for node in nodes:
+            self.set(node)
+        self.resource_version = resource_version
+
+    def set(self, node: V1Node) -> None:
+        node_name = node.metadata.name
+        images = self.get_node_images(node)
+        # node statuses are updated often, the images rarely change
+        if self.node_images.get(node_name) != images:
+            self.remove(node_name)
+            self.node_images[node_name] = images
+            for image in images:
+                self.image_nodes.setdefault(image, set()).add(node_name)
+
+        if node.spec is not None and node.spec.unschedulable:
+            self.schedulable_nodes.discard(node_name)
+        else:
+            self.schedulable_nodes.add(node_name)
+
+    def remove(self, node_name: str) -> None:
+        self.schedulable_nodes.discard(node_name)
+        for image in self.node_images.pop(node_name, ()):
+            nodes = self.image_nodes[image]
+            nodes.discard(node_name)
+            if not nodes:
+                del self.image_nodes[image]
+
+    def get_nodes(self, images: t.Iterable[str]) -> t.AbstractSet[str]:
+        """Names of the nodes holding all the images"""
+        node_sets = sorted((self.image_nodes.get(image, set()) for image in images), key=len)
+        if not node_sets:
+            return set()
+        return node_sets[0].intersection(*node_sets[1:])
+
+    def invalidate(self) -> None:
+        self.resource_version = None
+
+    @staticmethod
+    def get_node_images(node: V1Node) -> frozenset[str]:
+        images = node.status.images if node.status is not None else None
+        return frozenset(normalize_image(name) for image in images or [] for name in image.names or [])
+
+
+class ImageLocality:
+    """Prefers nodes which already hold the images of a pod, pulling browser images is the slowest part of startup.
+
+    The nodes a pod is steered to are remembered until the pod is Ready, then the placement is counted as
+    `local` (the pod landed on such a node), `remote` (it landed elsewhere) or `cold` (no node held the images),
+    and the readiness duration is observed by placement.
+    """
+
+    LOCAL_PLACEMENT = "local"
+    REMOTE_PLACEMENT = "remote"
+    COLD_PLACEMENT = "cold"
+    # pods which never become Ready are forgotten when there are more pending ones
+    MAX_PENDING_PODS = 10_000
+    BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300)
+
+    def __init__(self, config: ImageLocalityConfig, metrics_registry: CollectorRegistry, instance_id: str) -> None:
+        self.config = config
+        self.instance_id = instance_id
+        self.cache = NodeImageCache()
+        # pod id -> nodes holding the images when the pod was created
+        self.pending_pods: dict[str, frozenset[str]] = {}
+
+        self.placements = Counter(
+            "callisto_image_locality_placements_total",
+            "Ready pods by placement relative to the nodes holding their images",
+            ["instance_id", "placement"],
+            registry=metrics_registry,
+        )
+        self.ready_duration = Histogram(
+            "callisto_image_locality_pod_ready_duration_seconds",
+            "Time from pod creation to readiness by placement relative to the nodes holding the images",
+            ["instance_id", "placement"],
+            buckets=self.BUCKETS,
+            registry=metrics_registry,
+        )
+
+    @staticmethod
+    def get_spec_images(spec: dict[str, t.Any]) -> set[str]:
+        pod_spec = spec.get("spec") or {}
+        return {
+            normalize_image(container["image"])
+            for container in [*(pod_spec.get("initContainers") or []), *(pod_spec.get("containers") or [])]
+            if container.get("image")
+        }
+
+    def get_preferred_nodes(self, spec: dict[str, t.Any], pod_id: str) -> list[str]:
+        """Nodes holding the images of the pod spec, a random sample of at most `max_nodes` of them,
+        so pods are spread over the nodes holding the images.
+        No nodes are preferred if every schedulable node holds the images.
+        """
+        images = self.get_spec_images(spec)
+        if not images or not self.cache.synced:
+            return []
+
+        nodes = self.cache.get_nodes(images)
+        if len(self.pending_pods) >= self.MAX_PENDING_PODS:
+            del self.pending_pods[next(iter(self.pending_pods))]
+        self.pending_pods[pod_id] = frozenset(nodes)
+
+        if self.cache.schedulable_nodes <= nodes:
+            return []
+        return sorted(random.sample(sorted(nodes), min(len(nodes), self.config.max_nodes)))
+
+    def record(self, pod_id: str, node_name: str, ready_duration: float | None) -> None:
+        """Count the placement of a Ready pod created with `get_preferred_nodes`"""
+        nodes = self.pending_pods.pop(pod_id, None)
+        if nodes is None:
+            return
+
+        if not nodes:
+            placement = self.COLD_PLACEMENT
+        elif node_name in nodes:
+            placement = self.LOCAL_PLACEMENT
+        else:
+            placement = self.REMOTE_PLACEMENT
+
+        self.placements.labels(instance_id=self.instance_id, placement=placement).inc()
+        if ready_duration is not None:
+            self.ready_duration.labels(instance_id=self.instance_id, placement=placement).observe(ready_duration)
+
+    def forget(self, pod_id: str) -> None:
+        self.pending_pods.pop(pod_id, None)
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import statistics
+import time
+import typing as t
+
+from prometheus_client import CollectorRegistry, Gauge
+
+from ..log import l_ctx, logger
+
+
+if t.TYPE_CHECKING:
+    from ...domains.config import NodeAvoidanceConfig
+
+
+class _NodeEstimate:
+    __slots__ = ("samples", "latency_sum", "latency_samples", "failures", "updated_at")
+
+    def __init__(self, updated_at: float) -> None:
+        # decayed sums of observations
+        self.samples = 0.0
+        self.latency_sum = 0.0
+        self.latency_samples = 0.0
+        self.failures = 0.0
+        self.updated_at = updated_at
+
+    def decay(self, factor: float) -> None:
+        self.samples *= factor
+        self.latency_sum *= factor
+        self.latency_samples *= factor
+        self.failures *= factor
+
+    @property
+    def latency(self) -> float | None:
+        return self.latency_sum / self.latency_samples if self.latency_samples else None
+
+    @property
+    def failure_ratio(self) -> float:
+        return self.failures / self.samples if self.samples else 0
+
+
+class NodeStats:
+    """Rolling pod startup latency and readiness failure estimates of nodes.
+
+    Every observation loses half of its weight each `half_life` seconds, so a node is judged by its recent pods
+    and an avoided node, which gets no new pods, drops below `min_samples` and is trusted again.
+    The avoided nodes are the worst ones of the nodes with at least `min_samples` observations
+    whose mean startup latency exceeds the median of these nodes by `latency_factor`,
+    or whose failure ratio exceeds `max_failure_ratio`.
+    """
+
+    # nodes with less weight are forgotten
+    MIN_WEIGHT = 0.05
+    # avoided nodes are recomputed at most this often, in seconds
+    REFRESH_INTERVAL = 10
+
+    def __init__(self, config: NodeAvoidanceConfig, metrics_registry: CollectorRegistry, instance_id: str) -> None:
+        self.config = config
+        self.instance_id = instance_id
+        self.nodes: dict[str, _NodeEstimate] = {}
+        self.avoided_nodes: list[str] = []
+        self.refreshed_at: float | None = None
+
+        self.node_latency = Gauge(
+            "callisto_node_pod_startup_latency_seconds",
+            "Decayed mean time from pod scheduling to readiness on a node",
+            ["instance_id", "node"],
+            registry=metrics_registry,
+        )
+        self.node_failure_ratio = Gauge(
+            "callisto_node_pod_failure_ratio",
+            "Decayed share of pods on a node which failed to become Ready",
+            ["instance_id", "node"],
+            registry=metrics_registry,
+        )
+        self.avoided_nodes_number = Gauge(
+            "callisto_avoided_nodes",
+            "Nodes avoided by the node anti-affinity of new pods",
+            ["instance_id"],
+            registry=metrics_registry,
+        )
+
+    def record(self, node_name: str, latency: float | None) -> None:
+        """Record a pod startup on the node, `None` latency is a readiness failure"""
+        now = time.monotonic()
+        estimate = self._get_estimate(node_name, now)
+
+        estimate.samples += 1
+        if latency is None:
+            estimate.failures += 1
+        else:
+            estimate.latency_sum += latency
+            estimate.latency_samples += 1
+
+        if estimate.latency is not None:
+            self.node_latency.labels(instance_id=self.instance_id, node=node_name).set(estimate.latency)
+        self.node_failure_ratio.labels(instance_id=self.instance_id, node=node_name).set(estimate.failure_ratio)
+        # the next spec reflects the observation
+        self.refreshed_at = None
+
+    def get_avoided_nodes(self) -> list[str]:
+        now = time.monotonic()
+        if self.refreshed_at is None or now - self.refreshed_at > self.REFRESH_INTERVAL:
+            self._refresh(now)
+
+        return self.avoided_nodes
+
+    def _get_estimate(self, node_name: str, now: float) -> _NodeEstimate:
+        estimate = self.nodes.get(node_name)
+        if estimate is None:
+            estimate = self.nodes[node_name] = _NodeEstimate(updated_at=now)
+        else:
+            self._decay(estimate, now)
+        return estimate
+
+    def _decay(self, estimate: _NodeEstimate, now: float) -> None:
+        estimate.decay(0.5 ** ((now - estimate.updated_at) / self.config.half_life))
+        estimate.updated_at = now
+
+    def _refresh(self, now: float) -> None:
+        for node_name, estimate in list(self.nodes.items()):
+            self._decay(estimate, now)
+            if estimate.samples < self.MIN_WEIGHT:
+                del self.nodes[node_name]
+                self.node_latency.remove(self.instance_id, node_name)
+                self.node_failure_ratio.remove(self.instance_id, node_name)
+
+        trusted = {
+            node_name: estimate
+            for node_name, estimate in self.nodes.items()
+            if estimate.samples >= self.config.min_samples
+        }
+        latencies = [estimate.latency for estimate in trusted.values() if estimate.latency is not None]
+        median_latency = statistics.median(latencies) if latencies else None
+
+        # (failing, badness, node name): failing nodes go first, then the slowest
+        outliers: list[tuple[float, float, str]] = []
+        for node_name, estimate in trusted.items():
+            latency = estimate.latency
+            if estimate.failure_ratio > self.config.max_failure_ratio:
+                outliers.append((1, estimate.failure_ratio, node_name))
+            elif latency is not None and median_latency and latency > median_latency * self.config.latency_factor:
+                outliers.append((0, latency / median_latency, node_name))
+
+        avoided_nodes = [node_name for _, _, node_name in sorted(outliers, reverse=True)[: self.config.max_nodes]]
+        if avoided_nodes != self.avoided_nodes:
+            logger.info("avoided nodes changed", extra=l_ctx(nodes=avoided_nodes, median_latency=median_latency))
+
+        self.avoided_nodes = avoided_nodes
+        self.refreshed_at = now
+        self.avoided_nodes_number.labels(instance_id=self.instance_id).set(len(avoided_nodes))
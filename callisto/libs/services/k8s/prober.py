@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import typing as t
+
+from prometheus_client import (
+    CollectorRegistry,
+    Gauge,
+    Histogram,
+)
+
+from ..log import l_ctx, logger
+from .circuit_breaker import CircuitState
+
+
+if t.TYPE_CHECKING:
+    from ..task_runner import TaskRunnerService
+    from .service import K8sService
+
+
+class K8sApiProber:
+    """Probes kube-api availability in background, so scrapes of `/metrics` never call kube-api.
+    If probing is disabled, the availability is the state of the kube-api circuit breaker at scrape time.
+    """
+
+    BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(
+        self,
+        k8s_service: K8sService,
+        task_runner_service: TaskRunnerService,
+        interval: float,
+        metrics_registry: CollectorRegistry,
+        instance_id: str,
+    ) -> None:
+        self.k8s_service = k8s_service
+        self.task_runner_service = task_runner_service
+        self.interval = interval
+        self.instance_id = instance_id
+
+        self.k8s_api_available = Gauge(
+            "callisto_k8s_api_available",
+            "Availability of K8s api",
+            ["instance_id"],
+            registry=metrics_registry,
+        )
+        self.probe_duration = Histogram(
+            "callisto_k8s_api_probe_duration_seconds",
+            "Duration of kube-api availability probes",
+            ["instance_id"],
+            buckets=self.BUCKETS,
+            registry=metrics_registry,
+        )
+        if interval > 0:
+            # unavailable until the first probe
+            self.k8s_api_available.labels(instance_id=self.instance_id).set(0)
+        else:
+            self.k8s_api_available.labels(instance_id=self.instance_id).set_function(self.get_circuit_availability)
+
+    def get_circuit_availability(self) -> int:
+        return int(self.k8s_service.k8s_client.circuit_breaker.get_state() != CircuitState.OPEN)
+
+    async def run_background_tasks(self) -> None:
+        if self.interval > 0:
+            await self.task_runner_service.run_in_background(self.probe_k8s_api)
+
+    async def probe_k8s_api(self) -> None:
+        while True:
+            await self.probe()
+            await asyncio.sleep(self.interval)
+
+    async def probe(self) -> bool:
+        start_time = time.monotonic()
+        try:
+            # a probe hanging longer than the interval is a failed one
+            available = await asyncio.wait_for(self.k8s_service.api_is_available(), timeout=self.interval or None)
+        except asyncio.TimeoutError:
+            logger.warning("k8s api probe timed out", extra=l_ctx(timeout=self.interval))
+            available = False
+
+        self.probe_duration.labels(instance_id=self.instance_id).observe(time.monotonic() - start_time)
+        self.k8s_api_available.labels(instance_id=self.instance_id).set(int(available))
+        return available
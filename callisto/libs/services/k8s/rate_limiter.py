@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+import typing as t
+from enum import IntEnum
+
+from prometheus_client import CollectorRegistry, Histogram
+
+
+if t.TYPE_CHECKING:
+    from ...domains.config import K8sRateLimitConfig, RateLimit
+
+
+class Lane(IntEnum):
+    """Priority lanes, waiting calls of a lower value are served first"""
+
+    # calls which a session request is waiting for
+    USER = 0
+    # pool refills, deletions, relists, garbage collection
+    BACKGROUND = 1
+
+
+class TokenBucket:
+    """Token bucket which serves waiters by lane, then in arrival order. A non-positive `qps` disables the limit"""
+
+    def __init__(self, qps: float, burst: int) -> None:
+        self.qps = qps
+        self.burst = max(burst, 1)
+        self.tokens = float(self.burst)
+        self.updated_at = time.monotonic()
+        self.waiters: list[tuple[Lane, int, asyncio.Future[None]]] = []
+        self._counter = itertools.count()
+        self._wakeup: asyncio.TimerHandle | None = None
+
+    @property
+    def unlimited(self) -> bool:
+        return self.qps <= 0
+
+    async def acquire(self, lane: Lane) -> None:
+        if self.unlimited:
+            return
+
+        self._refill()
+        if not self.waiters and self.tokens >= 1:
+            self.tokens -= 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiters, (lane, next(self._counter), future))
+        self._schedule_wakeup()
+        # a cancelled waiter stays in the heap and is skipped on wakeup
+        await future
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.qps)
+        self.updated_at = now
+
+    def _schedule_wakeup(self) -> None:
+        if self._wakeup is None:
+            delay = max(1 - self.tokens, 0) / self.qps
+            self._wakeup = asyncio.get_running_loop().call_later(delay, self._wake_up)
+
+    def _wake_up(self) -> None:
+        self._wakeup = None
+        self._refill()
+
+        while self.waiters and self.tokens >= 1:
+            _, _, future = heapq.heappop(self.waiters)
+            if not future.done():
+                self.tokens -= 1
+                future.set_result(None)
+
+        if self.waiters:
+            self._schedule_wakeup()
+
+
+class K8sRateLimiter:
+    """Client-side limits of kube-api calls: a QPS/burst budget per verb and a total budget shared by all verbs.
+    Both budgets serve user-facing calls before background ones.
+    """
+
+    WAIT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+    def __init__(self, config: K8sRateLimitConfig, metrics_registry: CollectorRegistry, instance_id: str) -> None:
+        self.instance_id = instance_id
+        self.total = self._make_bucket(config.total)
+        self.verbs = {verb: self._make_bucket(limit) for verb, limit in config.verbs.items()}
+
+        self.wait_duration = Histogram(
+            "callisto_k8s_rate_limiter_wait",
+            "Time kube-api calls waited for the client-side rate limiter",
+            ["instance_id", "verb", "lane"],
+            buckets=self.WAIT_BUCKETS,
+            registry=metrics_registry,
+        )
+
+    @staticmethod
+    def _make_bucket(limit: RateLimit) -> TokenBucket:
+        return TokenBucket(qps=limit.qps, burst=limit.burst)
+
+    async def acquire(self, verb: str, lane: Lane) -> None:
+        bucket = self.verbs.get(verb)
+        if self.total.unlimited and (bucket is None or bucket.unlimited):
+            return
+
+        start_time = time.monotonic()
+        if bucket is not None:
+            await bucket.acquire(lane)
+        await self.total.acquire(lane)
+
+        self.wait_duration.labels(instance_id=self.instance_id, verb=verb, lane=lane.name.lower()).observe(
+            time.monotonic() - start_time
+        )
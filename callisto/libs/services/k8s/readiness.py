@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import asyncio
+import collections
+import time
+
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+)
+
+from ...exceptions import K8sPodNotReady
+
+
+class _Entry:
+    __slots__ = ("future", "waiters", "created_at")
+
+    def __init__(self, future: asyncio.Future[None], created_at: float) -> None:
+        self.future = future
+        self.waiters = 0
+        self.created_at = created_at
+
+
+class PodReadinessRegistry:
+    """Readiness outcomes of pods somebody waits for.
+
+    An entry lives while it has waiters: the result is set by the pod watch (Ready, failed or deleted)
+    and shared by all waiters of the pod. Pods nobody waits for are not registered.
+    Entries older than `ttl` and the oldest entries above `MAX_SIZE` are evicted, their waiters are failed.
+    """
+
+    MAX_SIZE = 10_000
+    EVICTED_REASON = "Evicted"
+
+    def __init__(self, ttl: float, metrics_registry: CollectorRegistry, instance_id: str) -> None:
+        self.ttl = ttl
+        self.instance_id = instance_id
+        # in creation order, so expired entries are at the head
+        self.entries: collections.OrderedDict[str, _Entry] = collections.OrderedDict()
+
+        self.size = Gauge(
+            "callisto_pod_readiness_registry_size",
+            "Pods waited for readiness",
+            ["instance_id"],
+            registry=metrics_registry,
+        )
+        self.evictions = Counter(
+            "callisto_pod_readiness_registry_evictions_total",
+            "Readiness waits evicted from the registry",
+            ["instance_id", "reason"],
+            registry=metrics_registry,
+        )
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def pod_names(self) -> list[str]:
+        return list(self.entries)
+
+    def is_pending(self, pod_name: str) -> bool:
+        entry = self.entries.get(pod_name)
+        return entry is not None and not entry.future.done()
+
+    def acquire(self, pod_name: str) -> asyncio.Future[None]:
+        """Register a waiter of the pod, every `acquire` must be followed by `release`"""
+        now = time.monotonic()
+        self._evict(now)
+
+        entry = self.entries.get(pod_name)
+        if entry is None:
+            entry = _Entry(asyncio.get_running_loop().create_future(), created_at=now)
+            self.entries[pod_name] = entry
+            self._update_metrics()
+
+        entry.waiters += 1
+        return entry.future
+
+    def release(self, pod_name: str) -> None:
+        entry = self.entries.get(pod_name)
+        if entry is None:
+            return
+
+        entry.waiters -= 1
+        if entry.waiters <= 0:
+            del self.entries[pod_name]
+            self._update_metrics()
+
+    def set_ready(self, pod_name: str) -> None:
+        entry = self.entries.get(pod_name)
+        if entry is not None and not entry.future.done():
+            entry.future.set_result(None)
+
+    def set_failed(self, pod_name: str, error: K8sPodNotReady) -> None:
+        entry = self.entries.get(pod_name)
+        if entry is not None and not entry.future.done():
+            self._fail(entry, error)
+
+    def _evict(self, now: float) -> None:
+        while self.entries:
+            pod_name, entry = next(iter(self.entries.items()))
+            if now - entry.created_at > self.ttl:
+                reason = "ttl"
+            elif len(self.entries) >= self.MAX_SIZE:
+                reason = "size"
+            else:
+                break
+
+            del self.entries[pod_name]
+            self.evictions.labels(instance_id=self.instance_id, reason=reason).inc()
+            if not entry.future.done():
+                self._fail(
+                    entry, K8sPodNotReady(f"Readiness wait of pod `{pod_name}` is evicted", reason=self.EVICTED_REASON)
+                )
+
+        self._update_metrics()
+
+    @staticmethod
+    def _fail(entry: _Entry, error: K8sPodNotReady) -> None:
+        entry.future.set_exception(error)
+        # mark the exception as retrieved, waiters get it from the shielded future
+        entry.future.exception()
+
+    def _update_metrics(self) -> None:
+        self.size.labels(instance_id=self.instance_id).set(len(self.entries))
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+import dataclasses as dc
+import logging
+import random
+import typing as t
+from http import HTTPStatus
+
+import tenacity as tnc
+from aiohttp import ClientError
+from kubernetes_asyncio.client.rest import ApiException  # type: ignore
+from prometheus_client import CollectorRegistry, Counter
+from tenacity.stop import stop_base
+
+from ..log import logger
+
+
+T = t.TypeVar("T")
+
+
+@dc.dataclass(frozen=True)
+class RetryPolicy:
+    attempts: int
+    # exponential backoff with full jitter: random pause up to `backoff * 2 ** attempt`, at most `max_backoff`
+    backoff: float
+    max_backoff: float
+    # no attempt is started after the deadline
+    deadline: float
+
+
+class stop_before_deadline(stop_base):
+    """Stop if the next attempt would start after the deadline"""
+
+    def __init__(self, deadline: float) -> None:
+        self.deadline = deadline
+
+    def __call__(self, retry_state: tnc.RetryCallState) -> bool:
+        return t.cast(float, retry_state.seconds_since_start) + retry_state.upcoming_sleep > self.deadline
+
+
+class K8sRetry:
+    """Retries kube-api calls by the policy of the operation.
+
+    Connection errors, timeouts, 5xx, 409 and 429 are retried, other 4xx fail immediately.
+    `Retry-After` of the response is used as the minimal pause.
+    """
+
+    POLICIES = {
+        # session requests wait for these
+        "create": RetryPolicy(attempts=5, backoff=0.2, max_backoff=5, deadline=30),
+        "get": RetryPolicy(attempts=4, backoff=0.1, max_backoff=2, deadline=10),
+        "logs": RetryPolicy(attempts=3, backoff=0.2, max_backoff=2, deadline=10),
+        # background calls
+        "patch": RetryPolicy(attempts=5, backoff=0.2, max_backoff=5, deadline=30),
+        "delete": RetryPolicy(attempts=8, backoff=0.5, max_backoff=15, deadline=120),
+        "list": RetryPolicy(attempts=6, backoff=0.5, max_backoff=10, deadline=60),
+        # pauses between watch reconnections, the watch itself is restarted forever
+        "watch": RetryPolicy(attempts=0, backoff=0.5, max_backoff=30, deadline=0),
+    }
+    RETRY_STATUSES = (HTTPStatus.CONFLICT, HTTPStatus.TOO_MANY_REQUESTS)
+
+    def __init__(self, metrics_registry: CollectorRegistry, instance_id: str) -> None:
+        self.instance_id = instance_id
+
+        self.retries = Counter(
+            "callisto_k8s_retries_total",
+            "Retried kube-api calls",
+            ["instance_id", "operation"],
+            registry=metrics_registry,
+        )
+        self.retry_pauses = Counter(
+            "callisto_k8s_retry_pauses_seconds_total",
+            "Time spent in pauses between kube-api call retries",
+            ["instance_id", "operation"],
+            registry=metrics_registry,
+        )
+
+    async def call(self, operation: str, func: t.Callable[..., t.Awaitable[T]], **kwargs: t.Any) -> T:
+        policy = self.POLICIES[operation]
+
+        def record_retry(retry_state: tnc.RetryCallState) -> None:
+            self.retries.labels(instance_id=self.instance_id, operation=operation).inc()
+            self.retry_pauses.labels(instance_id=self.instance_id, operation=operation).inc(retry_state.upcoming_sleep)
+            logger.debug(
+                f"retrying k8s {operation} in {retry_state.upcoming_sleep:.2f}s: "
+                f"{t.cast(tnc.Future, retry_state.outcome).exception()!r}"
+            )
+
+        return await tnc.AsyncRetrying(
+            wait=self._wait(policy),
+            stop=tnc.stop_after_attempt(policy.attempts) | stop_before_deadline(policy.deadline),
+            retry=tnc.retry_if_exception(self.is_retryable),
+            reraise=True,
+            before_sleep=record_retry,
+            after=tnc.after_log(t.cast(logging.Logger, logger), logging.DEBUG),
+        )(func, **kwargs)
+
+    def get_pause(self, operation: str, attempt: int) -> float:
+        """Pause after the failed `attempt` (starting from 1) of an operation which is retried by the caller"""
+        policy = self.POLICIES[operation]
+        return random.uniform(0, min(policy.backoff * 2**attempt, policy.max_backoff))
+
+    @classmethod
+    def is_retryable(cls, e: BaseException) -> bool:
+        if isinstance(e, ApiException):
+            # status is 0 if there was no response
+            return not e.status or e.status >= HTTPStatus.INTERNAL_SERVER_ERROR or e.status in cls.RETRY_STATUSES
+        return isinstance(e, (ClientError, asyncio.TimeoutError))
+
+    @staticmethod
+    def get_retry_after(e: BaseException | None) -> float | None:
+        headers = getattr(e, "headers", None) if isinstance(e, ApiException) else None
+        if not headers or headers.get("Retry-After") is None:
+            return None
+
+        try:
+            return float(headers["Retry-After"])
+        except ValueError:
+            # HTTP-date form is not sent by kube-api
+            return None
+
+    def _wait(self, policy: RetryPolicy) -> t.Callable[[tnc.RetryCallState], float]:
+        backoff = tnc.wait_random_exponential(multiplier=policy.backoff, max=policy.max_backoff)
+
+        def wait(retry_state: tnc.RetryCallState) -> float:
+            retry_after = self.get_retry_after(t.cast(tnc.Future, retry_state.outcome).exception())
+            return max(backoff(retry_state), retry_after or 0)
+
+        return wait
@@ -1,39 +1,162 @@
 from __future__ import annotations
 
 import asyncio
+import copy
+import hashlib
+import json
 import typing as t
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from functools import partial
 
 from aiohttp import StreamReader
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Histogram,
+)
 from sentry_sdk import capture_exception
 
-from ...exceptions import K8SEmptyPodIp
-from ..log import logger
-from ..pod_event import PodEventService
+from ...exceptions import (
+    K8SEmptyPodIp,
+    K8sPodNotReady,
+    K8sWatchExpired,
+)
+from ..log import l_ctx, logger
 from ..task_runner import TaskRunnerService
-from .client import K8sClient
+from .cache import PodCache
+from .circuit_breaker import CircuitState
+from .client import DELETED_EVENT_TYPE, K8sClient
+from .deletion import PodDeletionQueue
+from .images import ImageLocality
+from .node_stats import NodeStats
+from .rate_limiter import Lane
+from .readiness import PodReadinessRegistry
+from .timeline import PodTimeline
 
 
 if t.TYPE_CHECKING:
-    from kubernetes_asyncio.client import V1Pod, V1Status  # type: ignore
+    from kubernetes_asyncio.client import V1DaemonSet, V1Pod  # type: ignore
+
+    from ...domains.config import (
+        ImageLocalityConfig,
+        NodeAvoidanceConfig,
+        PodDeletionConfig,
+        PodReadinessConfig,
+    )
+
+
+QUANTITY_SUFFIXES = {
+    # binary suffixes go first, `Mi` must not be parsed as `M`
+    **{suffix: Decimal(1024) ** power for power, suffix in enumerate(("Ki", "Mi", "Gi", "Ti", "Pi", "Ei"), start=1)},
+    **{suffix: Decimal(1000) ** power for power, suffix in enumerate(("k", "M", "G", "T", "P", "E"), start=1)},
+    "m": Decimal("0.001"),
+}
 
 
 class K8sService:
+    MANAGED_BY_LABEL = "app.kubernetes.io/managed-by"
+    MANAGED_BY_VALUE = "callisto"
+    INSTANCE_ID_LABEL = "callisto/instance-id"
+    MANIFEST_HASH_LABEL = "callisto/manifest-hash"
+    # unique per pod, pod names are generated by K8s, so batched deletions select pods by this label
+    POD_ID_LABEL = "callisto/pod-id"
+    HOSTNAME_LABEL = "kubernetes.io/hostname"
+    # the weight of the preference against slow nodes, the maximum one, it outweighs image locality
+    NODE_AVOIDANCE_WEIGHT = 100
+    # pods in these phases never become Ready
+    TERMINAL_PHASES = ("Failed", "Succeeded")
+    READINESS_TIMEOUT_REASON = "ReadinessTimeout"
+    DELETED_REASON = "Deleted"
+    UNSCHEDULABLE_REASON = "Unschedulable"
+    # readiness failures caused by the node rather than by the image, the manifest, an eviction or a deletion
+    NODE_FAILURE_REASONS = frozenset({"CrashLoopBackOff", "RunContainerError", "CreateContainerError"})
+    UNKNOWN_NODE_POOL = "unknown"
+    NODE_POOL_CACHE_SIZE = 10_000
+    STARTUP_PHASE_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300)
+    # readiness waits outliving the readiness timeout by this number of seconds are evicted
+    READINESS_WAIT_GRACE = 60
+
     def __init__(
         self,
         k8s_client: K8sClient,
         namespace: str,
-        pod_event_service: PodEventService,
         task_runner_service: TaskRunnerService,
+        instance_id: str,
+        deletion_config: PodDeletionConfig,
+        readiness_config: PodReadinessConfig,
+        node_avoidance_config: NodeAvoidanceConfig,
+        image_locality_config: ImageLocalityConfig,
+        metrics_registry: CollectorRegistry,
+        pod_field_selector: str | None = None,
+        node_pool_label: str | None = None,
     ) -> None:
         self.k8s_client = k8s_client
         self.namespace = namespace
-        self.pod_event_service = pod_event_service
         self.task_runner_service = task_runner_service
+        self.instance_id = instance_id
+        self.readiness_config = readiness_config
+        self.pod_cache = PodCache()
+        self.deletion_queue = PodDeletionQueue(
+            k8s_client=k8s_client,
+            namespace=namespace,
+            pod_cache=self.pod_cache,
+            pod_id_label=self.POD_ID_LABEL,
+            task_runner_service=task_runner_service,
+            config=deletion_config,
+            metrics_registry=metrics_registry,
+            instance_id=instance_id,
+        )
+
+        self.readiness_failures = Counter(
+            "callisto_pod_readiness_failures_total",
+            "Pods which failed to become Ready",
+            ["instance_id", "reason"],
+            registry=metrics_registry,
+        )
+        self.readiness_registry = PodReadinessRegistry(
+            ttl=readiness_config.timeout + self.READINESS_WAIT_GRACE,
+            metrics_registry=metrics_registry,
+            instance_id=instance_id,
+        )
+        # pod name -> recheck of a waited unschedulable pod once it is old enough to fail, one per pod
+        self.unschedulable_rechecks: dict[str, asyncio.TimerHandle] = {}
+        self.startup_phase_duration = Histogram(
+            "callisto_pod_startup_phase_duration_seconds",
+            "Duration of pod startup phases derived from pod conditions and container states",
+            ["instance_id", "phase", "node_pool"],
+            buckets=self.STARTUP_PHASE_BUCKETS,
+            registry=metrics_registry,
+        )
+        self.node_avoidance_config = node_avoidance_config
+        self.node_stats = NodeStats(
+            config=node_avoidance_config, metrics_registry=metrics_registry, instance_id=instance_id
+        )
+        self.image_locality_config = image_locality_config
+        self.image_locality = ImageLocality(
+            config=image_locality_config, metrics_registry=metrics_registry, instance_id=instance_id
+        )
+
+        self.node_pool_label = node_pool_label
+        # node name -> node pool, nodes come and go with autoscaling
+        self.node_pools: dict[str, str] = {}
+
+        # list/watch only pods created by this callisto instance, every replica owns its shard of pods
+        self.pod_label_selector = (
+            f"{self.MANAGED_BY_LABEL}={self.MANAGED_BY_VALUE},{self.INSTANCE_ID_LABEL}={self.instance_id}"
+        )
+        self.pod_field_selector = pod_field_selector
 
     async def run_background_tasks(self) -> None:
-        await self.task_runner_service.run_in_background(self.watch_ready_pods)
+        await self.task_runner_service.run_in_background(self.watch_pods)
+        if self.image_locality_config.enabled:
+            await self.task_runner_service.run_in_background(self.watch_nodes)
 
     async def api_is_available(self) -> bool:
+        if self.k8s_client.circuit_breaker.get_state() == CircuitState.OPEN:
+            return False
+
         try:
             await self.k8s_client.get_api_versions()
         except Exception as e:
@@ -43,34 +166,366 @@ class K8sService:
             return True
 
     async def get_pod(self, name: str) -> V1Pod:
-        return await self.k8s_client.get_pod(namespace=self.namespace, name=name)
+        pod = self.pod_cache.get(name)
+        if pod is None:
+            # the watch may not have delivered the pod yet
+            pod = await self.k8s_client.get_pod(namespace=self.namespace, name=name)
+
+        return pod
+
+    async def get_pod_owner(self, name: str) -> str | None:
+        """Instance id of the callisto replica which created the pod"""
+        pod = self.pod_cache.get(name)
+        if pod is None:
+            # pods of the other replicas are not watched
+            pod = await self.k8s_client.get_pod(namespace=self.namespace, name=name)
+
+        return (pod.metadata.labels or {}).get(self.INSTANCE_ID_LABEL)
+
+    async def create_pod(self, spec: dict[str, t.Any], lane: Lane = Lane.USER) -> V1Pod:
+        return await self.k8s_client.create_pod(namespace=self.namespace, spec=self.label_pod_spec(spec), lane=lane)
+
+    @staticmethod
+    def get_manifest_hash(spec: dict[str, t.Any]) -> str:
+        return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:16]
+
+    def label_pod_spec(self, spec: dict[str, t.Any]) -> dict[str, t.Any]:
+        manifest_hash = self.get_manifest_hash(spec)
+
+        # stamp callisto labels on a copy, the manifest is shared between requests
+        spec = copy.deepcopy(spec)
+        labels = spec.setdefault("metadata", {}).setdefault("labels", {})
+        pod_id = uuid.uuid4().hex
+        labels.update(
+            {
+                self.MANAGED_BY_LABEL: self.MANAGED_BY_VALUE,
+                self.INSTANCE_ID_LABEL: self.instance_id,
+                self.MANIFEST_HASH_LABEL: manifest_hash,
+                self.POD_ID_LABEL: pod_id,
+            }
+        )
+
+        if self.node_avoidance_config.enabled:
+            avoided_nodes = self.node_stats.get_avoided_nodes()
+            if avoided_nodes:
+                self.prefer_nodes(spec, self.NODE_AVOIDANCE_WEIGHT, "NotIn", avoided_nodes)
+        if self.image_locality_config.enabled:
+            image_nodes = self.image_locality.get_preferred_nodes(spec, pod_id=pod_id)
+            if image_nodes:
+                self.prefer_nodes(spec, self.image_locality_config.weight, "In", image_nodes)
+        return spec
+
+    @classmethod
+    def prefer_nodes(cls, spec: dict[str, t.Any], weight: int, operator: str, node_names: list[str]) -> None:
+        """Add a preferred node affinity (`In`) or anti-affinity (`NotIn`) by node name.
+        The scheduler still uses other nodes if no preferred node fits.
+        """
+        pod_spec = spec.setdefault("spec", {})
+        node_affinity = pod_spec.setdefault("affinity", {}).setdefault("nodeAffinity", {})
+        node_affinity.setdefault("preferredDuringSchedulingIgnoredDuringExecution", []).append(
+            {
+                "weight": weight,
+                "preference": {
+                    "matchExpressions": [{"key": cls.HOSTNAME_LABEL, "operator": operator, "values": node_names}]
+                },
+            }
+        )
+
+    async def delete_pod(self, name: str) -> None:
+        await self.deletion_queue.delete(name)
+
+    async def annotate_pod(self, name: str, annotations: dict[str, str | None]) -> None:
+        """Merge annotations into the pod, `None` removes an annotation"""
+        await self.k8s_client.patch_pod(
+            namespace=self.namespace, name=name, body={"metadata": {"annotations": annotations}}
+        )
 
-    async def create_pod(self, spec: dict[str, t.Any]) -> V1Pod:
-        return await self.k8s_client.create_pod(namespace=self.namespace, spec=spec)
+    async def list_instance_pods(self) -> list[V1Pod]:
+        """Pods created by this callisto instance, read from the API server"""
+        pod_list = await self.k8s_client.list_pods(
+            namespace=self.namespace,
+            label_selector=self.pod_label_selector,
+            field_selector=self.pod_field_selector,
+        )
+        return pod_list.items
 
-    async def delete_pod(self, name: str) -> V1Status:
-        return await self.k8s_client.delete_pod(namespace=self.namespace, name=name)
+    async def list_pods(self, label_selector: str) -> list[V1Pod]:
+        """Any pods of the namespace, read from the API server"""
+        pod_list = await self.k8s_client.list_pods(namespace=self.namespace, label_selector=label_selector)
+        return pod_list.items
+
+    async def get_daemon_set(self, name: str) -> V1DaemonSet | None:
+        return await self.k8s_client.get_daemon_set(namespace=self.namespace, name=name)
+
+    async def create_daemon_set(self, spec: dict[str, t.Any]) -> V1DaemonSet:
+        return await self.k8s_client.create_daemon_set(namespace=self.namespace, body=spec)
+
+    async def patch_daemon_set(self, name: str, patch: list[dict[str, t.Any]]) -> V1DaemonSet:
+        return await self.k8s_client.patch_daemon_set(namespace=self.namespace, name=name, body=patch)
+
+    async def watch_pods(self) -> None:
+        failures = 0
 
-    async def watch_ready_pods(self) -> None:
         while True:
             try:
-                async for pod_name in self.k8s_client.watch_pod_ready_events(namespace=self.namespace):
-                    # pod_name is unique
-                    # We set generateName property for pod manifest, so K8s guarantees it will be unique
-                    event = self.pod_event_service.get_or_create_event(pod_name)
-                    event.set()
+                if not self.pod_cache.synced:
+                    await self._list_pods()
+
+                async for event_type, pod, resource_version in self.k8s_client.watch_pod_events(
+                    namespace=self.namespace,
+                    resource_version=t.cast(str, self.pod_cache.resource_version),
+                    label_selector=self.pod_label_selector,
+                    field_selector=self.pod_field_selector,
+                ):
+                    if pod is not None:
+                        self._handle_pod_event(event_type, pod)
+                    self.pod_cache.resource_version = resource_version
+                    failures = 0
             except asyncio.CancelledError:
                 raise
+            except K8sWatchExpired as e:
+                logger.info("pod watch expired, relisting", extra=l_ctx(reason=str(e)))
+                self.pod_cache.invalidate()
             except Exception as e:
                 logger.exception(e)
                 capture_exception(e)
 
-                await asyncio.sleep(1)  # here we are polling k8s API with a certain interval
+                failures += 1
+                await asyncio.sleep(self.k8s_client.retry.get_pause("watch", failures))
+
+    async def _list_pods(self) -> None:
+        pod_list = await self.k8s_client.list_pods(
+            namespace=self.namespace, label_selector=self.pod_label_selector, field_selector=self.pod_field_selector
+        )
+        self.pod_cache.replace(pod_list.items, resource_version=pod_list.metadata.resource_version)
+        logger.debug("pod cache synced", extra=l_ctx(pods=len(pod_list.items)))
+
+        # pods could become ready or fail while the watch was broken
+        for pod_name in self.readiness_registry.pod_names():
+            pod = self.pod_cache.get(pod_name)
+            if pod is not None:
+                self._notify_waiters(pod)
+
+    async def watch_nodes(self) -> None:
+        """Keep the images of the nodes for image locality, the service account needs `list` and `watch` for nodes"""
+        node_images = self.image_locality.cache
+        failures = 0
+
+        while True:
+            try:
+                if not node_images.synced:
+                    node_list = await self.k8s_client.list_nodes()
+                    node_images.replace(node_list.items, resource_version=node_list.metadata.resource_version)
+                    logger.debug("node images synced", extra=l_ctx(nodes=len(node_list.items)))
+
+                async for event_type, node, resource_version in self.k8s_client.watch_node_events(
+                    resource_version=t.cast(str, node_images.resource_version)
+                ):
+                    if node is not None:
+                        if event_type == DELETED_EVENT_TYPE:
+                            node_images.remove(node.metadata.name)
+                        else:
+                            node_images.set(node)
+                    node_images.resource_version = resource_version
+                    failures = 0
+            except asyncio.CancelledError:
+                raise
+            except K8sWatchExpired as e:
+                logger.info("node watch expired, relisting", extra=l_ctx(reason=str(e)))
+                node_images.invalidate()
+            except Exception as e:
+                logger.exception(e)
+                capture_exception(e)
+
+                failures += 1
+                await asyncio.sleep(self.k8s_client.retry.get_pause("watch", failures))
+
+    def _handle_pod_event(self, event_type: str, pod: V1Pod) -> None:
+        if event_type == DELETED_EVENT_TYPE:
+            self.pod_cache.remove(pod.metadata.name)
+            self._cancel_recheck(pod.metadata.name)
+            self.readiness_registry.set_failed(
+                pod.metadata.name,
+                K8sPodNotReady(f"Pod `{pod.metadata.name}` is deleted", reason=self.DELETED_REASON),
+            )
+            return
+
+        self.pod_cache.set(pod)
+        self._notify_waiters(pod)
+
+    def _notify_waiters(self, pod: V1Pod) -> None:
+        # pod_name is unique
+        # We set generateName property for pod manifest, so K8s guarantees it will be unique
+        pod_name = pod.metadata.name
+
+        # the watch sees all pods of callisto, only waited ones are registered
+        if not self.readiness_registry.is_pending(pod_name):
+            return
+
+        if self.k8s_client.is_pod_ready(pod):
+            logger.debug("pod is ready", extra=l_ctx(namespace=self.namespace, pod=pod_name))
+            self.readiness_registry.set_ready(pod_name)
+            return
+
+        failure = self.get_pod_failure(pod)
+        if failure is not None:
+            reason, message = failure
+            self.readiness_registry.set_failed(
+                pod_name, K8sPodNotReady(f"Pod `{pod_name}` can't become ready: {reason} {message}", reason=reason)
+            )
+            return
+
+        # the pod may get no other event until it is old enough to fail as unschedulable
+        if pod_name not in self.unschedulable_rechecks:
+            recheck_delay = self.get_unschedulable_recheck_delay(pod)
+            if recheck_delay is not None:
+                self.unschedulable_rechecks[pod_name] = asyncio.get_running_loop().call_later(
+                    recheck_delay, self._recheck_pod, pod_name
+                )
+
+    def _recheck_pod(self, pod_name: str) -> None:
+        self.unschedulable_rechecks.pop(pod_name, None)
+        pod = self.pod_cache.get(pod_name)
+        if pod is not None:
+            self._notify_waiters(pod)
+
+    def _cancel_recheck(self, pod_name: str) -> None:
+        handle = self.unschedulable_rechecks.pop(pod_name, None)
+        if handle is not None:
+            handle.cancel()
+
+    def get_pod_failure(self, pod: V1Pod) -> tuple[str, str] | None:
+        """(reason, message) if the pod is not going to become Ready"""
+        status = pod.status
+        if status is None:
+            return None
+
+        if status.phase in self.TERMINAL_PHASES:
+            return status.phase, status.message or ""
+
+        reasons = self.readiness_config.fail_fast_reasons
+        for condition in status.conditions or []:
+            if condition.status != "True" and condition.reason in reasons:
+                # a pending pod is unschedulable until the cluster autoscaler adds a node
+                if condition.reason == self.UNSCHEDULABLE_REASON and self._get_unschedulable_wait(pod) > 0:
+                    continue
+                return condition.reason, condition.message or ""
+
+        for container_status in [*(status.init_container_statuses or []), *(status.container_statuses or [])]:
+            waiting = container_status.state.waiting if container_status.state is not None else None
+            if waiting is not None and waiting.reason in reasons:
+                return waiting.reason, f"{container_status.name}: {waiting.message or ''}"
+
+        return None
+
+    def get_unschedulable_recheck_delay(self, pod: V1Pod) -> float | None:
+        """Seconds until an unschedulable pod is old enough to fail, `None` if it is not unschedulable"""
+        if self.UNSCHEDULABLE_REASON not in self.readiness_config.fail_fast_reasons or pod.status is None:
+            return None
+
+        for condition in pod.status.conditions or []:
+            if condition.status != "True" and condition.reason == self.UNSCHEDULABLE_REASON:
+                wait = self._get_unschedulable_wait(pod)
+                return wait if wait > 0 else None
+        return None
+
+    def _get_unschedulable_wait(self, pod: V1Pod) -> float:
+        created_at = pod.metadata.creation_timestamp
+        if created_at is None:
+            return 0.0
+        age = (datetime.now(timezone.utc) - created_at).total_seconds()
+        return self.readiness_config.unschedulable_min_age - age
 
     async def wait_until_pod_is_ready(self, pod_name: str) -> None:
-        event = self.pod_event_service.get_or_create_event(pod_name)
-        await event.wait()
-        self.pod_event_service.clean(pod_name)
+        """Wait for the Ready condition.
+        Raise `K8sPodNotReady` as soon as the pod is known to fail or after the readiness timeout.
+        """
+        future = self.readiness_registry.acquire(pod_name)
+
+        try:
+            pod = self.pod_cache.get(pod_name)
+            if pod is not None:
+                self._notify_waiters(pod)
+
+            try:
+                # the result is shared between waiters of the pod, the timeout must not cancel it
+                await asyncio.wait_for(asyncio.shield(future), self.readiness_config.timeout)
+            except asyncio.TimeoutError:
+                raise K8sPodNotReady(
+                    f"Pod `{pod_name}` is not ready after {self.readiness_config.timeout}s",
+                    reason=self.READINESS_TIMEOUT_REASON,
+                )
+        except K8sPodNotReady as e:
+            logger.warning("pod is not ready", extra=l_ctx(pod=pod_name, reason=e.reason, error=str(e)))
+            self.readiness_failures.labels(instance_id=self.instance_id, reason=e.reason).inc()
+            self.record_pod_failure(pod_name, reason=e.reason)
+            raise e
+        finally:
+            self.readiness_registry.release(pod_name)
+            if not self.readiness_registry.is_pending(pod_name):
+                self._cancel_recheck(pod_name)
+
+        await self.task_runner_service.run_in_background(partial(self.record_pod_timeline, pod_name=pod_name))
+
+    async def record_pod_timeline(self, pod_name: str) -> None:
+        pod = self.pod_cache.get(pod_name)
+        if pod is None:
+            return
+
+        node_name = self.get_node_name(pod)
+        timeline = PodTimeline.from_pod(pod)
+        ready_duration = timeline.get_duration("created", "ready")
+        # the node is judged from scheduling on, time waiting for a node (e.g. for the autoscaler) is not its fault
+        node_latency = timeline.get_duration("scheduled", "ready")
+        if node_name and node_latency is not None:
+            self.node_stats.record(node_name, node_latency)
+        pod_id = (pod.metadata.labels or {}).get(self.POD_ID_LABEL)
+        if pod_id is not None:
+            self.image_locality.record(pod_id, node_name=node_name, ready_duration=ready_duration)
+
+        node_pool = await self.get_node_pool(node_name)
+        for phase, duration in timeline.get_durations().items():
+            if duration is not None:
+                self.startup_phase_duration.labels(
+                    instance_id=self.instance_id, phase=phase, node_pool=node_pool
+                ).observe(duration)
+
+    def record_pod_failure(self, pod_name: str, reason: str) -> None:
+        pod = self.pod_cache.get(pod_name)
+        if pod is None:
+            return
+
+        pod_id = (pod.metadata.labels or {}).get(self.POD_ID_LABEL)
+        if pod_id is not None:
+            self.image_locality.forget(pod_id)
+        if reason not in self.NODE_FAILURE_REASONS:
+            return
+        # unscheduled pods fail no node
+        node_name = self.get_node_name(pod)
+        if node_name:
+            self.node_stats.record(node_name, None)
+
+    async def get_node_pool(self, node_name: str | None) -> str:
+        """Value of the node pool label of the node, read once per node"""
+        if not node_name or not self.node_pool_label:
+            return self.UNKNOWN_NODE_POOL
+
+        node_pool = self.node_pools.get(node_name)
+        if node_pool is None:
+            try:
+                node = await self.k8s_client.get_node(node_name)
+            except Exception as e:
+                # the service account may not be allowed to read nodes, the node pool stays unknown
+                logger.warning("can't get node", extra=l_ctx(node=node_name, error=str(e)))
+                node_pool = self.UNKNOWN_NODE_POOL
+            else:
+                node_pool = (node.metadata.labels or {}).get(self.node_pool_label, self.UNKNOWN_NODE_POOL)
+
+            if len(self.node_pools) >= self.NODE_POOL_CACHE_SIZE:
+                del self.node_pools[next(iter(self.node_pools))]
+            self.node_pools[node_name] = node_pool
+
+        return node_pool
 
     async def get_pod_logs_stream(self, name: str) -> StreamReader:
         return await self.k8s_client.get_pod_logs_stream(namespace=self.namespace, name=name)
@@ -94,6 +549,35 @@ class K8sService:
     def get_pod_name(pod: V1Pod) -> str:
         return pod.metadata.name
 
+    @staticmethod
+    def get_pod_age(pod: V1Pod) -> float:
+        created_at = pod.metadata.creation_timestamp
+        if created_at is None:
+            return 0
+
+        return (datetime.now(timezone.utc) - created_at).total_seconds()
+
+    @classmethod
+    def get_pod_requests(cls, pod: V1Pod) -> tuple[float, float]:
+        """(cpu cores, memory bytes) requested by the containers of the pod"""
+        cpu = memory = 0.0
+        for container in pod.spec.containers:
+            requests = (container.resources.requests if container.resources is not None else None) or {}
+            cpu += cls.parse_quantity(requests.get("cpu", "0"))
+            memory += cls.parse_quantity(requests.get("memory", "0"))
+
+        return cpu, memory
+
+    @staticmethod
+    def parse_quantity(quantity: str | int | float) -> float:
+        """K8s resource quantity, e.g. `500m` or `2Gi`"""
+        quantity = str(quantity)
+        for suffix, multiplier in QUANTITY_SUFFIXES.items():
+            if quantity.endswith(suffix):
+                return float(Decimal(quantity.removesuffix(suffix)) * multiplier)
+
+        return float(Decimal(quantity))
+
     @staticmethod
     def _get_browser_env(pod: V1Pod, env_name: str) -> str | None:
         for container in pod.spec.containers:
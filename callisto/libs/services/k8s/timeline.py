@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import typing as t
+from datetime import datetime
+
+
+if t.TYPE_CHECKING:
+    from kubernetes_asyncio.client import V1Pod  # type: ignore
+
+
+class PodTimeline:
+    """Startup milestones of a pod, from its conditions and container states.
+
+    Kubernetes does not record image pulls in the pod, so `starting_containers` includes pulling the images.
+    """
+
+    __slots__ = ("milestones",)
+
+    CONDITION_MILESTONES = {
+        "PodScheduled": "scheduled",
+        "Initialized": "initialized",
+        "ContainersReady": "containers_ready",
+        "Ready": "ready",
+    }
+    # (phase, from milestone, to milestone)
+    PHASES = (
+        ("scheduling", "created", "scheduled"),
+        ("initializing", "scheduled", "initialized"),
+        ("starting_containers", "initialized", "containers_started"),
+        ("readiness_probe", "containers_started", "containers_ready"),
+        ("readiness_gates", "containers_ready", "ready"),
+    )
+
+    def __init__(self, milestones: dict[str, datetime | None]) -> None:
+        self.milestones = milestones
+
+    @classmethod
+    def from_pod(cls, pod: V1Pod) -> PodTimeline:
+        milestones: dict[str, datetime | None] = {
+            "created": pod.metadata.creation_timestamp,
+            **{milestone: None for milestone in cls.CONDITION_MILESTONES.values()},
+            "containers_started": None,
+        }
+        status = pod.status
+        if status is None:
+            return cls(milestones)
+
+        for condition in status.conditions or []:
+            milestone = cls.CONDITION_MILESTONES.get(condition.type)
+            if milestone is not None and condition.status == "True":
+                milestones[milestone] = condition.last_transition_time
+
+        # the last container to start
+        started_at: list[datetime] = []
+        for container_status in status.container_statuses or []:
+            state = container_status.state
+            if state is None or state.running is None:
+                break
+            started_at.append(state.running.started_at)
+        else:
+            if started_at:
+                milestones["containers_started"] = max(started_at)
+
+        return cls(milestones)
+
+    def get_duration(self, start: str, end: str) -> float | None:
+        """Seconds between two milestones, `None` if either is not reached"""
+        started_at, ended_at = self.milestones[start], self.milestones[end]
+        if started_at is None or ended_at is None:
+            return None
+        # conditions have a second precision, a phase may seem to end before it starts
+        return max((ended_at - started_at).total_seconds(), 0.0)
+
+    def get_durations(self) -> dict[str, float | None]:
+        """Seconds of every phase, `None` if the phase has not finished"""
+        return {phase: self.get_duration(start, end) for phase, start, end in self.PHASES}
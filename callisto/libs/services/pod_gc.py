@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import asyncio
+import typing as t
+
+from prometheus_client import CollectorRegistry, Counter
+from sentry_sdk import capture_exception
+
+from ..exceptions import SessionNotFound
+from .log import l_ctx, logger
+
+
+if t.TYPE_CHECKING:
+    from kubernetes_asyncio.client import V1Pod  # type: ignore
+
+    from ..domains.config import PodGcConfig
+    from .k8s.service import K8sService
+    from .pod_pool import PodPoolService
+    from .pod_recycle import PodRecycleService
+    from .state import StateService
+    from .task_runner import TaskRunnerService
+
+
+class PodGarbageCollector:
+    """Periodically deletes browser pods of this instance which nobody is going to delete.
+
+    A pod is collected when it is
+    - orphaned: it has no session, is not in the warm pool or the recycled pods and no session request uses it,
+    - stuck in Pending for `pending_timeout` seconds while nobody waits for it,
+    - serving a session for longer than `max_session_age` seconds.
+    Pods younger than `grace_period` are never collected, they may be still in creation.
+    """
+
+    PENDING_PHASE = "Pending"
+
+    def __init__(
+        self,
+        k8s_service: K8sService,
+        state_service: StateService,
+        pod_pool_service: PodPoolService,
+        pod_recycle_service: PodRecycleService,
+        task_runner_service: TaskRunnerService,
+        gc_config: PodGcConfig,
+        metrics_registry: CollectorRegistry,
+        instance_id: str,
+    ) -> None:
+        self.k8s_service = k8s_service
+        self.state_service = state_service
+        self.pod_pool_service = pod_pool_service
+        self.pod_recycle_service = pod_recycle_service
+        self.task_runner_service = task_runner_service
+        self.gc_config = gc_config
+        self.instance_id = instance_id
+
+        self.reclaimed_pods = Counter(
+            "callisto_pod_gc_reclaimed_pods_total",
+            "Browser pods deleted by the garbage collector",
+            ["instance_id", "reason", "dry_run"],
+            registry=metrics_registry,
+        )
+        self.reclaimed_cpu = Counter(
+            "callisto_pod_gc_reclaimed_cpu_cores_total",
+            "CPU requests of browser pods deleted by the garbage collector",
+            ["instance_id", "reason", "dry_run"],
+            registry=metrics_registry,
+        )
+        self.reclaimed_memory = Counter(
+            "callisto_pod_gc_reclaimed_memory_bytes_total",
+            "Memory requests of browser pods deleted by the garbage collector",
+            ["instance_id", "reason", "dry_run"],
+            registry=metrics_registry,
+        )
+
+    async def run_background_tasks(self) -> None:
+        if self.gc_config.enabled:
+            await self.task_runner_service.run_in_background(self.reconcile)
+
+    async def reconcile(self) -> None:
+        while True:
+            await asyncio.sleep(self.gc_config.interval)
+
+            try:
+                await self.collect()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(e)
+                capture_exception(e)
+
+    async def collect(self) -> dict[str, str]:
+        """Delete collectable pods, at most `max_deletions` per run. Return {pod name: reason}"""
+        if not self.k8s_service.pod_cache.synced:
+            logger.debug("pod cache is not synced, skipping garbage collection")
+            return {}
+
+        garbage: dict[str, tuple[V1Pod, str]] = {}
+        for pod in self.k8s_service.pod_cache.list():
+            reason = self.get_reason(pod)
+            if reason is not None:
+                garbage[self.k8s_service.get_pod_name(pod)] = (pod, reason)
+            if len(garbage) >= self.gc_config.max_deletions:
+                break
+
+        results = await asyncio.gather(
+            *[self._delete_pod(pod, reason) for pod, reason in garbage.values()], return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(result)
+
+        return {pod_name: reason for pod_name, (_, reason) in garbage.items()}
+
+    def get_reason(self, pod: V1Pod) -> str | None:
+        pod_name = self.k8s_service.get_pod_name(pod)
+        labels = pod.metadata.labels or {}
+        age = self.k8s_service.get_pod_age(pod)
+
+        if (
+            labels.get(self.k8s_service.INSTANCE_ID_LABEL) != self.instance_id
+            or pod.metadata.deletion_timestamp is not None
+            or age < self.gc_config.grace_period
+        ):
+            return None
+
+        if pod_name in self.state_service.sessions:
+            if self.gc_config.max_session_age and age > self.gc_config.max_session_age:
+                return "max_session_age"
+            return None
+
+        if (
+            pod_name in self.state_service.starting_pods
+            or self.pod_pool_service.has_pod(pod_name)
+            or self.pod_recycle_service.has_pod(pod_name)
+            or self.k8s_service.readiness_registry.is_pending(pod_name)
+        ):
+            return None
+
+        if pod.status is not None and pod.status.phase == self.PENDING_PHASE:
+            return "stuck_pending" if age > self.gc_config.pending_timeout else None
+
+        return "orphaned"
+
+    async def _delete_pod(self, pod: V1Pod, reason: str) -> None:
+        pod_name = self.k8s_service.get_pod_name(pod)
+        dry_run = self.gc_config.dry_run
+        logger.info("collecting pod", extra=l_ctx(pod=pod_name, reason=reason, dry_run=dry_run))
+
+        if not dry_run:
+            if reason == "max_session_age":
+                try:
+                    self.state_service.remove_session(pod_name)
+                except SessionNotFound:
+                    # the session has been deleted meanwhile
+                    pass
+                self.pod_pool_service.release(pod_name)
+            self.pod_recycle_service.forget(pod_name)
+            await self.k8s_service.delete_pod(name=pod_name)
+
+        cpu, memory = self.k8s_service.get_pod_requests(pod)
+        labels = {"instance_id": self.instance_id, "reason": reason, "dry_run": dry_run}
+        self.reclaimed_pods.labels(**labels).inc()
+        self.reclaimed_cpu.labels(**labels).inc(cpu)
+        self.reclaimed_memory.labels(**labels).inc(memory)
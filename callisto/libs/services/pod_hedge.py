@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import collections
+import contextlib
+import math
+import typing as t
+
+from prometheus_client import CollectorRegistry, Counter
+
+from ..math import percentile
+
+
+if t.TYPE_CHECKING:
+    from ..domains.config import PodHedgeConfig
+
+
+class PodHedgeService:
+    """Keeps recent pod readiness waits and decides when a speculative (hedge) pod is launched.
+
+    A wait is the time from the creation of the first pod of a session request until a pod is Ready,
+    failed waits are observed as slow ones. Hedge pods launched at once are capped by `max_ratio`
+    of the pods waiting for readiness, so a slow cluster is not flooded with extra pods.
+    """
+
+    WINDOW_SIZE = 500
+    MIN_SAMPLES = 20
+
+    def __init__(self, hedge_config: PodHedgeConfig, metrics_registry: CollectorRegistry, instance_id: str) -> None:
+        self.hedge_config = hedge_config
+        self.instance_id = instance_id
+        self.ready_durations: collections.deque[float] = collections.deque(maxlen=self.WINDOW_SIZE)
+        self.waiting_pods = 0
+        self.active_hedges = 0
+
+        self.hedges_fired = Counter(
+            "callisto_pod_hedges_total",
+            "Hedge pods launched because the first pod was not Ready in time",
+            ["instance_id"],
+            registry=metrics_registry,
+        )
+        self.hedges_skipped = Counter(
+            "callisto_pod_hedges_skipped_total",
+            "Hedge pods not launched because too many hedge pods were launched at once",
+            ["instance_id"],
+            registry=metrics_registry,
+        )
+        self.hedges_won = Counter(
+            "callisto_pod_hedge_wins_total",
+            "Sessions served by a hedge pod",
+            ["instance_id"],
+            registry=metrics_registry,
+        )
+        self.wasted_pod_seconds = Counter(
+            "callisto_pod_hedge_wasted_seconds_total",
+            "Lifetime of pods which lost the readiness race",
+            ["instance_id"],
+            registry=metrics_registry,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.hedge_config.enabled
+
+    def observe_ready_duration(self, duration: float) -> None:
+        self.ready_durations.append(duration)
+
+    def get_delay(self) -> float | None:
+        """Seconds to wait for the first pod before a hedge pod is launched. `None` means don't hedge"""
+        if len(self.ready_durations) < self.MIN_SAMPLES:
+            return None
+
+        return max(self.hedge_config.min_delay, percentile(self.ready_durations, self.hedge_config.percentile))
+
+    @contextlib.contextmanager
+    def track_waiting_pod(self) -> t.Iterator[None]:
+        self.waiting_pods += 1
+        try:
+            yield
+        finally:
+            self.waiting_pods -= 1
+
+    def acquire_hedge(self) -> bool:
+        """Take a slot for a hedge pod. `False` means the hedge budget is spent"""
+        # at least one hedge pod is allowed, so hedging works at low load
+        budget = max(1, math.ceil(self.waiting_pods * self.hedge_config.max_ratio))
+        if self.active_hedges >= budget:
+            self.hedges_skipped.labels(instance_id=self.instance_id).inc()
+            return False
+
+        self.active_hedges += 1
+        self.hedges_fired.labels(instance_id=self.instance_id).inc()
+        return True
+
+    def release_hedge(self) -> None:
+        self.active_hedges -= 1
+
+    def record_hedge_win(self) -> None:
+        self.hedges_won.labels(instance_id=self.instance_id).inc()
+
+    def record_wasted_pod(self, lifetime: float) -> None:
+        self.wasted_pod_seconds.labels(instance_id=self.instance_id).inc(lifetime)
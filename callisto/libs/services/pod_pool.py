@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import asyncio
+import collections
+import typing as t
+from functools import partial
+
+from prometheus_client import CollectorRegistry, Gauge
+from sentry_sdk import capture_exception
+
+from .k8s.rate_limiter import Lane
+from .log import l_ctx, logger
+
+
+if t.TYPE_CHECKING:
+    from kubernetes_asyncio.client import V1Pod  # type: ignore
+
+    from ..domains.config import PodConfig, PodPoolConfig
+    from .image_prepull import ImagePrePullService
+    from .k8s.service import K8sService
+    from .task_runner import TaskRunnerService
+
+
+class PodPoolService:
+    """Pool of pre-created Ready browser pods.
+
+    The pool keeps `target_size` idle pods. Every claim from an empty pool grows the wanted size by one
+    (up to `max_size`), every successful claim shrinks it back towards `target_size`.
+    """
+
+    REFILL_INTERVAL = 5
+
+    def __init__(
+        self,
+        k8s_service: K8sService,
+        task_runner_service: TaskRunnerService,
+        pod_config: PodConfig,
+        pool_config: PodPoolConfig,
+        image_prepull_service: ImagePrePullService,
+        metrics_registry: CollectorRegistry,
+        instance_id: str,
+    ) -> None:
+        self.k8s_service = k8s_service
+        self.task_runner_service = task_runner_service
+        self.pod_config = pod_config
+        self.pool_config = pool_config
+        self.image_prepull_service = image_prepull_service
+        self.instance_id = instance_id
+
+        self.idle: collections.deque[V1Pod] = collections.deque()
+        self.claimed: set[str] = set()
+        self.refilling = 0
+        self.size = pool_config.target_size
+        self._refill_semaphore = asyncio.Semaphore(max(pool_config.refill_concurrency, 1))
+
+        self.pool_pods = Gauge(
+            "callisto_pool_pods",
+            "Browser pods in the warm pool",
+            ["instance_id", "state"],
+            registry=metrics_registry,
+        )
+
+    async def run_background_tasks(self) -> None:
+        if self.pool_config.enabled:
+            await self.task_runner_service.run_in_background(self.maintain)
+
+    async def maintain(self) -> None:
+        while True:
+            try:
+                await self.refill()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(e)
+                capture_exception(e)
+
+            await asyncio.sleep(self.REFILL_INTERVAL)
+
+    async def claim(self) -> V1Pod | None:
+        if not self.pool_config.enabled:
+            return None
+
+        pod = None
+        while self.idle and pod is None:
+            pod = self.idle.popleft()
+            pod_name = self.k8s_service.get_pod_name(pod)
+
+            if self.k8s_service.pod_cache.synced and self.k8s_service.pod_cache.get(pod_name) is None:
+                # the pod was deleted (e.g. preempted) while it was idle
+                logger.warning("pool pod is gone", extra=l_ctx(pod=pod_name))
+                pod = None
+            elif self.image_prepull_service.is_outdated(self._get_manifest_hash(pod)):
+                # sessions switched to another manifest after the pod was created
+                logger.debug("pool pod is outdated", extra=l_ctx(pod=pod_name))
+                await self.task_runner_service.run_in_background(partial(self._delete_pod, pod_name))
+                pod = None
+
+        if pod is not None:
+            self.claimed.add(pod_name)
+            self.size = max(self.size - 1, self.pool_config.target_size)
+            logger.debug("pod claimed from pool", extra=l_ctx(pod=pod_name, idle=len(self.idle)))
+        else:
+            self.size = min(self.size + 1, self.pool_config.max_size)
+            logger.debug("pool is empty", extra=l_ctx(size=self.size))
+
+        self._update_metrics()
+        await self.refill()
+        return pod
+
+    def release(self, pod_name: str) -> None:
+        self.claimed.discard(pod_name)
+        self._update_metrics()
+
+    def has_pod(self, pod_name: str) -> bool:
+        return pod_name in self.claimed or any(self.k8s_service.get_pod_name(pod) == pod_name for pod in self.idle)
+
+    async def refill(self) -> None:
+        missing = min(self.size, self.pool_config.max_size) - len(self.idle) - self.refilling
+
+        for _ in range(missing):
+            self.refilling += 1
+            self._update_metrics()
+            await self.task_runner_service.run_in_background(self._add_pod)
+
+    async def _add_pod(self) -> None:
+        pod_name = None
+
+        try:
+            async with self._refill_semaphore:
+                # refills must not delay pods of session requests
+                pod = await self.k8s_service.create_pod(spec=self.image_prepull_service.manifest, lane=Lane.BACKGROUND)
+                pod_name = self.k8s_service.get_pod_name(pod)
+                logger.debug("pool pod created", extra=l_ctx(pod=pod_name))
+
+                await self.k8s_service.wait_until_pod_is_ready(pod_name=pod_name)
+                self.idle.append(await self.k8s_service.get_pod(pod_name))
+                logger.debug("pool pod is ready", extra=l_ctx(pod=pod_name, idle=len(self.idle)))
+        except Exception as e:
+            logger.exception(e)
+            capture_exception(e)
+
+            if pod_name is not None:
+                await self._delete_pod(pod_name)
+        finally:
+            self.refilling -= 1
+            self._update_metrics()
+
+    async def _delete_pod(self, pod_name: str) -> None:
+        try:
+            await self.k8s_service.delete_pod(name=pod_name)
+        except Exception as e:
+            logger.warning(e)
+
+    def _get_manifest_hash(self, pod: V1Pod) -> str:
+        labels = pod.metadata.labels or {}
+        return labels.get(self.k8s_service.MANIFEST_HASH_LABEL, "")
+
+    def _update_metrics(self) -> None:
+        self.pool_pods.labels(instance_id=self.instance_id, state="idle").set(len(self.idle))
+        self.pool_pods.labels(instance_id=self.instance_id, state="claimed").set(len(self.claimed))
+        self.pool_pods.labels(instance_id=self.instance_id, state="refilling").set(self.refilling)
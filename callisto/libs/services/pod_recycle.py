@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import asyncio
+import collections
+import typing as t
+from functools import partial
+
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+)
+from sentry_sdk import capture_exception
+
+from .k8s.service import K8sService
+from .log import l_ctx, logger
+
+
+if t.TYPE_CHECKING:
+    from kubernetes_asyncio.client import V1Pod  # type: ignore
+
+    from ..domains.config import PodConfig, PodRecycleConfig
+    from .image_prepull import ImagePrePullService
+    from .task_runner import TaskRunnerService
+
+
+class PodRecycleService:
+    """Queues of browser pods which served a session and were reset for the next one.
+
+    Pods are queued by manifest hash, so a pod is reused only for the manifest it was created from.
+    A pod is deleted instead of being queued once it has served `max_reuses` sessions or is older than `max_age`.
+    """
+
+    EXPIRE_INTERVAL = 10
+    # weight of the last cold start in the average cold start duration
+    COLD_START_WEIGHT = 0.2
+
+    def __init__(
+        self,
+        k8s_service: K8sService,
+        task_runner_service: TaskRunnerService,
+        pod_config: PodConfig,
+        recycle_config: PodRecycleConfig,
+        image_prepull_service: ImagePrePullService,
+        metrics_registry: CollectorRegistry,
+        instance_id: str,
+    ) -> None:
+        self.k8s_service = k8s_service
+        self.task_runner_service = task_runner_service
+        self.pod_config = pod_config
+        self.recycle_config = recycle_config
+        self.image_prepull_service = image_prepull_service
+        self.instance_id = instance_id
+
+        self.queues: collections.defaultdict[str, collections.deque[V1Pod]] = collections.defaultdict(collections.deque)
+        # number of sessions served by every recycled pod
+        self.reuses: dict[str, int] = {}
+        self.cold_start_duration: float | None = None
+        self.hits = 0
+        self.misses = 0
+
+        self.recycled_pods = Gauge(
+            "callisto_recycled_pods",
+            "Idle recycled browser pods waiting for a session",
+            ["instance_id"],
+            registry=metrics_registry,
+        )
+        self.recycle_claims = Counter(
+            "callisto_pod_recycle_claims_total",
+            "Session pod claims from the recycled pods",
+            ["instance_id", "hit"],
+            registry=metrics_registry,
+        )
+        self.recycle_hit_ratio = Gauge(
+            "callisto_pod_recycle_hit_ratio",
+            "Share of session pod claims served by recycled pods",
+            ["instance_id"],
+            registry=metrics_registry,
+        )
+        self.saved_seconds = Counter(
+            "callisto_pod_recycle_saved_seconds_total",
+            "Estimated pod startup time saved by recycled pods",
+            ["instance_id"],
+            registry=metrics_registry,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.recycle_config.enabled
+
+    async def run_background_tasks(self) -> None:
+        if self.enabled:
+            await self.task_runner_service.run_in_background(self.maintain)
+
+    async def maintain(self) -> None:
+        while True:
+            try:
+                await self.expire()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(e)
+                capture_exception(e)
+
+            await asyncio.sleep(self.EXPIRE_INTERVAL)
+
+    def observe_cold_start(self, duration: float) -> None:
+        if self.cold_start_duration is None:
+            self.cold_start_duration = duration
+        else:
+            self.cold_start_duration += self.COLD_START_WEIGHT * (duration - self.cold_start_duration)
+
+    def can_reuse(self, pod: V1Pod) -> bool:
+        pod_name = self.k8s_service.get_pod_name(pod)
+
+        return (
+            self.reuses.get(pod_name, 0) < self.recycle_config.max_reuses
+            and self.k8s_service.get_pod_age(pod) < self.recycle_config.max_age
+        )
+
+    def put(self, pod: V1Pod) -> None:
+        pod_name = self.k8s_service.get_pod_name(pod)
+        manifest_hash = self._get_manifest_hash(pod)
+
+        self.queues[manifest_hash].append(pod)
+        logger.debug(
+            "pod recycled",
+            extra=l_ctx(pod=pod_name, reuses=self.reuses.get(pod_name, 0), idle=len(self.queues[manifest_hash])),
+        )
+        self._update_metrics()
+
+    async def claim(self) -> V1Pod | None:
+        if not self.enabled:
+            return None
+
+        queue = self.queues[self.image_prepull_service.manifest_hash]
+        pod = None
+        while queue and pod is None:
+            pod = queue.popleft()
+            pod_name = self.k8s_service.get_pod_name(pod)
+
+            if self.k8s_service.pod_cache.synced and self.k8s_service.pod_cache.get(pod_name) is None:
+                logger.warning("recycled pod is gone", extra=l_ctx(pod=pod_name))
+                self.forget(pod_name)
+                pod = None
+            elif not self.can_reuse(pod):
+                await self.task_runner_service.run_in_background(partial(self._delete_pod, pod_name))
+                pod = None
+
+        if pod is not None:
+            self.hits += 1
+            self.reuses[pod_name] = self.reuses.get(pod_name, 0) + 1
+            if self.cold_start_duration is not None:
+                self.saved_seconds.labels(instance_id=self.instance_id).inc(self.cold_start_duration)
+            logger.debug("pod claimed from recycled pods", extra=l_ctx(pod=pod_name, reuses=self.reuses[pod_name]))
+        else:
+            self.misses += 1
+
+        self.recycle_claims.labels(instance_id=self.instance_id, hit=pod is not None).inc()
+        self._update_metrics()
+        return pod
+
+    def has_pod(self, pod_name: str) -> bool:
+        return any(self.k8s_service.get_pod_name(pod) == pod_name for queue in self.queues.values() for pod in queue)
+
+    def forget(self, pod_name: str) -> None:
+        self.reuses.pop(pod_name, None)
+
+    async def expire(self) -> None:
+        for queue in self.queues.values():
+            for pod in list(queue):
+                if not self.can_reuse(pod):
+                    queue.remove(pod)
+                    await self._delete_pod(self.k8s_service.get_pod_name(pod))
+
+        self._update_metrics()
+
+    async def _delete_pod(self, pod_name: str) -> None:
+        logger.debug("deleting expired recycled pod", extra=l_ctx(pod=pod_name))
+        self.forget(pod_name)
+
+        try:
+            await self.k8s_service.delete_pod(name=pod_name)
+        except Exception as e:
+            logger.warning(e)
+
+    def _get_manifest_hash(self, pod: V1Pod) -> str:
+        labels = pod.metadata.labels or {}
+        return labels.get(K8sService.MANIFEST_HASH_LABEL, "")
+
+    def _update_metrics(self) -> None:
+        self.recycled_pods.labels(instance_id=self.instance_id).set(sum(len(queue) for queue in self.queues.values()))
+        if self.hits + self.misses:
+            self.recycle_hit_ratio.labels(instance_id=self.instance_id).set(self.hits / (self.hits + self.misses))
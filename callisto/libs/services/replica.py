@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import asyncio
+import typing as t
+from json import JSONDecodeError
+
+from aiohttp import (
+    ClientError,
+    ClientSession,
+    ClientTimeout,
+)
+from prometheus_client import CollectorRegistry, Counter
+
+from ..exceptions import ReplicaException
+from .log import l_ctx, logger
+
+
+if t.TYPE_CHECKING:
+    from ..domains.config import ReplicaConfig
+
+
+class ReplicaService:
+    """Requests to the other callisto replicas.
+
+    Every replica watches and deletes only its own shard of pods, labelled with its instance id.
+    Deletions of sessions on pods of another replica are forwarded to the owner,
+    `/status` of the peers is merged into the own one, so Selenoid-UI shows the whole grid.
+    """
+
+    # see `web.routes`
+    API_PREFIX = "/api/v1"
+
+    def __init__(self, config: ReplicaConfig, metrics_registry: CollectorRegistry, instance_id: str) -> None:
+        self.config = config
+        self.instance_id = instance_id
+        self.peers = [peer for peer in config.peers if peer != instance_id]
+
+        self.peer_requests = Counter(
+            "callisto_replica_requests_total",
+            "Requests to other callisto replicas",
+            ["instance_id", "operation", "failed"],
+            registry=metrics_registry,
+        )
+
+        self.session = ClientSession(timeout=ClientTimeout(total=config.timeout))
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.config.peer_url_template)
+
+    async def close(self) -> None:
+        await self.session.close()
+
+    def get_peer_url(self, instance_id: str) -> str:
+        return self.config.peer_url_template.format(instance_id=instance_id).rstrip("/")
+
+    async def delete_session(self, instance_id: str, pod_name: str) -> None:
+        await self._request(
+            operation="delete_session",
+            method="DELETE",
+            url=f"{self.get_peer_url(instance_id)}{self.API_PREFIX}/session/{pod_name}",
+        )
+
+    async def get_peer_statuses(self) -> list[dict[str, t.Any]]:
+        """`/status` of every reachable peer, unreachable peers are skipped"""
+        if not self.enabled:
+            return []
+
+        results = await asyncio.gather(
+            *[
+                self._request(
+                    operation="status",
+                    method="GET",
+                    url=f"{self.get_peer_url(peer)}{self.API_PREFIX}/status",
+                    # the peer must not aggregate in turn
+                    params={"local": "true"},
+                )
+                for peer in self.peers
+            ],
+            return_exceptions=True,
+        )
+
+        statuses = []
+        for peer, result in zip(self.peers, results):
+            if isinstance(result, BaseException):
+                logger.warning("replica status request failed", extra=l_ctx(replica=peer, error=str(result)))
+            else:
+                statuses.append(result)
+        return statuses
+
+    async def _request(
+        self, operation: str, method: str, url: str, params: dict[str, str] | None = None
+    ) -> dict[str, t.Any]:
+        failed = True
+        try:
+            async with self.session.request(method=method, url=url, params=params) as response:
+                if response.status != 200:
+                    raise ReplicaException(f"Url {url} returned {response.status} status code")
+                try:
+                    data = await response.json()
+                except (JSONDecodeError, ClientError):
+                    raise ReplicaException(f"Can't parse response for url {url}")
+                failed = False
+                return data
+        except (ClientError, asyncio.TimeoutError) as e:
+            raise ReplicaException(f"Url {url} request failed: {e!r}") from e
+        finally:
+            self.peer_requests.labels(instance_id=self.instance_id, operation=operation, failed=failed).inc()
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import base64
+import bisect
+import json
+import sys
+import typing as t
+from collections.abc import MutableMapping
+
+from ..exceptions import ValidationError
+
+
+if t.TYPE_CHECKING:
+    from ..domains.state import SessionState
+
+
+# (created at, pod name), the order of sessions in query results
+SessionKey = tuple[float, str]
+
+
+class SessionRegistry(MutableMapping[str, "SessionState"]):
+    """Active sessions by pod name with secondary indexes.
+
+    Sessions are indexed by browser, browser version, test name and node, and kept in creation order,
+    so a query reads only the sessions matching its most selective filter.
+    Repeated strings of the indexed fields are interned and shared by all sessions.
+    """
+
+    INDEXED_FIELDS = ("browser_name", "browser_version", "test_name", "node_name")
+
+    def __init__(self) -> None:
+        self.sessions: dict[str, SessionState] = {}
+        # field -> value -> pod names
+        self.indexes: dict[str, dict[t.Any, set[str]]] = {field: {} for field in self.INDEXED_FIELDS}
+        # in creation order
+        self.order: list[SessionKey] = []
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def __iter__(self) -> t.Iterator[str]:
+        return iter(self.sessions)
+
+    def __contains__(self, pod_name: object) -> bool:
+        return pod_name in self.sessions
+
+    def __getitem__(self, pod_name: str) -> SessionState:
+        return self.sessions[pod_name]
+
+    def __setitem__(self, pod_name: str, session: SessionState) -> None:
+        self.add(pod_name, session)
+
+    def __delitem__(self, pod_name: str) -> None:
+        self.remove(pod_name)
+
+    # views of the underlying dict are faster than the generic ones
+    def items(self) -> t.ItemsView[str, SessionState]:
+        return self.sessions.items()
+
+    def values(self) -> t.ValuesView[SessionState]:
+        return self.sessions.values()
+
+    def add(self, pod_name: str, session: SessionState) -> None:
+        if pod_name in self.sessions:
+            self.remove(pod_name)
+
+        for field in self.INDEXED_FIELDS:
+            value = getattr(session, field)
+            if isinstance(value, str):
+                value = sys.intern(value)
+                setattr(session, field, value)
+            self.indexes[field].setdefault(value, set()).add(pod_name)
+
+        self.sessions[pod_name] = session
+        bisect.insort(self.order, (session.created_at, pod_name))
+
+    def remove(self, pod_name: str) -> SessionState:
+        """Raises `KeyError` if the pod has no session"""
+        session = self.sessions.pop(pod_name)
+
+        for field in self.INDEXED_FIELDS:
+            index = self.indexes[field]
+            value = getattr(session, field)
+            index[value].discard(pod_name)
+            if not index[value]:
+                del index[value]
+
+        key = (session.created_at, pod_name)
+        position = bisect.bisect_left(self.order, key)
+        if position < len(self.order) and self.order[position] == key:
+            del self.order[position]
+        return session
+
+    def query(
+        self, filters: dict[str, str], limit: int, after: SessionKey | None = None
+    ) -> tuple[list[tuple[str, SessionState]], SessionKey | None]:
+        """Sessions matching all `filters` (field -> value) in creation order, starting after the `after` key.
+        Returns at most `limit` sessions and the key to continue from, `None` on the last page.
+        """
+        if filters:
+            pod_name_sets = sorted((self.indexes[field].get(value, set()) for field, value in filters.items()), key=len)
+            keys = sorted(
+                (self.sessions[pod_name].created_at, pod_name)
+                for pod_name in pod_name_sets[0].intersection(*pod_name_sets[1:])
+            )
+        else:
+            keys = self.order
+
+        start = bisect.bisect_right(keys, after) if after is not None else 0
+        page = keys[start : start + limit]
+        next_key = page[-1] if page and start + limit < len(keys) else None
+
+        return [(pod_name, self.sessions[pod_name]) for _, pod_name in page], next_key
+
+    @staticmethod
+    def encode_cursor(key: SessionKey) -> str:
+        return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> SessionKey:
+        try:
+            created_at, pod_name = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return float(created_at), str(pod_name)
+        except (ValueError, TypeError):
+            raise ValidationError(f"Invalid cursor `{cursor}`")
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import dataclasses as dc
+import time
 import typing as t
 from contextlib import contextmanager
 from datetime import datetime
@@ -13,6 +14,7 @@ from prometheus_client import (
     Histogram,
     generate_latest,
 )
+from sentry_sdk import capture_exception
 
 from ..domains.state import (
     SessionStage,
@@ -21,6 +23,9 @@ from ..domains.state import (
 )
 from ..exceptions import SessionNotFound
 from .k8s.service import K8sService
+from .log import l_ctx, logger
+from .session_registry import SessionRegistry
+from .status_document import StatusDocument
 from .webdriver.protocol import WebDriverProtocol
 
 
@@ -84,23 +89,31 @@ def record_step_stats(state_service: StateService, step: SessionStageStep) -> t.
 
 class StateService:
     DEFAULT_BUCKETS = (0.1, 0.25, 0.5, 1, 5, 10, 15, 30, 45, 60, 90, 120, 240)
+    # session fields stored on the pod, the rest is read from the pod manifest
+    SESSION_ANNOTATIONS = {
+        "patched_session_id": "callisto/session-id",
+        "browser_name": "callisto/browser-name",
+        "browser_version": "callisto/browser-version",
+        "test_name": "callisto/test-name",
+    }
+    # optional, sessions annotated before it was added are restored with the pod creation time
+    CREATED_AT_ANNOTATION = "callisto/session-created-at"
 
     def __init__(
         self,
         k8s_service: K8sService,
+        metrics_registry: CollectorRegistry,
         instance_id: str,
     ) -> None:
-        self.metrics_registry = CollectorRegistry(auto_describe=True)
+        # shared with the services created before the state service
+        self.metrics_registry = metrics_registry
         self.k8s_service = k8s_service
         self.instance_id = instance_id
-        self.sessions: dict[str, SessionState] = {}
+        self.sessions = SessionRegistry()
+        # pods of session requests in progress, from their creation or claim until the session is added
+        self.starting_pods: set[str] = set()
+        self.status_document = StatusDocument()
 
-        self.k8s_api_available = Gauge(
-            "callisto_k8s_api_available",
-            "Availability of K8s api",
-            ["instance_id"],
-            registry=self.metrics_registry,
-        )
         self.stages_processing = Gauge(
             "callisto_inprocessing_sessions",
             "Sessions now in progress",
@@ -133,6 +146,12 @@ class StateService:
             buckets=self.DEFAULT_BUCKETS,
             registry=self.metrics_registry,
         )
+        self.recovery_duration = Gauge(
+            "callisto_sessions_recovery_duration_seconds",
+            "Duration of the session state recovery from pod annotations at startup",
+            ["instance_id"],
+            registry=self.metrics_registry,
+        )
 
     def add_session(
         self,
@@ -149,23 +168,83 @@ class StateService:
         vnc_enabled = self.k8s_service.get_browser_vnc_enabled(pod)
         screen_resolution = self.k8s_service.get_browser_screen_resolution(pod)
 
-        self.sessions[pod_name] = SessionState(
-            patched_session_id=patched_session_id,
-            browser_name=browser_name,
-            test_name=test_name,
-            browser_version=browser_version,
-            timezone=timezone,
-            vnc_enabled=vnc_enabled,
-            screen_resolution=screen_resolution,
+        self._put_session(
+            pod_name,
+            SessionState(
+                patched_session_id=patched_session_id,
+                browser_name=browser_name,
+                test_name=test_name,
+                browser_version=browser_version,
+                timezone=timezone,
+                vnc_enabled=vnc_enabled,
+                screen_resolution=screen_resolution,
+                node_name=self.k8s_service.get_node_name(pod),
+                created_at=time.time(),
+            ),
         )
 
+    def _put_session(self, pod_name: str, session: SessionState) -> None:
+        self.sessions[pod_name] = session
+        self.status_document.add(pod_name, session)
+
+    def get_session_annotations(self, pod_name: str) -> dict[str, str | None]:
+        """Annotations which store the session of the pod, all `None` if the pod has no session"""
+        session = self.sessions.get(pod_name)
+
+        annotations = {
+            annotation: getattr(session, field) if session is not None else None
+            for field, annotation in self.SESSION_ANNOTATIONS.items()
+        }
+        annotations[self.CREATED_AT_ANNOTATION] = str(session.created_at) if session is not None else None
+        return annotations
+
+    async def restore_sessions(self) -> int:
+        """Rebuild the sessions from the annotations of the pods of this instance, with a single list call"""
+        start_time = time.monotonic()
+
+        try:
+            pods = await self.k8s_service.list_instance_pods()
+        except Exception as e:
+            # callisto must start while kube-api is unavailable, the sessions are left to the garbage collector
+            logger.exception(e)
+            capture_exception(e)
+            return 0
+
+        for pod in pods:
+            annotations = pod.metadata.annotations or {}
+            if pod.metadata.deletion_timestamp is not None or not all(
+                annotation in annotations for annotation in self.SESSION_ANNOTATIONS.values()
+            ):
+                continue
+
+            self._put_session(
+                self.k8s_service.get_pod_name(pod),
+                SessionState(
+                    **{field: annotations[annotation] for field, annotation in self.SESSION_ANNOTATIONS.items()},
+                    timezone=self.k8s_service.get_browser_timezone(pod),
+                    vnc_enabled=self.k8s_service.get_browser_vnc_enabled(pod),
+                    screen_resolution=self.k8s_service.get_browser_screen_resolution(pod),
+                    node_name=self.k8s_service.get_node_name(pod),
+                    created_at=float(
+                        annotations.get(self.CREATED_AT_ANNOTATION) or time.time() - self.k8s_service.get_pod_age(pod)
+                    ),
+                ),
+            )
+
+        duration = time.monotonic() - start_time
+        self.recovery_duration.labels(instance_id=self.instance_id).set(duration)
+        logger.info("sessions restored", extra=l_ctx(sessions=len(self.sessions), pods=len(pods), duration=duration))
+        return len(self.sessions)
+
     def remove_session(self, pod_name: str) -> None:
         try:
             del self.sessions[pod_name]
         except KeyError:
             raise SessionNotFound(f"Session for pod {pod_name} not found")
 
-    def get_active_sessions(self) -> dict[str, SessionState]:
+        self.status_document.remove(pod_name)
+
+    def get_active_sessions(self) -> SessionRegistry:
         return self.sessions
 
     def get_active_sessions_number(self) -> int:
@@ -181,8 +260,8 @@ class StateService:
 
         metric.set(self.get_active_sessions_number())
 
-    async def collect_metrics(self) -> bytes:
-        self.k8s_api_available.labels(instance_id=self.instance_id).set(int(await self.k8s_service.api_is_available()))
+    def collect_metrics(self, encoder: t.Callable[[CollectorRegistry], bytes] = generate_latest) -> bytes:
+        """Exposition of all metrics, kube-api availability is probed in background by `K8sApiProber`"""
         self._update_active_sessions()
 
-        return generate_latest(self.metrics_registry)
+        return encoder(self.metrics_registry)
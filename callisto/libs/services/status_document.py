@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import gzip
+import json
+import typing as t
+import uuid
+
+
+if t.TYPE_CHECKING:
+    from ..domains.state import SessionState
+
+
+class StatusBody:
+    """Serialized `/status` with its entity tag, the gzipped body is built once on demand"""
+
+    __slots__ = ("body", "etag", "_gzipped")
+
+    def __init__(self, body: bytes, etag: str) -> None:
+        self.body = body
+        self.etag = etag
+        self._gzipped: bytes | None = None
+
+    @property
+    def gzipped(self) -> bytes:
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body)
+        return self._gzipped
+
+
+class StatusDocument:
+    """Selenoid-UI `/status` of this instance, maintained on every session change.
+
+    Sessions are kept serialized, so the status is assembled without encoding every session again,
+    and the assembled status is reused until a session is added or removed or the number of pending sessions changes.
+    """
+
+    def __init__(self) -> None:
+        # by pod name
+        self.sessions: dict[str, bytes] = {}
+        # extra top-level fields by name, serialized
+        self.sections: dict[str, bytes] = {}
+        # bumped on every change, the epoch tells entity tags of restarted instances apart
+        self.version = 0
+        self.epoch = uuid.uuid4().hex[:8]
+        self._cached: tuple[tuple[int, int], StatusBody] | None = None
+
+    @staticmethod
+    def get_session_dict(session_state: SessionState) -> dict[str, t.Any]:
+        return {
+            "id": f"{session_state.patched_session_id}",
+            "vnc": session_state.vnc_enabled,
+            "screen": session_state.screen_resolution,
+            "caps": {
+                "browserName": session_state.browser_name,
+                "version": session_state.browser_version,
+                "screenResolution": session_state.screen_resolution,
+                "enableVNC": session_state.vnc_enabled,
+                "name": session_state.test_name,
+                "timeZone": session_state.timezone,
+            },
+        }
+
+    def add(self, pod_name: str, session_state: SessionState) -> None:
+        self.sessions[pod_name] = json.dumps(self.get_session_dict(session_state)).encode()
+        self.version += 1
+
+    def remove(self, pod_name: str) -> None:
+        if self.sessions.pop(pod_name, None) is not None:
+            self.version += 1
+
+    def set_section(self, name: str, value: dict[str, t.Any]) -> None:
+        section = json.dumps(value).encode()
+        if self.sections.get(name) != section:
+            self.sections[name] = section
+            self.version += 1
+
+    def render(self, pending: int) -> StatusBody:
+        key = (self.version, pending)
+        if self._cached is not None and self._cached[0] == key:
+            return self._cached[1]
+
+        active = len(self.sessions)
+        body = b"".join(
+            (
+                # we don't limit maximum active sessions, so, queued is always 0
+                f'{{"total": {active}, "used": {active}, "queued": 0, "pending": {pending}, '.encode(),
+                f'"browsers": {{"": {{"": {{"browsers": {{"count": {active}, "sessions": ['.encode(),
+                b", ".join(self.sessions.values()),
+                b"]}}}}",
+                *(f', "{name}": '.encode() + section for name, section in self.sections.items()),
+                b"}",
+            )
+        )
+        status_body = StatusBody(body=body, etag=f'W/"{self.epoch}-{self.version}-{pending}"')
+        self._cached = (key, status_body)
+        return status_body
@@ -1,22 +1,108 @@
 from __future__ import annotations
 
+import asyncio
 import typing as t
 from json import JSONDecodeError
+from types import SimpleNamespace
 
-from aiohttp import ClientSession
+from aiohttp import (
+    ClientError,
+    ClientSession,
+    ClientTimeout,
+    TCPConnector,
+    TraceConfig,
+)
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+)
 
 from ...exceptions import WebDriverException
 
 
+if t.TYPE_CHECKING:
+    from aiohttp import (
+        TraceConnectionCreateEndParams,
+        TraceConnectionQueuedEndParams,
+        TraceConnectionReuseconnParams,
+    )
+
+    from ...domains.config import WebDriverConfig
+
+
 class WebDriverClient:
     ALLOWED_CODES = (200,)
 
-    async def request(self, url: str, method: str, json: dict[str, t.Any]) -> dict[str, t.Any]:
-        async with ClientSession() as session:
-            async with session.request(method=method, url=url, json=json) as response:
-                if response.status not in self.ALLOWED_CODES:
-                    raise WebDriverException(f"Url {url} returned {response.status} status code")
-                try:
-                    return await response.json()
-                except JSONDecodeError:
-                    raise WebDriverException(f"Can't parse response for url {url}")
+    def __init__(self, config: WebDriverConfig, metrics_registry: CollectorRegistry, instance_id: str) -> None:
+        self.instance_id = instance_id
+
+        self.requests_in_progress = Gauge(
+            "callisto_webdriver_requests_in_progress",
+            "WebDriver requests now in progress",
+            ["instance_id"],
+            registry=metrics_registry,
+        )
+        self.connections = Counter(
+            "callisto_webdriver_connections_total",
+            "Connections acquired from the WebDriver connection pool",
+            ["instance_id", "reused"],
+            registry=metrics_registry,
+        )
+        self.connections_queued = Counter(
+            "callisto_webdriver_connections_queued_total",
+            "Connection acquisitions which waited for the connection pool limit",
+            ["instance_id"],
+            registry=metrics_registry,
+        )
+
+        trace_config = TraceConfig()
+        trace_config.on_connection_create_end.append(self._on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reuseconn)
+        trace_config.on_connection_queued_end.append(self._on_connection_queued_end)
+
+        # one long-lived session, so connections to webdrivers are kept alive and reused between requests
+        self.session = ClientSession(
+            connector=TCPConnector(
+                limit=config.connections_limit,
+                limit_per_host=config.connections_limit_per_host,
+                keepalive_timeout=config.keepalive_timeout,
+            ),
+            timeout=ClientTimeout(sock_connect=config.connect_timeout, sock_read=config.read_timeout),
+            trace_configs=[trace_config],
+        )
+
+    async def close(self) -> None:
+        await self.session.close()
+
+    async def request(
+        self, url: str, method: str, json: dict[str, t.Any] | None = None, timeout: float | None = None
+    ) -> dict[str, t.Any]:
+        with self.requests_in_progress.labels(instance_id=self.instance_id).track_inprogress():
+            # session-wide connect/read timeouts are used unless a total timeout is given
+            kwargs: dict[str, t.Any] = {"timeout": ClientTimeout(total=timeout)} if timeout is not None else {}
+            try:
+                async with self.session.request(method=method, url=url, json=json, **kwargs) as response:
+                    if response.status not in self.ALLOWED_CODES:
+                        raise WebDriverException(f"Url {url} returned {response.status} status code")
+                    try:
+                        return await response.json()
+                    except JSONDecodeError:
+                        raise WebDriverException(f"Can't parse response for url {url}")
+            except (ClientError, asyncio.TimeoutError) as e:
+                raise WebDriverException(f"Url {url} request failed: {e!r}") from e
+
+    async def _on_connection_create_end(
+        self, session: ClientSession, ctx: SimpleNamespace, params: TraceConnectionCreateEndParams
+    ) -> None:
+        self.connections.labels(instance_id=self.instance_id, reused=False).inc()
+
+    async def _on_connection_reuseconn(
+        self, session: ClientSession, ctx: SimpleNamespace, params: TraceConnectionReuseconnParams
+    ) -> None:
+        self.connections.labels(instance_id=self.instance_id, reused=True).inc()
+
+    async def _on_connection_queued_end(
+        self, session: ClientSession, ctx: SimpleNamespace, params: TraceConnectionQueuedEndParams
+    ) -> None:
+        self.connections_queued.labels(instance_id=self.instance_id).inc()
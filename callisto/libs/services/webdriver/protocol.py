@@ -29,6 +29,12 @@ class WebDriverProtocol:
         else:
             return session_response["value"]["sessionId"]
 
+    @staticmethod
+    def get_original_session_id(patched_session_id: str, pod_name: str, pod_ip: str) -> str:
+        """Reverse of `patch_session_response`"""
+
+        return patched_session_id.removeprefix(f"{pod_name}-{pod_ip}-")
+
     @staticmethod
     def get_browser_name(session_response: dict[str, t.Any]) -> str:
         """value/capabilities/browserName for w3c
@@ -65,6 +71,19 @@ class WebDriverProtocol:
         else:
             return session_response["value"]["capabilities"]["browserVersion"]
 
+    @staticmethod
+    def is_ready(status_response: dict[str, t.Any]) -> bool:
+        """https://w3c.github.io/webdriver/#status
+        value/ready for w3c
+        old chrome doesn't return `ready`, 'status' 0 means ok
+        """
+
+        value = status_response.get("value")
+        if isinstance(value, dict) and "ready" in value:
+            return bool(value["ready"])
+
+        return status_response.get("status", 0) == 0
+
     @staticmethod
     def is_session_created(session_response: dict[str, t.Any]) -> bool:
         """w3c return http-code, don't need this check and hasn't 'status' in body
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import time
 import typing as t
 
 from aiohttp import hdrs
 
 from ...exceptions import WebDriverException
 from ...services.task_runner import TaskRunnerService
+from ..log import l_ctx, logger
+from .protocol import WebDriverProtocol
 
 
 if t.TYPE_CHECKING:
@@ -13,23 +18,79 @@ if t.TYPE_CHECKING:
 
 
 class WebDriverService:
+    # `/status` polling backoff: 50ms, 100ms, 200ms, ... up to 1s between attempts
+    STATUS_BACKOFF_INITIAL = 0.05
+    STATUS_BACKOFF_MAX = 1.0
+    STATUS_REQUEST_TIMEOUT = 2.0
+
     def __init__(
-        self, client: WebDriverClient, task_runner_service: TaskRunnerService, webdriver_path: str, webdriver_port: int
+        self,
+        client: WebDriverClient,
+        task_runner_service: TaskRunnerService,
+        webdriver_path: str,
+        webdriver_port: int,
+        ready_timeout: float,
     ) -> None:
         self.client = client
         self.task_runner_service = task_runner_service
         self.webdriver_path = webdriver_path
         self.webdriver_port = webdriver_port
+        self.ready_timeout = ready_timeout
+
+    def _get_api_url(self, pod_ip: str) -> str:
+        return f"http://{pod_ip}:{self.webdriver_port}{self.webdriver_path}"
+
+    async def wait_until_ready(
+        self,
+        pod_ip: str,
+        attempt_stats: t.Callable[[], t.ContextManager[t.Any]] = contextlib.nullcontext,
+    ) -> int:
+        """Poll webdriver `/status` with exponential backoff until it is ready or `ready_timeout` expires.
+        Returns the number of attempts.
+        """
+        api_url = f"{self._get_api_url(pod_ip)}/status"
+        deadline = time.monotonic() + self.ready_timeout
+        pause = self.STATUS_BACKOFF_INITIAL
+        attempt = 0
+
+        while True:
+            attempt += 1
+            remaining = deadline - time.monotonic()
+
+            try:
+                with attempt_stats():
+                    status_response = await self.client.request(
+                        url=api_url, method=hdrs.METH_GET, timeout=min(self.STATUS_REQUEST_TIMEOUT, remaining)
+                    )
+                    if not WebDriverProtocol.is_ready(status_response):
+                        raise WebDriverException(f"Webdriver is not ready: {status_response}")
+                return attempt
+            except WebDriverException as e:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise WebDriverException(
+                        f"Webdriver on {pod_ip} is not ready after {self.ready_timeout}s and {attempt} attempts"
+                    ) from e
+
+                logger.debug("webdriver is not ready", extra=l_ctx(pod_ip=pod_ip, attempt=attempt, error=str(e)))
+                await asyncio.sleep(min(pause, remaining))
+                pause = min(pause * 2, self.STATUS_BACKOFF_MAX)
 
     async def create_session(self, pod_ip: str, session_request: dict[str, t.Any]) -> dict[str, t.Any]:
-        api_url = f"http://{pod_ip}:{self.webdriver_port}{self.webdriver_path}/session"
-
-        return await self.task_runner_service.run_with_retry(
-            func=self.client.request,
-            tries=3,
-            pause=5,
-            retry_exc=WebDriverException,
-            url=api_url,
-            method=hdrs.METH_POST,
-            json=session_request,
+        return await self.client.request(
+            url=f"{self._get_api_url(pod_ip)}/session", method=hdrs.METH_POST, json=session_request
+        )
+
+    async def get_session_activity(self, pod_ip: str, session_id: str) -> tuple[str, str]:
+        """Current url and title of the session, they change while a test drives the browser"""
+        session_url = f"{self._get_api_url(pod_ip)}/session/{session_id}"
+        url_response, title_response = await asyncio.gather(
+            self.client.request(url=f"{session_url}/url", method=hdrs.METH_GET, timeout=self.STATUS_REQUEST_TIMEOUT),
+            self.client.request(url=f"{session_url}/title", method=hdrs.METH_GET, timeout=self.STATUS_REQUEST_TIMEOUT),
+        )
+        return url_response.get("value", ""), title_response.get("value", "")
+
+    async def delete_session(self, pod_ip: str, session_id: str) -> dict[str, t.Any]:
+        return await self.client.request(
+            url=f"{self._get_api_url(pod_ip)}/session/{session_id}", method=hdrs.METH_DELETE
         )
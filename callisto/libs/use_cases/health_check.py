@@ -1,6 +1,29 @@
 from __future__ import annotations
 
+import typing as t
+
+from ..services.k8s.circuit_breaker import CircuitState
+
+
+if t.TYPE_CHECKING:
+    from ..services.k8s.service import K8sService
+
 
 class HealthCheckUseCase:
+    def __init__(self, k8s_service: K8sService) -> None:
+        self.k8s_service = k8s_service
+
     async def is_healthy(self) -> bool:
         return True
+
+    async def get_health(self) -> dict[str, t.Any]:
+        """Callisto stays healthy while kube-api is unavailable, session requests are failed fast meanwhile"""
+        circuit_breaker = self.k8s_service.k8s_client.circuit_breaker
+        state = circuit_breaker.get_state()
+
+        return {
+            "k8s_api": {
+                "circuit": state.value,
+                "retry_after": circuit_breaker.retry_after if state == CircuitState.OPEN else None,
+            },
+        }
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import gzip
+import time
 import typing as t
 
 import aiohttp.web as web
-from prometheus_client.exposition import CONTENT_TYPE_LATEST
+from aiohttp import hdrs
+from prometheus_client.exposition import choose_encoder
 
 
 if t.TYPE_CHECKING:
@@ -11,12 +14,33 @@ if t.TYPE_CHECKING:
 
 
 class MetricsUseCase:
-    def __init__(self, state_service: StateService) -> None:
+    def __init__(self, state_service: StateService, cache_ttl: float) -> None:
         self.state_service = state_service
-
-    async def get_metrics(self) -> web.Response:
-        metrics = await self.state_service.collect_metrics()
+        self.cache_ttl = cache_ttl
+        # (content type, gzipped) -> (collected at, body)
+        self._cache: dict[tuple[str, bool], tuple[float, bytes]] = {}
+
+    async def get_metrics(self, accept: str | None = None, accept_encoding: str | None = None) -> web.Response:
+        """Text or OpenMetrics exposition as negotiated by `Accept`, gzipped if the scraper accepts it.
+        The output is reused by scrapes within `cache_ttl` seconds.
+        """
+        encoder, content_type = choose_encoder(accept or "")
+        gzipped = "gzip" in (accept_encoding or "")
+        key = (content_type, gzipped)
+        now = time.monotonic()
+
+        cached = self._cache.get(key)
+        if cached is not None and now - cached[0] < self.cache_ttl:
+            body = cached[1]
+        else:
+            body = self.state_service.collect_metrics(encoder=encoder)
+            if gzipped:
+                body = gzip.compress(body)
+            self._cache[key] = (now, body)
 
         # cannot fill Content-type with content_type argument of the Response.__init__,
-        # as CONTENT_TYPE_LATEST includes more than just content type... (charset etc.)
-        return web.Response(body=metrics, headers={"Content-type": CONTENT_TYPE_LATEST})
+        # as the exposition content type includes more than just content type... (charset etc.)
+        headers = {hdrs.CONTENT_TYPE: content_type, hdrs.VARY: f"{hdrs.ACCEPT}, {hdrs.ACCEPT_ENCODING}"}
+        if gzipped:
+            headers[hdrs.CONTENT_ENCODING] = "gzip"
+        return web.Response(body=body, headers=headers)
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+import time
 import typing as t
 from asyncio import CancelledError
 from functools import partial
@@ -9,6 +11,7 @@ from sentry_sdk import capture_exception
 from ..domains.state import SessionStage, SessionStageStep
 from ..exceptions import (
     K8sPodNotFound,
+    K8sPodNotReady,
     SessionNotFound,
     WebDriverException,
 )
@@ -18,8 +21,15 @@ from ..services.webdriver.protocol import WebDriverProtocol
 
 
 if t.TYPE_CHECKING:
+    from kubernetes_asyncio.client import V1Pod  # type: ignore
+
     from ..domains.config import PodConfig
+    from ..services.image_prepull import ImagePrePullService
     from ..services.k8s.service import K8sService
+    from ..services.pod_hedge import PodHedgeService
+    from ..services.pod_pool import PodPoolService
+    from ..services.pod_recycle import PodRecycleService
+    from ..services.replica import ReplicaService
     from ..services.state import StateService
     from ..services.task_runner import TaskRunnerService
     from ..services.webdriver.service import WebDriverService
@@ -34,6 +44,11 @@ class SessionUseCase:
         state_service: StateService,
         task_runner_service: TaskRunnerService,
         webdriver_protocol: WebDriverProtocol,
+        pod_pool_service: PodPoolService,
+        pod_hedge_service: PodHedgeService,
+        pod_recycle_service: PodRecycleService,
+        replica_service: ReplicaService,
+        image_prepull_service: ImagePrePullService,
     ) -> None:
         self.k8s_service = k8s_service
         self.webdriver_service = webdriver_service
@@ -41,36 +56,143 @@ class SessionUseCase:
         self.state_service = state_service
         self.task_runner_service = task_runner_service
         self.webdriver_protocol = webdriver_protocol
+        self.pod_pool_service = pod_pool_service
+        self.pod_hedge_service = pod_hedge_service
+        self.pod_recycle_service = pod_recycle_service
+        self.replica_service = replica_service
+        self.image_prepull_service = image_prepull_service
+        # pods of sessions being deleted, a session may be deleted by the test and the idle session reaper at once
+        self.deleting: set[str] = set()
 
     async def create_session(self, session_request: dict[str, t.Any]) -> dict[str, t.Any]:
         logger.debug("creating session", extra=l_ctx(request_body=session_request))
 
-        with record_stage_stats(self.state_service, SessionStage.CREATING):
-            pod_name = await self._run_pod()
-            with record_step_stats(self.state_service, SessionStageStep.GETTING_POD):
-                pod = await self.k8s_service.get_pod(pod_name)
-            pod_ip = self.k8s_service.get_pod_ip(pod)
+        pod_name: str | None = None
+        try:
+            with record_stage_stats(self.state_service, SessionStage.CREATING):
+                pod = await self._claim_pod()
+                if pod is not None:
+                    pod_name = self.k8s_service.get_pod_name(pod)
+                else:
+                    pod_name = await self._run_pod()
+                    with record_step_stats(self.state_service, SessionStageStep.GETTING_POD):
+                        pod = await self.k8s_service.get_pod(pod_name)
+                return await self._start_session(pod=pod, session_request=session_request)
+        finally:
+            if pod_name is not None:
+                self.state_service.starting_pods.discard(pod_name)
 
-            session_response = await self._create_session(
-                session_request=session_request, pod_name=pod_name, pod_ip=pod_ip
-            )
-            logger.info(
-                "session created",
-                extra=l_ctx(
-                    session_id=self.webdriver_protocol.get_session_id(session_response),
-                    pod=pod_name,
-                    pod_ip=pod_ip,
-                    node_name=self.k8s_service.get_node_name(pod),
-                ),
-            )
+    async def create_sessions(
+        self, session_requests: list[dict[str, t.Any]]
+    ) -> t.AsyncGenerator[tuple[int, dict[str, t.Any] | Exception], None]:
+        """Create a batch of sessions.
+        Pods are created at once and every pod which becomes ready serves the next session request.
+        Yields (session request index, session response or error) as soon as a session is created.
+        Pods left from failed or aborted sessions are deleted together, as well as the sessions
+        which were created but not delivered because the caller stopped early (e.g. the client disconnected).
+        """
+        logger.debug("creating sessions", extra=l_ctx(count=len(session_requests)))
 
-            patched_session_response = self.webdriver_protocol.patch_session_response(
-                session_response=session_response, pod_name=pod_name, pod_ip=pod_ip
-            )
-            self.state_service.add_session(
-                pod=pod, session_request=session_request, patched_session_response=patched_session_response
+        indexes = iter(range(len(session_requests)))
+        batch_pods: set[str] = set()
+        # session request index -> pod of the created session, until the session is delivered
+        session_pods: dict[int, str] = {}
+        pipelines = [
+            asyncio.ensure_future(
+                self._create_batch_session(
+                    session_requests=session_requests, indexes=indexes, batch_pods=batch_pods, session_pods=session_pods
+                )
             )
-            return patched_session_response
+            for _ in session_requests
+        ]
+
+        try:
+            for pipeline in asyncio.as_completed(pipelines):
+                index, result = await pipeline
+                yield index, result
+                # the session is delivered only when the caller asks for the next one
+                session_pods.pop(index, None)
+        finally:
+            for pipeline in pipelines:
+                pipeline.cancel()
+            await asyncio.gather(*pipelines, return_exceptions=True)
+
+            if batch_pods:
+                await self.task_runner_service.run_in_background(partial(self._delete_pods, names=list(batch_pods)))
+            for pod_name in session_pods.values():
+                logger.warning("deleting undelivered session", extra=l_ctx(pod=pod_name))
+                await self.task_runner_service.run_in_background(partial(self._delete_session, pod_name=pod_name))
+
+    async def _create_batch_session(
+        self,
+        session_requests: list[dict[str, t.Any]],
+        indexes: t.Iterator[int],
+        batch_pods: set[str],
+        session_pods: dict[int, str],
+    ) -> tuple[int, dict[str, t.Any] | Exception]:
+        index = None
+        pod_name: str | None = None
+
+        try:
+            with record_stage_stats(self.state_service, SessionStage.CREATING):
+                pod = await self._claim_pod()
+                if pod is not None:
+                    pod_name = self.k8s_service.get_pod_name(pod)
+                else:
+                    pod_name = await self._create_pod()
+                    batch_pods.add(pod_name)
+
+                    with record_step_stats(self.state_service, SessionStageStep.WAITING_FOR_POD_READY):
+                        await self.k8s_service.wait_until_pod_is_ready(pod_name=pod_name)
+                    with record_step_stats(self.state_service, SessionStageStep.GETTING_POD):
+                        pod = await self.k8s_service.get_pod(pod_name)
+
+                # pods are interchangeable, so the first ready pod serves the first waiting request
+                index = next(indexes)
+                # from now on the pod is deleted by `_create_session` on errors
+                batch_pods.discard(pod_name)
+                session_response = await self._start_session(pod=pod, session_request=session_requests[index])
+                session_pods[index] = pod_name
+                return index, session_response
+        except Exception as e:
+            logger.exception(e)
+            return index if index is not None else next(indexes), e
+        finally:
+            # pods left in the batch are still starting until they are deleted with the batch
+            if pod_name is not None and pod_name not in batch_pods:
+                self.state_service.starting_pods.discard(pod_name)
+
+    async def _claim_pod(self) -> V1Pod | None:
+        """Take a recycled pod, then a pod from the warm pool"""
+        pod = await self.pod_recycle_service.claim() or await self.pod_pool_service.claim()
+        if pod is not None:
+            self.state_service.starting_pods.add(self.k8s_service.get_pod_name(pod))
+        return pod
+
+    async def _start_session(self, pod: V1Pod, session_request: dict[str, t.Any]) -> dict[str, t.Any]:
+        pod_name = self.k8s_service.get_pod_name(pod)
+        pod_ip = self.k8s_service.get_pod_ip(pod)
+
+        session_response = await self._create_session(session_request=session_request, pod_name=pod_name, pod_ip=pod_ip)
+        logger.info(
+            "session created",
+            extra=l_ctx(
+                session_id=self.webdriver_protocol.get_session_id(session_response),
+                pod=pod_name,
+                pod_ip=pod_ip,
+                node_name=self.k8s_service.get_node_name(pod),
+            ),
+        )
+
+        patched_session_response = self.webdriver_protocol.patch_session_response(
+            session_response=session_response, pod_name=pod_name, pod_ip=pod_ip
+        )
+        self.state_service.add_session(
+            pod=pod, session_request=session_request, patched_session_response=patched_session_response
+        )
+        # the session is restored from the pod after a restart, see `StateService.restore_sessions`
+        await self.task_runner_service.run_in_background(partial(self._annotate_pod, pod_name=pod_name))
+        return patched_session_response
 
     async def delete_session(self, pod_name: str) -> dict[str, t.Any]:
         await self.task_runner_service.run_in_background(partial(self._delete_session, pod_name=pod_name))
@@ -80,11 +202,53 @@ class SessionUseCase:
         return self.webdriver_protocol.get_session_deleted_response()
 
     async def _delete_session(self, pod_name: str) -> None:
+        if pod_name in self.deleting:
+            logger.warning("session is already being deleted", extra=l_ctx(pod=pod_name))
+            return
+
+        if self.replica_service.enabled and pod_name not in self.state_service.sessions:
+            owner = await self._get_foreign_owner(pod_name)
+            if owner is not None:
+                await self._forward_delete_session(owner=owner, pod_name=pod_name)
+                return
+
+        self.deleting.add(pod_name)
+        try:
+            await self._delete_session_once(pod_name=pod_name)
+        finally:
+            self.deleting.discard(pod_name)
+
+    async def _get_foreign_owner(self, pod_name: str) -> str | None:
+        """Instance id of the other replica which owns the pod"""
+        try:
+            owner = await self.k8s_service.get_pod_owner(pod_name)
+        except Exception as e:
+            # the pod is deleted as if it was ours
+            logger.warning("can't get pod owner", extra=l_ctx(pod=pod_name, error=str(e)))
+            return None
+
+        return owner if owner and owner != self.state_service.instance_id else None
+
+    async def _forward_delete_session(self, owner: str, pod_name: str) -> None:
+        logger.info("forwarding session deletion", extra=l_ctx(pod=pod_name, replica=owner))
+        try:
+            await self.replica_service.delete_session(instance_id=owner, pod_name=pod_name)
+        except Exception as e:
+            # the session stays in the state of the owner, its reaper and garbage collector delete the pod later
+            logger.exception(e)
+            capture_exception(e)
+
+    async def _delete_session_once(self, pod_name: str) -> None:
+        recycled_pod = None
+
         try:
             with record_stage_stats(self.state_service, SessionStage.DELETING):
-                with record_step_stats(self.state_service, SessionStageStep.DELETING_POD):
-                    await self._delete_pod(name=pod_name)
-                logger.info("session deleted", extra=l_ctx(pod=pod_name))
+                if self.pod_recycle_service.enabled:
+                    recycled_pod = await self._reset_pod(pod_name=pod_name)
+                if recycled_pod is None:
+                    with record_step_stats(self.state_service, SessionStageStep.DELETING_POD):
+                        await self._delete_pod(name=pod_name)
+                logger.info("session deleted", extra=l_ctx(pod=pod_name, recycled=recycled_pod is not None))
         except K8sPodNotFound as e:
             # It looks like pod was preempted.
             # This is normal behavior for preemptible nodes.
@@ -98,22 +262,147 @@ class SessionUseCase:
             except SessionNotFound as e:
                 logger.warning(e)
 
+        # the pod is ready for the next session only after the previous one is removed from the state.
+        # There is no await in between, the garbage collector must not see the pod without an owner
+        if recycled_pod is not None:
+            self.pod_pool_service.release(pod_name)
+            self.pod_recycle_service.put(recycled_pod)
+
+    async def _reset_pod(self, pod_name: str) -> V1Pod | None:
+        """End the webdriver session and check that the webdriver is ready for the next one.
+        Returns the pod if it can be recycled.
+        """
+        session = self.state_service.sessions.get(pod_name)
+        if session is None:
+            return None
+
+        try:
+            with record_step_stats(self.state_service, SessionStageStep.RESETTING_POD):
+                pod = await self.k8s_service.get_pod(pod_name)
+                if not self.pod_recycle_service.can_reuse(pod):
+                    return None
+
+                pod_ip = self.k8s_service.get_pod_ip(pod)
+                await self.webdriver_service.delete_session(
+                    pod_ip=pod_ip,
+                    session_id=self.webdriver_protocol.get_original_session_id(
+                        session.patched_session_id, pod_name=pod_name, pod_ip=pod_ip
+                    ),
+                )
+                await self.webdriver_service.wait_until_ready(pod_ip=pod_ip)
+                # the session is removed from the pod annotations while the session still owns the pod,
+                # otherwise it would be restored after a restart
+                await self.k8s_service.annotate_pod(
+                    name=pod_name, annotations=dict.fromkeys(self.state_service.get_session_annotations(pod_name))
+                )
+        except Exception as e:
+            logger.warning("pod can't be recycled", extra=l_ctx(pod=pod_name, error=str(e)))
+            return None
+
+        return pod
+
     async def _run_pod(self) -> str:
-        logger.debug("creating pod")
-        with record_step_stats(self.state_service, SessionStageStep.CREATING_POD):
-            pod = await self.k8s_service.create_pod(spec=self.pod_config.manifest)
-        pod_name = self.k8s_service.get_pod_name(pod)
-        logger.debug("pod created", extra=l_ctx(pod=pod_name))
+        started_at = time.monotonic()
+        pod_name = await self._create_pod()
+        created_at = time.monotonic()
 
         try:
             with record_step_stats(self.state_service, SessionStageStep.WAITING_FOR_POD_READY):
-                await self.k8s_service.wait_until_pod_is_ready(pod_name=pod_name)
+                hedge_delay = self.pod_hedge_service.get_delay() if self.pod_hedge_service.enabled else None
+                with self.pod_hedge_service.track_waiting_pod():
+                    if hedge_delay is None:
+                        await self.k8s_service.wait_until_pod_is_ready(pod_name=pod_name)
+                    else:
+                        pod_name = await self._wait_until_hedged_pod_is_ready(
+                            pod_name=pod_name, created_at=created_at, hedge_delay=hedge_delay
+                        )
         except CancelledError as e:
             await self._delete_pod(name=pod_name)
             raise e
+        except K8sPodNotReady as e:
+            # a failed wait is as slow as the readiness timeout, dropping it would hide slow pods from the hedge delay
+            self.pod_hedge_service.observe_ready_duration(self.k8s_service.readiness_config.timeout)
+            # the session request is failed right away, the pod is deleted in background
+            # (failed hedged pods are deleted by `_wait_until_hedged_pod_is_ready`)
+            if hedge_delay is None:
+                await self.task_runner_service.run_in_background(partial(self._delete_pods, names=[pod_name]))
+            raise e
 
+        # the wait of the request counts from the first pod, whichever pod serves it
+        self.pod_hedge_service.observe_ready_duration(time.monotonic() - created_at)
+        self.pod_recycle_service.observe_cold_start(time.monotonic() - started_at)
         return pod_name
 
+    async def _create_pod(self) -> str:
+        logger.debug("creating pod")
+        with record_step_stats(self.state_service, SessionStageStep.CREATING_POD):
+            pod = await self.k8s_service.create_pod(spec=self.image_prepull_service.manifest)
+        pod_name = self.k8s_service.get_pod_name(pod)
+        # the garbage collector must not take the pod for an orphan until its session is added
+        self.state_service.starting_pods.add(pod_name)
+        logger.debug("pod created", extra=l_ctx(pod=pod_name))
+
+        return pod_name
+
+    async def _wait_until_hedged_pod_is_ready(self, pod_name: str, created_at: float, hedge_delay: float) -> str:
+        """Launch a second (hedge) pod if the first one is not Ready after `hedge_delay` seconds
+        and the hedge budget allows it.
+        The pod which is Ready first serves the session, the other one is deleted in background.
+        """
+        pods_created_at = {pod_name: created_at}
+        waiters = {asyncio.ensure_future(self.k8s_service.wait_until_pod_is_ready(pod_name=pod_name)): pod_name}
+        ready_pod_name = None
+        hedged = False
+
+        try:
+            done, _ = await asyncio.wait(waiters, timeout=hedge_delay)
+            if not done and self.pod_hedge_service.acquire_hedge():
+                hedged = True
+                try:
+                    hedge_pod_name = await self._create_pod()
+                except Exception as e:
+                    # keep waiting for the first pod
+                    logger.exception(e)
+                    capture_exception(e)
+                else:
+                    logger.info("hedge pod launched", extra=l_ctx(pod=pod_name, hedge_pod=hedge_pod_name))
+                    pods_created_at[hedge_pod_name] = time.monotonic()
+                    waiters[
+                        asyncio.ensure_future(self.k8s_service.wait_until_pod_is_ready(pod_name=hedge_pod_name))
+                    ] = hedge_pod_name
+
+            while ready_pod_name is None:
+                done, _ = await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+                for waiter in done:
+                    done_pod_name = waiters.pop(waiter)
+                    if waiter.exception() is None:
+                        ready_pod_name = done_pod_name
+                        break
+
+                    await self.task_runner_service.run_in_background(partial(self._delete_pod, name=done_pod_name))
+                    if not waiters:
+                        raise t.cast(BaseException, waiter.exception())
+        except BaseException:
+            for waiter, waiter_pod_name in waiters.items():
+                waiter.cancel()
+                # the first pod is deleted by the caller
+                if waiter_pod_name != pod_name:
+                    await self.task_runner_service.run_in_background(partial(self._delete_pod, name=waiter_pod_name))
+            raise
+        finally:
+            if hedged:
+                self.pod_hedge_service.release_hedge()
+
+        for waiter, loser_pod_name in waiters.items():
+            waiter.cancel()
+            self.pod_hedge_service.record_wasted_pod(time.monotonic() - pods_created_at[loser_pod_name])
+            await self.task_runner_service.run_in_background(partial(self._delete_pod, name=loser_pod_name))
+
+        if ready_pod_name != pod_name:
+            self.pod_hedge_service.record_hedge_win()
+
+        return ready_pod_name
+
     async def _create_session(
         self,
         session_request: dict[str, t.Any],
@@ -121,6 +410,15 @@ class SessionUseCase:
         pod_ip: str,
     ) -> dict[str, t.Any]:
         try:
+            with record_step_stats(self.state_service, SessionStageStep.WAITING_FOR_WEBDRIVER_READY):
+                attempts = await self.webdriver_service.wait_until_ready(
+                    pod_ip=pod_ip,
+                    attempt_stats=partial(
+                        record_step_stats, self.state_service, SessionStageStep.PROBING_WEBDRIVER_STATUS
+                    ),
+                )
+            logger.debug("webdriver is ready", extra=l_ctx(pod=pod_name, attempts=attempts))
+
             with record_step_stats(self.state_service, SessionStageStep.CREATING_WEBDRIVER_SESSION):
                 session_response = await self.webdriver_service.create_session(
                     pod_ip=pod_ip, session_request=session_request
@@ -139,6 +437,26 @@ class SessionUseCase:
 
         return session_response
 
+    async def _annotate_pod(self, pod_name: str) -> None:
+        """Store the session of the pod in its annotations, or remove them if the pod has no session"""
+        try:
+            await self.k8s_service.annotate_pod(
+                name=pod_name, annotations=self.state_service.get_session_annotations(pod_name)
+            )
+        except Exception as e:
+            logger.warning("can't annotate pod", extra=l_ctx(pod=pod_name, error=str(e)))
+
+    async def _delete_pods(self, names: list[str]) -> None:
+        logger.info("deleting pods", extra=l_ctx(pods=names))
+        results = await asyncio.gather(*[self._delete_pod(name=name) for name in names], return_exceptions=True)
+
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(result)
+
     async def _delete_pod(self, name: str) -> None:
         logger.debug("deleting pod", extra=l_ctx(pod=name))
+        self.pod_pool_service.release(name)
+        self.pod_recycle_service.forget(name)
+        self.state_service.starting_pods.discard(name)
         await self.k8s_service.delete_pod(name=name)
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import typing as t
+from datetime import datetime, timezone
+
+from ..exceptions import SessionNotFound
+from ..services.k8s.timeline import PodTimeline
+
+
+if t.TYPE_CHECKING:
+    from ..domains.state import SessionState
+    from ..services.k8s.service import K8sService
+    from ..services.state import StateService
+
+
+class SessionQueryUseCase:
+    """Active sessions of this instance filtered by the indexed fields, page by page"""
+
+    def __init__(self, state_service: StateService, k8s_service: K8sService) -> None:
+        self.state_service = state_service
+        self.k8s_service = k8s_service
+
+    @staticmethod
+    def _get_session_dict(pod_name: str, session_state: SessionState) -> dict[str, t.Any]:
+        return {
+            "pod_name": pod_name,
+            "session_id": session_state.patched_session_id,
+            "browser_name": session_state.browser_name,
+            "browser_version": session_state.browser_version,
+            "test_name": session_state.test_name,
+            "node_name": session_state.node_name,
+            "created_at": session_state.created_at,
+            "vnc_enabled": session_state.vnc_enabled,
+            "screen_resolution": session_state.screen_resolution,
+            "timezone": session_state.timezone,
+        }
+
+    def list_sessions(self, filters: dict[str, str], limit: int, cursor: str | None) -> dict[str, t.Any]:
+        registry = self.state_service.sessions
+        sessions, next_key = registry.query(
+            filters=filters, limit=limit, after=registry.decode_cursor(cursor) if cursor else None
+        )
+
+        return {
+            "sessions": [self._get_session_dict(pod_name, session) for pod_name, session in sessions],
+            "next_cursor": registry.encode_cursor(next_key) if next_key is not None else None,
+        }
+
+    async def get_timeline(self, pod_name: str) -> dict[str, t.Any]:
+        """Startup milestones and phase durations of the session pod.
+        `starting_session` lasts from the pod readiness to the webdriver session, it includes the time in the pool.
+        """
+        session = self.state_service.sessions.get(pod_name)
+        if session is None:
+            raise SessionNotFound(f"Session for pod {pod_name} not found")
+
+        pod = await self.k8s_service.get_pod(pod_name)
+        node_name = self.k8s_service.get_node_name(pod)
+        timeline = PodTimeline.from_pod(pod)
+        session_created_at = datetime.fromtimestamp(session.created_at, timezone.utc)
+        milestones = {**timeline.milestones, "session_created": session_created_at}
+        durations = timeline.get_durations()
+        ready_at = milestones["ready"]
+        durations["starting_session"] = (
+            max((session_created_at - ready_at).total_seconds(), 0.0) if ready_at is not None else None
+        )
+
+        return {
+            "pod_name": pod_name,
+            "node_name": node_name,
+            "node_pool": await self.k8s_service.get_node_pool(node_name),
+            "milestones": {
+                milestone: timestamp.isoformat() if timestamp is not None else None
+                for milestone, timestamp in milestones.items()
+            },
+            "phases": durations,
+        }
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import typing as t
+
+from prometheus_client import CollectorRegistry, Counter
+from sentry_sdk import capture_exception
+
+from ..services.log import l_ctx, logger
+from ..services.webdriver.protocol import WebDriverProtocol
+
+
+if t.TYPE_CHECKING:
+    from ..domains.config import SessionReaperConfig
+    from ..domains.state import SessionState
+    from ..services.k8s.service import K8sService
+    from ..services.state import StateService
+    from ..services.task_runner import TaskRunnerService
+    from ..services.webdriver.service import WebDriverService
+    from .session import SessionUseCase
+
+
+class SessionActivity:
+    __slots__ = ("session", "fingerprint", "active_at")
+
+    def __init__(self, session: SessionState, active_at: float) -> None:
+        self.session = session
+        self.fingerprint: tuple[str, str] | None = None
+        self.active_at = active_at
+
+
+class SessionReaperUseCase:
+    """Deletes sessions abandoned by their tests.
+
+    Webdriver commands go to the pods past callisto, so the activity of a session is sampled:
+    every `interval` seconds the current url and title of the session are requested from the webdriver.
+    A session whose url and title have not changed (or could not be read) for `idle_timeout` seconds
+    is deleted as if the test sent DELETE.
+    """
+
+    def __init__(
+        self,
+        session_use_case: SessionUseCase,
+        k8s_service: K8sService,
+        webdriver_service: WebDriverService,
+        state_service: StateService,
+        task_runner_service: TaskRunnerService,
+        reaper_config: SessionReaperConfig,
+        metrics_registry: CollectorRegistry,
+        instance_id: str,
+    ) -> None:
+        self.session_use_case = session_use_case
+        self.k8s_service = k8s_service
+        self.webdriver_service = webdriver_service
+        self.state_service = state_service
+        self.task_runner_service = task_runner_service
+        self.reaper_config = reaper_config
+        self.instance_id = instance_id
+
+        # by pod name
+        self.activities: dict[str, SessionActivity] = {}
+        self._semaphore = asyncio.Semaphore(max(reaper_config.concurrency, 1))
+
+        self.reaped_sessions = Counter(
+            "callisto_reaped_sessions_total",
+            "Idle sessions deleted by the reaper",
+            ["instance_id", "browser"],
+            registry=metrics_registry,
+        )
+
+    async def run_background_tasks(self) -> None:
+        if self.reaper_config.enabled:
+            await self.task_runner_service.run_in_background(self.reap_idle_sessions)
+
+    async def reap_idle_sessions(self) -> None:
+        while True:
+            await asyncio.sleep(self.reaper_config.interval)
+
+            try:
+                await self.reap()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(e)
+                capture_exception(e)
+
+    async def reap(self) -> list[str]:
+        """Probe active sessions and delete idle ones. Return pod names of the deleted sessions"""
+        sessions = dict(self.state_service.get_active_sessions())
+        now = time.monotonic()
+
+        for pod_name in set(self.activities) - set(sessions):
+            del self.activities[pod_name]
+        for pod_name, session in sessions.items():
+            activity = self.activities.get(pod_name)
+            # a recycled pod serves a new session
+            if activity is None or activity.session is not session:
+                self.activities[pod_name] = SessionActivity(session, active_at=now)
+
+        await asyncio.gather(*[self._probe(pod_name) for pod_name in sessions])
+
+        now = time.monotonic()
+        idle_pod_names = [
+            pod_name
+            for pod_name, activity in self.activities.items()
+            if now - activity.active_at > self.reaper_config.idle_timeout
+        ]
+        for pod_name in idle_pod_names:
+            activity = self.activities.pop(pod_name)
+            logger.info(
+                "reaping idle session",
+                extra=l_ctx(pod=pod_name, test_name=activity.session.test_name, idle=now - activity.active_at),
+            )
+            self.reaped_sessions.labels(instance_id=self.instance_id, browser=activity.session.browser_name).inc()
+            # deleted in background, the same way as on DELETE from the test
+            await self.session_use_case.delete_session(pod_name=pod_name)
+
+        return idle_pod_names
+
+    async def _probe(self, pod_name: str) -> None:
+        activity = self.activities[pod_name]
+
+        try:
+            async with self._semaphore:
+                pod = await self.k8s_service.get_pod(pod_name)
+                pod_ip = self.k8s_service.get_pod_ip(pod)
+                fingerprint = await self.webdriver_service.get_session_activity(
+                    pod_ip=pod_ip,
+                    session_id=WebDriverProtocol.get_original_session_id(
+                        activity.session.patched_session_id, pod_name=pod_name, pod_ip=pod_ip
+                    ),
+                )
+        except Exception as e:
+            # a gone session is idle
+            logger.debug("session probe failed", extra=l_ctx(pod=pod_name, error=str(e)))
+            return
+
+        if fingerprint != activity.fingerprint:
+            activity.fingerprint = fingerprint
+            activity.active_at = time.monotonic()
@@ -1,52 +1,43 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import typing as t
 
+from ..services.status_document import StatusBody
+
 
 if t.TYPE_CHECKING:
-    from ..domains.state import SessionState
+    from ..services.replica import ReplicaService
     from ..services.state import StateService
 
 
 class StatusUseCase:
     """`/status` handler for Selenoid-UI"""
 
-    def __init__(self, state_service: StateService) -> None:
+    def __init__(self, state_service: StateService, replica_service: ReplicaService) -> None:
         self.state_service = state_service
+        self.replica_service = replica_service
+
+    async def get_status(self, local: bool = False) -> StatusBody:
+        """Serialized status of the whole grid, or only of this replica if `local`"""
+        status_body = self.state_service.status_document.render(pending=int(self.state_service.get_sessions_creating()))
+        if local or not self.replica_service.enabled or not self.replica_service.peers:
+            return status_body
+
+        status = json.loads(status_body.body)
+        for peer_status in await self.replica_service.get_peer_statuses():
+            self._merge_status(status, peer_status)
+
+        body = json.dumps(status).encode()
+        return StatusBody(body=body, etag=f'W/"{hashlib.sha256(body).hexdigest()[:16]}"')
 
     @staticmethod
-    def _get_session_dict(session_state: SessionState) -> dict[str, t.Any]:
-        return {
-            "id": f"{session_state.patched_session_id}",
-            "vnc": session_state.vnc_enabled,
-            "screen": session_state.screen_resolution,
-            "caps": {
-                "browserName": session_state.browser_name,
-                "version": session_state.browser_version,
-                "screenResolution": session_state.screen_resolution,
-                "enableVNC": session_state.vnc_enabled,
-                "name": session_state.test_name,
-                "timeZone": session_state.timezone,
-            },
-        }
-
-    def get_status(self) -> dict[str, t.Any]:
-        return {
-            "total": int(self.state_service.get_active_sessions_number()),
-            "used": int(self.state_service.get_active_sessions_number()),
-            "queued": 0,  # we don't limit maximum active sessions, so, queued is always 0
-            "pending": int(self.state_service.get_sessions_creating()),
-            "browsers": {
-                "": {
-                    "": {
-                        "browsers": {
-                            "count": self.state_service.get_active_sessions_number(),
-                            "sessions": [
-                                self._get_session_dict(session)
-                                for session in self.state_service.get_active_sessions().values()
-                            ],
-                        }
-                    }
-                }
-            },
-        }
+    def _merge_status(status: dict[str, t.Any], peer_status: dict[str, t.Any]) -> None:
+        for key in ("total", "used", "queued", "pending"):
+            status[key] += peer_status.get(key, 0)
+
+        browsers = status["browsers"][""][""]["browsers"]
+        peer_browsers = peer_status.get("browsers", {}).get("", {}).get("", {}).get("browsers", {})
+        browsers["count"] += peer_browsers.get("count", 0)
+        browsers["sessions"].extend(peer_browsers.get("sessions", []))
@@ -19,4 +19,4 @@ async def health_check_handler(request: web.Request) -> web.Response:
     else:
         status = web.HTTPServiceUnavailable.status_code
 
-    return web.Response(status=status)
+    return web.json_response(data=await uc.get_health(), status=status)
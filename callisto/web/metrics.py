@@ -3,6 +3,7 @@ from __future__ import annotations
 import typing as t
 
 import aiohttp.web as web
+from aiohttp import hdrs
 
 from ..libs.domains import consts
 
@@ -14,4 +15,6 @@ if t.TYPE_CHECKING:
 async def metrics_handler(request: web.Request) -> web.Response:
     uc: MetricsUseCase = request.app[consts.METRICS_USE_CASE_KEY]
 
-    return await uc.get_metrics()
+    return await uc.get_metrics(
+        accept=request.headers.get(hdrs.ACCEPT), accept_encoding=request.headers.get(hdrs.ACCEPT_ENCODING)
+    )
@@ -14,6 +14,7 @@ def setup_routes(app: Application) -> None:
         health_check,
         metrics,
         session,
+        session_query,
         status,
         webdriver_logs,
     )
@@ -23,4 +24,7 @@ def setup_routes(app: Application) -> None:
     app.router.add_get(f"{API_PREFIX}/status", status.status_handler)
     app.router.add_get(f"{API_PREFIX}/logs/{{pod_name}}", webdriver_logs.webdriver_logs_handler)
     app.router.add_post(f"{API_PREFIX}/session", session.create_session_handler)
+    app.router.add_post(f"{API_PREFIX}/sessions", session.create_sessions_handler)
+    app.router.add_get(f"{API_PREFIX}/sessions", session_query.list_sessions_handler)
+    app.router.add_get(f"{API_PREFIX}/sessions/{{pod_name}}/timeline", session_query.session_timeline_handler)
     app.router.add_delete(f"{API_PREFIX}/session/{{pod_name}}", session.delete_session_handler)
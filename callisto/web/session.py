@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import contextlib
+import json
 import typing as t
 
 import aiohttp.web as web
 
 from ..libs.domains import consts
+from ..libs.exceptions import ValidationError
 from . import get_pod_name
 
 
@@ -22,6 +25,43 @@ async def create_session_handler(request: web.Request) -> web.Response:
     return web.json_response(data=data)
 
 
+# runners open up to 200 sessions at once
+MAX_SESSIONS_BATCH_SIZE = 200
+
+
+async def create_sessions_handler(request: web.Request) -> web.StreamResponse:
+    """Creates a batch of sessions, every result is streamed as a NDJSON line once its session is created"""
+    uc: SessionUseCase = request.app[consts.SESSION_USE_CASE_KEY]
+
+    session_requests = get_session_requests(await request.json())
+
+    response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+    await response.prepare(request)
+
+    async with contextlib.aclosing(uc.create_sessions(session_requests=session_requests)) as results:
+        async for index, result in results:
+            line: dict[str, t.Any] = {"index": index}
+            if isinstance(result, Exception):
+                line["error"] = str(result) or type(result).__name__
+            else:
+                line["value"] = result
+            await response.write(json.dumps(line).encode() + b"\n")
+
+    await response.write_eof()
+    return response
+
+
+def get_session_requests(body: t.Any) -> list[dict[str, t.Any]]:
+    session_requests = body.get("sessions") if isinstance(body, dict) else None
+
+    if not isinstance(session_requests, list) or not all(isinstance(item, dict) for item in session_requests):
+        raise ValidationError("sessions must be a list of session requests")
+    if not 0 < len(session_requests) <= MAX_SESSIONS_BATCH_SIZE:
+        raise ValidationError(f"sessions must contain from 1 to {MAX_SESSIONS_BATCH_SIZE} session requests")
+
+    return session_requests
+
+
 async def delete_session_handler(request: web.Request) -> web.Response:
     uc: SessionUseCase = request.app[consts.SESSION_USE_CASE_KEY]
 
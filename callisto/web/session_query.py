@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import typing as t
+
+import aiohttp.web as web
+
+from ..libs.domains import consts
+from ..libs.exceptions import SessionNotFound, ValidationError
+from . import get_pod_name
+
+
+if t.TYPE_CHECKING:
+    from ..libs.use_cases.session_query import SessionQueryUseCase
+
+
+DEFAULT_SESSIONS_LIMIT = 100
+MAX_SESSIONS_LIMIT = 1000
+# query parameter -> indexed session field
+SESSION_FILTERS = {
+    "browser": "browser_name",
+    "version": "browser_version",
+    "test": "test_name",
+    "node": "node_name",
+}
+
+
+async def list_sessions_handler(request: web.Request) -> web.Response:
+    uc: SessionQueryUseCase = request.app[consts.SESSION_QUERY_USE_CASE_KEY]
+
+    data = uc.list_sessions(
+        filters={field: request.query[param] for param, field in SESSION_FILTERS.items() if param in request.query},
+        limit=get_limit(request),
+        cursor=request.query.get("cursor"),
+    )
+
+    return web.json_response(data=data)
+
+
+async def session_timeline_handler(request: web.Request) -> web.Response:
+    uc: SessionQueryUseCase = request.app[consts.SESSION_QUERY_USE_CASE_KEY]
+
+    try:
+        data = await uc.get_timeline(pod_name=get_pod_name(request))
+    except SessionNotFound as e:
+        return web.json_response(text=str(e), status=web.HTTPNotFound.status_code)
+
+    return web.json_response(data=data)
+
+
+def get_limit(request: web.Request) -> int:
+    try:
+        limit = int(request.query.get("limit", DEFAULT_SESSIONS_LIMIT))
+    except ValueError:
+        raise ValidationError("limit must be an integer")
+    if not 0 < limit <= MAX_SESSIONS_LIMIT:
+        raise ValidationError(f"limit must be from 1 to {MAX_SESSIONS_LIMIT}")
+
+    return limit
@@ -3,6 +3,7 @@ from __future__ import annotations
 import typing as t
 
 import aiohttp.web as web
+from aiohttp import hdrs
 
 from ..libs.domains import consts
 
@@ -14,6 +15,18 @@ if t.TYPE_CHECKING:
 async def status_handler(request: web.Request) -> web.Response:
     uc: StatusUseCase = request.app[consts.STATUS_USE_CASE_KEY]
 
-    status_data = uc.get_status()
+    # requests of the other replicas, see `ReplicaService.get_peer_statuses`
+    local = request.query.get("local") == "true"
 
-    return web.json_response(data=status_data)
+    status_body = await uc.get_status(local=local)
+    headers = {hdrs.ETAG: status_body.etag, hdrs.VARY: hdrs.ACCEPT_ENCODING}
+
+    # Selenoid-UI polls the status every second, unchanged status is not sent again
+    if status_body.etag in map(str.strip, request.headers.get(hdrs.IF_NONE_MATCH, "").split(",")):
+        return web.Response(status=web.HTTPNotModified.status_code, headers=headers)
+
+    if "gzip" in request.headers.get(hdrs.ACCEPT_ENCODING, ""):
+        headers[hdrs.CONTENT_ENCODING] = "gzip"
+        return web.Response(body=status_body.gzipped, content_type="application/json", headers=headers)
+
+    return web.Response(body=status_body.body, content_type="application/json", headers=headers)
@@ -1,39 +1,98 @@
 from __future__ import annotations
 
+from types import SimpleNamespace
 from unittest import mock
 
 import pytest
 from aiohttp import web
 from aiohttp.test_utils import TestClient as AiohttpTestClient
 from aiohttp.test_utils import TestServer
-
-from callisto.app.agent.state import init_state_service
+from prometheus_client import CollectorRegistry
+
+from callisto.app.agent.image_prepull import init_image_prepull_service
+from callisto.app.agent.k8s import init_k8s_api_prober
+from callisto.app.agent.pod_gc import init_pod_garbage_collector
+from callisto.app.agent.pod_hedge import init_pod_hedge_service
+from callisto.app.agent.pod_pool import init_pod_pool_service
+from callisto.app.agent.pod_recycle import init_pod_recycle_service
+from callisto.app.agent.replica import init_replica_service
+from callisto.app.agent.session_reaper import init_session_reaper
+from callisto.app.agent.state import init_metrics_registry, init_state_service
 from callisto.app.agent.webdriver import init_webdriver_service
 from callisto.libs.domains import consts
-from callisto.libs.domains.config import K8sConfig, PodConfig
+from callisto.libs.domains.config import (
+    ImageLocalityConfig,
+    ImagePrePullConfig,
+    K8sCircuitBreakerConfig,
+    K8sConfig,
+    K8sRateLimitConfig,
+    MetricsConfig,
+    NodeAvoidanceConfig,
+    PodConfig,
+    PodDeletionConfig,
+    PodGcConfig,
+    PodHedgeConfig,
+    PodPoolConfig,
+    PodReadinessConfig,
+    PodRecycleConfig,
+    RateLimit,
+    ReplicaConfig,
+    SessionReaperConfig,
+    WebDriverConfig,
+)
 from callisto.libs.middleware import error_middleware, tracing_middleware_factory
+from callisto.libs.services.k8s.circuit_breaker import K8sCircuitBreaker
 from callisto.libs.services.k8s.client import K8sClient
+from callisto.libs.services.k8s.rate_limiter import K8sRateLimiter
+from callisto.libs.services.k8s.retry import K8sRetry
 from callisto.libs.services.k8s.service import K8sService
-from callisto.libs.services.pod_event import PodEventService
 from callisto.libs.services.task_runner import TaskRunnerService
 from callisto.libs.services.webdriver.protocol import WebDriverProtocol
 from callisto.libs.trace import request_then_uuid_factory, trace_id
 from callisto.libs.use_cases.health_check import HealthCheckUseCase
 from callisto.libs.use_cases.metrics import MetricsUseCase
 from callisto.libs.use_cases.session import SessionUseCase
+from callisto.libs.use_cases.session_query import SessionQueryUseCase
 from callisto.libs.use_cases.status import StatusUseCase
 from callisto.libs.use_cases.webdriver_logs import WebdriverLogsUseCase
 from callisto.web.routes import setup_routes
 
 
-async def _init_k8s_service(k8s_config: K8sConfig, task_runner_service: TaskRunnerService) -> K8sService:
-    k8s_client = K8sClient(core_client=mock.Mock(), v1_client=mock.Mock(), task_runner_service=task_runner_service)
+async def _init_k8s_service(
+    k8s_config: K8sConfig,
+    rate_limit_config: K8sRateLimitConfig,
+    circuit_breaker_config: K8sCircuitBreakerConfig,
+    deletion_config: PodDeletionConfig,
+    readiness_config: PodReadinessConfig,
+    node_avoidance_config: NodeAvoidanceConfig,
+    image_locality_config: ImageLocalityConfig,
+    task_runner_service: TaskRunnerService,
+    metrics_registry: CollectorRegistry,
+    instance_id: str,
+) -> K8sService:
+    k8s_client = K8sClient(
+        core_client=mock.Mock(),
+        v1_client=mock.Mock(),
+        apps_client=mock.Mock(),
+        rate_limiter=K8sRateLimiter(
+            config=rate_limit_config, metrics_registry=metrics_registry, instance_id=instance_id
+        ),
+        retry=K8sRetry(metrics_registry=metrics_registry, instance_id=instance_id),
+        circuit_breaker=K8sCircuitBreaker(config=circuit_breaker_config),
+    )
 
     k8s_service = K8sService(
         k8s_client=k8s_client,
         namespace=k8s_config.namespace,
-        pod_event_service=PodEventService(),
         task_runner_service=task_runner_service,
+        instance_id=instance_id,
+        deletion_config=deletion_config,
+        readiness_config=readiness_config,
+        node_avoidance_config=node_avoidance_config,
+        image_locality_config=image_locality_config,
+        metrics_registry=metrics_registry,
+        pod_field_selector=k8s_config.pod_field_selector,
+        node_pool_label=k8s_config.node_pool_label,
     )
     return k8s_service
 
@@ -50,39 +109,186 @@ async def _init_task_runner_service() -> TaskRunnerService:
 
 @pytest.fixture
 def get_config():
-    k8s_config = K8sConfig(in_cluster=True, namespace="default")
+    k8s_config = K8sConfig(
+        in_cluster=True, namespace="default", pod_field_selector=None, node_pool_label="cloud.google.com/gke-nodepool"
+    )
+    k8s_rate_limit_config = K8sRateLimitConfig(total=RateLimit(qps=0, burst=1), verbs={})
+    k8s_circuit_breaker_config = K8sCircuitBreakerConfig(
+        failure_ratio=0.5, min_calls=20, window=30, slow_call_duration=10, open_duration=15
+    )
+    pod_deletion_config = PodDeletionConfig(batch_size=50, flush_interval=0, concurrency=4, grace_period=None)
+    pod_readiness_config = PodReadinessConfig(
+        timeout=300,
+        fail_fast_reasons=frozenset({"ImagePullBackOff", "CrashLoopBackOff", "Unschedulable"}),
+        unschedulable_min_age=120,
+    )
+    node_avoidance_config = NodeAvoidanceConfig(
+        enabled=False, half_life=1800, min_samples=5, latency_factor=2, max_failure_ratio=0.5, max_nodes=3
+    )
+    image_locality_config = ImageLocalityConfig(enabled=False, weight=50, max_nodes=100)
+    image_prepull_config = ImagePrePullConfig(
+        enabled=False,
+        daemon_set_name="callisto-image-prepull",
+        min_node_ratio=0.8,
+        interval=15,
+        pause_image="registry.k8s.io/pause:3.9",
+        helper_image="busybox:1.36",
+    )
     pod_config = PodConfig(manifest={}, webdriver_path="", webdriver_port=4444)
+    pod_pool_config = PodPoolConfig(target_size=0, max_size=0, refill_concurrency=1)
+    pod_hedge_config = PodHedgeConfig(enabled=False, percentile=95, min_delay=10, max_ratio=0.1)
+    pod_recycle_config = PodRecycleConfig(enabled=False, max_reuses=10, max_age=1800)
+    pod_gc_config = PodGcConfig(
+        enabled=False,
+        dry_run=False,
+        interval=60,
+        grace_period=600,
+        pending_timeout=900,
+        max_session_age=0,
+        max_deletions=20,
+    )
+    session_reaper_config = SessionReaperConfig(enabled=False, idle_timeout=1800, interval=60, concurrency=10)
+    replica_config = ReplicaConfig(peers=(), peer_url_template="", timeout=5)
+    metrics_config = MetricsConfig(cache_ttl=5, k8s_probe_interval=0)
+    webdriver_config = WebDriverConfig(
+        connections_limit=10,
+        connections_limit_per_host=2,
+        keepalive_timeout=30,
+        connect_timeout=5,
+        read_timeout=5,
+        ready_timeout=1,
+    )
     instance_id = "unknown"
     graylog_config = None
 
-    return k8s_config, pod_config, instance_id, graylog_config
+    return SimpleNamespace(
+        k8s_config=k8s_config,
+        k8s_rate_limit_config=k8s_rate_limit_config,
+        k8s_circuit_breaker_config=k8s_circuit_breaker_config,
+        pod_deletion_config=pod_deletion_config,
+        pod_readiness_config=pod_readiness_config,
+        node_avoidance_config=node_avoidance_config,
+        image_locality_config=image_locality_config,
+        image_prepull_config=image_prepull_config,
+        pod_config=pod_config,
+        pod_pool_config=pod_pool_config,
+        pod_hedge_config=pod_hedge_config,
+        pod_recycle_config=pod_recycle_config,
+        pod_gc_config=pod_gc_config,
+        session_reaper_config=session_reaper_config,
+        replica_config=replica_config,
+        metrics_config=metrics_config,
+        webdriver_config=webdriver_config,
+        instance_id=instance_id,
+        graylog_config=graylog_config,
+    )
 
 
 @pytest.fixture
 async def app_state(get_config):
-    k8s_config, pod_config, instance_id, graylog_config = get_config
+    config = get_config
 
     task_runner_service = await _init_task_runner_service()
-    k8s_service = await _init_k8s_service(k8s_config=k8s_config, task_runner_service=task_runner_service)
-    state_service = init_state_service(k8s_service=k8s_service, instance_id=instance_id)
-
-    webdriver_service = init_webdriver_service(task_runner_service, pod_config=pod_config)
-
-    return {
-        consts.HEALTH_CHECK_USE_CASE_KEY: HealthCheckUseCase(),
-        consts.METRICS_USE_CASE_KEY: MetricsUseCase(state_service=state_service),
-        consts.SESSION_USE_CASE_KEY: SessionUseCase(
-            k8s_service=k8s_service,
-            webdriver_service=webdriver_service,
-            pod_config=pod_config,
-            state_service=state_service,
-            task_runner_service=task_runner_service,
-            webdriver_protocol=WebDriverProtocol(callisto_domain="callisto.domain"),
+    metrics_registry = init_metrics_registry()
+    k8s_service = await _init_k8s_service(
+        k8s_config=config.k8s_config,
+        rate_limit_config=config.k8s_rate_limit_config,
+        circuit_breaker_config=config.k8s_circuit_breaker_config,
+        deletion_config=config.pod_deletion_config,
+        readiness_config=config.pod_readiness_config,
+        node_avoidance_config=config.node_avoidance_config,
+        image_locality_config=config.image_locality_config,
+        task_runner_service=task_runner_service,
+        metrics_registry=metrics_registry,
+        instance_id=config.instance_id,
+    )
+    state_service = init_state_service(
+        k8s_service=k8s_service, metrics_registry=metrics_registry, instance_id=config.instance_id
+    )
+    await init_k8s_api_prober(
+        k8s_service=k8s_service,
+        task_runner_service=task_runner_service,
+        state_service=state_service,
+        interval=config.metrics_config.k8s_probe_interval,
+    )
+
+    webdriver_service = init_webdriver_service(
+        task_runner_service,
+        pod_config=config.pod_config,
+        webdriver_config=config.webdriver_config,
+        state_service=state_service,
+    )
+    image_prepull_service = await init_image_prepull_service(
+        k8s_service=k8s_service,
+        task_runner_service=task_runner_service,
+        state_service=state_service,
+        pod_config=config.pod_config,
+        prepull_config=config.image_prepull_config,
+    )
+    pod_pool_service = await init_pod_pool_service(
+        k8s_service=k8s_service,
+        task_runner_service=task_runner_service,
+        state_service=state_service,
+        pod_config=config.pod_config,
+        pool_config=config.pod_pool_config,
+        image_prepull_service=image_prepull_service,
+    )
+    pod_hedge_service = init_pod_hedge_service(hedge_config=config.pod_hedge_config, state_service=state_service)
+    pod_recycle_service = await init_pod_recycle_service(
+        k8s_service=k8s_service,
+        task_runner_service=task_runner_service,
+        state_service=state_service,
+        pod_config=config.pod_config,
+        recycle_config=config.pod_recycle_config,
+        image_prepull_service=image_prepull_service,
+    )
+    await init_pod_garbage_collector(
+        k8s_service=k8s_service,
+        state_service=state_service,
+        pod_pool_service=pod_pool_service,
+        pod_recycle_service=pod_recycle_service,
+        task_runner_service=task_runner_service,
+        gc_config=config.pod_gc_config,
+    )
+
+    replica_service = init_replica_service(replica_config=config.replica_config, state_service=state_service)
+
+    session_use_case = SessionUseCase(
+        k8s_service=k8s_service,
+        webdriver_service=webdriver_service,
+        pod_config=config.pod_config,
+        state_service=state_service,
+        task_runner_service=task_runner_service,
+        webdriver_protocol=WebDriverProtocol(callisto_domain="callisto.domain"),
+        pod_pool_service=pod_pool_service,
+        pod_hedge_service=pod_hedge_service,
+        pod_recycle_service=pod_recycle_service,
+        replica_service=replica_service,
+        image_prepull_service=image_prepull_service,
+    )
+    await init_session_reaper(
+        session_use_case=session_use_case,
+        k8s_service=k8s_service,
+        webdriver_service=webdriver_service,
+        state_service=state_service,
+        task_runner_service=task_runner_service,
+        reaper_config=config.session_reaper_config,
+    )
+
+    yield {
+        consts.HEALTH_CHECK_USE_CASE_KEY: HealthCheckUseCase(k8s_service=k8s_service),
+        consts.METRICS_USE_CASE_KEY: MetricsUseCase(
+            state_service=state_service, cache_ttl=config.metrics_config.cache_ttl
         ),
-        consts.STATUS_USE_CASE_KEY: StatusUseCase(state_service=state_service),
+        consts.SESSION_USE_CASE_KEY: session_use_case,
+        consts.SESSION_QUERY_USE_CASE_KEY: SessionQueryUseCase(state_service=state_service, k8s_service=k8s_service),
+        consts.STATUS_USE_CASE_KEY: StatusUseCase(state_service=state_service, replica_service=replica_service),
         consts.WEBDRIVER_LOGS_USE_CASE_KEY: WebdriverLogsUseCase(k8s_service),
     }
 
+    await webdriver_service.client.close()
+    await replica_service.close()
+
 
 @pytest.fixture
 async def run_test_server(app_state):
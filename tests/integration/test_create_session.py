@@ -19,6 +19,7 @@ async def test_create_session(run_test_server, aiohttp_test_client, k8s_pod, ses
     app[consts.SESSION_USE_CASE_KEY].k8s_service.create_pod = mock.AsyncMock(return_value=k8s_pod())
     app[consts.SESSION_USE_CASE_KEY].k8s_service.wait_until_pod_is_ready = mock.AsyncMock()
     app[consts.SESSION_USE_CASE_KEY].k8s_service.get_pod = mock.AsyncMock(return_value=k8s_pod())
+    app[consts.SESSION_USE_CASE_KEY].webdriver_service.wait_until_ready = mock.AsyncMock(return_value=1)
     app[consts.SESSION_USE_CASE_KEY].webdriver_service.create_session = mock.AsyncMock(
         return_value=session_created_response
     )
@@ -71,6 +72,7 @@ async def test_delete_pod_on_error_during_creation_webdriver_session(run_test_se
     app[consts.SESSION_USE_CASE_KEY].k8s_service.create_pod = mock.AsyncMock(return_value=k8s_pod())
     app[consts.SESSION_USE_CASE_KEY].k8s_service.wait_until_pod_is_ready = mock.AsyncMock()
     app[consts.SESSION_USE_CASE_KEY].k8s_service.get_pod = mock.AsyncMock(return_value=k8s_pod())
+    app[consts.SESSION_USE_CASE_KEY].webdriver_service.wait_until_ready = mock.AsyncMock(return_value=1)
     app[consts.SESSION_USE_CASE_KEY].webdriver_service.create_session = mock.AsyncMock(side_effect=WebDriverException())
     app[consts.SESSION_USE_CASE_KEY].k8s_service.delete_pod = mock.AsyncMock()
 
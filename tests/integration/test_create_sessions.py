@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import copy
+import json
+from unittest import mock
+
+from aiohttp import web
+
+from callisto.libs.domains import consts
+from callisto.libs.exceptions import WebDriverException
+
+
+async def test_create_sessions(run_test_server, aiohttp_test_client, k8s_pod, session_created_response):
+    app, server = await run_test_server()
+    client = aiohttp_test_client(server)
+    webdriver_requests = [{"desiredCapabilities": {"browserName": "chrome"}} for _ in range(3)]
+
+    app[consts.SESSION_USE_CASE_KEY].k8s_service.create_pod = mock.AsyncMock(return_value=k8s_pod())
+    app[consts.SESSION_USE_CASE_KEY].k8s_service.wait_until_pod_is_ready = mock.AsyncMock()
+    app[consts.SESSION_USE_CASE_KEY].k8s_service.get_pod = mock.AsyncMock(return_value=k8s_pod())
+    app[consts.SESSION_USE_CASE_KEY].webdriver_service.wait_until_ready = mock.AsyncMock(return_value=1)
+    app[consts.SESSION_USE_CASE_KEY].webdriver_service.create_session = mock.AsyncMock(
+        return_value=session_created_response
+    )
+
+    resp = await client.post("/api/v1/sessions", json={"sessions": webdriver_requests})
+
+    assert resp.status == web.HTTPOk.status_code
+    assert resp.content_type == "application/x-ndjson"
+    lines = [json.loads(line) for line in (await resp.text()).splitlines()]
+    assert sorted(line["index"] for line in lines) == [0, 1, 2]
+    assert all("value" in line for line in lines)
+    assert app[consts.SESSION_USE_CASE_KEY].k8s_service.create_pod.call_count == 3
+    assert app[consts.SESSION_USE_CASE_KEY].webdriver_service.create_session.call_count == 3
+
+
+async def test_create_sessions_reports_failed_sessions(
+    run_test_server, aiohttp_test_client, k8s_pod, session_created_response
+):
+    app, server = await run_test_server()
+    client = aiohttp_test_client(server)
+    webdriver_requests = [{"desiredCapabilities": {"browserName": "chrome"}} for _ in range(2)]
+
+    app[consts.SESSION_USE_CASE_KEY].k8s_service.create_pod = mock.AsyncMock(return_value=k8s_pod())
+    app[consts.SESSION_USE_CASE_KEY].k8s_service.wait_until_pod_is_ready = mock.AsyncMock()
+    app[consts.SESSION_USE_CASE_KEY].k8s_service.get_pod = mock.AsyncMock(return_value=k8s_pod())
+    app[consts.SESSION_USE_CASE_KEY].k8s_service.delete_pod = mock.AsyncMock()
+    app[consts.SESSION_USE_CASE_KEY].webdriver_service.wait_until_ready = mock.AsyncMock(return_value=1)
+    app[consts.SESSION_USE_CASE_KEY].webdriver_service.create_session = mock.AsyncMock(
+        side_effect=[session_created_response, WebDriverException("session not created")]
+    )
+
+    resp = await client.post("/api/v1/sessions", json={"sessions": webdriver_requests})
+
+    assert resp.status == web.HTTPOk.status_code
+    lines = [json.loads(line) for line in (await resp.text()).splitlines()]
+    assert len([line for line in lines if "value" in line]) == 1
+    assert [line["error"] for line in lines if "error" in line] == ["session not created"]
+    app[consts.SESSION_USE_CASE_KEY].k8s_service.delete_pod.assert_called_once()
+
+
+async def test_undelivered_sessions_are_deleted(run_test_server, k8s_pod, session_created_response):
+    app, _ = await run_test_server()
+    uc = app[consts.SESSION_USE_CASE_KEY]
+    pods = [k8s_pod(f"browser-{i}") for i in range(3)]
+
+    uc.k8s_service.create_pod = mock.AsyncMock(side_effect=pods)
+    uc.k8s_service.wait_until_pod_is_ready = mock.AsyncMock()
+    uc.k8s_service.get_pod = mock.AsyncMock(side_effect=k8s_pod)
+    uc.k8s_service.delete_pod = mock.AsyncMock()
+    uc.webdriver_service.wait_until_ready = mock.AsyncMock(return_value=1)
+    uc.webdriver_service.create_session = mock.AsyncMock(
+        side_effect=lambda **_: copy.deepcopy(session_created_response)
+    )
+
+    # the first result is written, the client disconnects while the second one is written
+    delivered = []
+    async with contextlib.aclosing(uc.create_sessions(session_requests=[{}, {}, {}])) as results:
+        async for result in results:
+            if delivered:
+                break
+            await asyncio.sleep(0.05)
+            delivered.append(result)
+
+    assert len(uc.state_service.sessions) == 1
+    delivered_pod = next(iter(uc.state_service.sessions))
+    deleted_pods = {call.kwargs["name"] for call in uc.k8s_service.delete_pod.call_args_list}
+    assert deleted_pods == {"browser-0", "browser-1", "browser-2"} - {delivered_pod}
+
+
+async def test_create_sessions_validates_batch(run_test_server, aiohttp_test_client):
+    app, server = await run_test_server()
+    client = aiohttp_test_client(server)
+
+    resp = await client.post("/api/v1/sessions", json={"sessions": []})
+
+    assert resp.status == web.HTTPInternalServerError.status_code
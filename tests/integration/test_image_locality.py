@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import dataclasses as dc
+from asyncio import CancelledError
+from datetime import datetime, timezone
+from unittest import mock
+
+import pytest
+from kubernetes_asyncio.client import (
+    V1ContainerImage,
+    V1Node,
+    V1NodeSpec,
+    V1NodeStatus,
+    V1ObjectMeta,
+    V1PodCondition,
+)
+
+from callisto.libs.domains import consts
+from callisto.libs.exceptions import K8sWatchExpired
+from callisto.libs.services.k8s.images import normalize_image
+
+
+MANIFEST = {"spec": {"containers": [{"name": "browser", "image": "selenoid/vnc:chrome_77.0"}]}}
+
+
+def make_node(name, *images):
+    return V1Node(
+        metadata=V1ObjectMeta(name=name),
+        status=V1NodeStatus(images=[V1ContainerImage(names=[image], size_bytes=1) for image in images]),
+    )
+
+
+@pytest.fixture
+async def k8s_service(run_test_server):
+    app, _ = await run_test_server()
+    k8s_service = app[consts.SESSION_USE_CASE_KEY].k8s_service
+    k8s_service.image_locality_config = dc.replace(k8s_service.image_locality_config, enabled=True)
+    return k8s_service
+
+
+def test_normalize_image():
+    assert normalize_image("chrome") == "docker.io/library/chrome:latest"
+    assert normalize_image("selenoid/vnc:chrome_77.0") == "docker.io/selenoid/vnc:chrome_77.0"
+    assert normalize_image("registry:5000/selenoid/vnc") == "registry:5000/selenoid/vnc:latest"
+    assert normalize_image("gcr.io/selenoid/vnc@sha256:eb82") == "gcr.io/selenoid/vnc@sha256:eb82"
+
+
+async def test_pod_spec_prefers_nodes_with_image(k8s_service):
+    k8s_service.image_locality.cache.replace(
+        [
+            make_node("node-1", "docker.io/selenoid/vnc:chrome_77.0"),
+            make_node("node-2", "docker.io/selenoid/vnc:chrome_76.0"),
+            make_node("node-3", "docker.io/selenoid/vnc:chrome_77.0", "docker.io/selenoid/vnc:chrome_76.0"),
+        ],
+        resource_version="1",
+    )
+
+    spec = k8s_service.label_pod_spec(MANIFEST)
+
+    assert spec["spec"]["affinity"]["nodeAffinity"]["preferredDuringSchedulingIgnoredDuringExecution"] == [
+        {
+            "weight": 50,
+            "preference": {
+                "matchExpressions": [
+                    {"key": "kubernetes.io/hostname", "operator": "In", "values": ["node-1", "node-3"]}
+                ]
+            },
+        }
+    ]
+    assert spec["metadata"]["labels"]["callisto/pod-id"] in k8s_service.image_locality.pending_pods
+
+
+async def test_preferred_nodes_are_sampled(k8s_service):
+    image_locality = k8s_service.image_locality
+    image_locality.config = dc.replace(image_locality.config, max_nodes=2)
+    image_locality.cache.replace(
+        [make_node(f"node-{i}", "docker.io/selenoid/vnc:chrome_77.0") for i in range(10)] + [make_node("node-cold")],
+        resource_version="1",
+    )
+
+    preferred = [image_locality.get_preferred_nodes(MANIFEST, pod_id=str(i)) for i in range(20)]
+
+    assert all(len(nodes) == 2 and "node-cold" not in nodes for nodes in preferred)
+    # pods are not concentrated on the same nodes
+    assert len({node for nodes in preferred for node in nodes}) > 2
+
+
+async def test_no_preferred_nodes_if_all_nodes_hold_images(k8s_service):
+    cordoned_node = make_node("node-cordoned")
+    cordoned_node.spec = V1NodeSpec(unschedulable=True)
+    k8s_service.image_locality.cache.replace(
+        [
+            make_node("node-1", "docker.io/selenoid/vnc:chrome_77.0"),
+            make_node("node-2", "docker.io/selenoid/vnc:chrome_77.0"),
+            cordoned_node,
+        ],
+        resource_version="1",
+    )
+
+    spec = k8s_service.label_pod_spec(MANIFEST)
+
+    assert "affinity" not in spec["spec"]
+
+
+async def test_record_placement(k8s_service, k8s_pod):
+    k8s_service.image_locality.cache.replace(
+        [make_node("gke-farm-9f6d8393-7qp2", "docker.io/selenoid/vnc:chrome_77.0")], resource_version="1"
+    )
+    spec = k8s_service.label_pod_spec(MANIFEST)
+
+    pod = k8s_pod()
+    pod.metadata.labels = spec["metadata"]["labels"]
+    pod.status.conditions = [
+        V1PodCondition(
+            type="Ready", status="True", last_transition_time=datetime(2019, 12, 23, 13, 4, 49, tzinfo=timezone.utc)
+        )
+    ]
+    k8s_service.pod_cache.set(pod)
+
+    await k8s_service.record_pod_timeline("browser-xtc9s")
+
+    image_locality = k8s_service.image_locality
+    labels = {"instance_id": "unknown", "placement": "local"}
+    assert image_locality.placements.labels(**labels)._value.get() == 1
+    assert image_locality.ready_duration.labels(**labels)._sum.get() == 10
+    assert not image_locality.pending_pods
+
+
+async def test_node_images_relist_on_expired_watch(k8s_service):
+    watch_calls = []
+
+    async def watch_node_events(resource_version):
+        watch_calls.append(resource_version)
+        if len(watch_calls) == 1:
+            raise K8sWatchExpired()
+        yield "MODIFIED", make_node("node-2", "docker.io/selenoid/vnc:chrome_77.0"), "3"
+        yield "DELETED", make_node("node-1"), "4"
+        raise CancelledError()
+
+    k8s_service.k8s_client.list_nodes = mock.AsyncMock(
+        side_effect=[
+            mock.Mock(
+                items=[make_node("node-1", "docker.io/selenoid/vnc:chrome_77.0")],
+                metadata=mock.Mock(resource_version="1"),
+            ),
+            mock.Mock(
+                items=[make_node("node-1", "docker.io/selenoid/vnc:chrome_77.0")],
+                metadata=mock.Mock(resource_version="2"),
+            ),
+        ]
+    )
+    k8s_service.k8s_client.watch_node_events = watch_node_events
+
+    with pytest.raises(CancelledError):
+        await k8s_service.watch_nodes()
+
+    node_images = k8s_service.image_locality.cache
+    assert watch_calls == ["1", "2"]
+    assert node_images.resource_version == "4"
+    assert node_images.get_nodes({"docker.io/selenoid/vnc:chrome_77.0"}) == {"node-2"}
+    assert list(node_images.node_images) == ["node-2"]
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import json
+from unittest import mock
+
+from kubernetes_asyncio.client import (
+    V1ContainerState,
+    V1ContainerStateWaiting,
+    V1ContainerStatus,
+    V1DaemonSet,
+    V1DaemonSetStatus,
+    V1ObjectMeta,
+)
+from prometheus_client import CollectorRegistry
+
+from callisto.libs.domains import consts
+from callisto.libs.domains.config import ImagePrePullConfig, PodConfig
+from callisto.libs.services.image_prepull import ImagePrePullService
+from callisto.libs.services.status_document import StatusDocument
+
+
+def make_manifest(version):
+    return {
+        "metadata": {"generateName": "browser-"},
+        "spec": {
+            "nodeSelector": {"pool": "browsers"},
+            "containers": [
+                {"name": "browser", "image": f"selenoid/vnc:chrome_{version}"},
+                {"name": "recorder", "image": "selenoid/video-recorder"},
+            ],
+        },
+    }
+
+
+def make_daemon_set(manifest_hash, manifest, desired=0):
+    return V1DaemonSet(
+        metadata=V1ObjectMeta(
+            name="callisto-image-prepull",
+            generation=2,
+            annotations={"callisto/manifest-hash": manifest_hash, "callisto/pod-manifest": json.dumps(manifest)},
+        ),
+        status=V1DaemonSetStatus(
+            desired_number_scheduled=desired,
+            observed_generation=2,
+            current_number_scheduled=desired,
+            number_misscheduled=0,
+            number_ready=0,
+        ),
+    )
+
+
+def make_ready(pod):
+    pod.status.conditions[0].status = "True"
+    return pod
+
+
+async def _prepull_service(run_test_server, manifest):
+    app, _ = await run_test_server()
+    k8s_service = app[consts.SESSION_USE_CASE_KEY].k8s_service
+    k8s_service.create_daemon_set = mock.AsyncMock()
+    k8s_service.patch_daemon_set = mock.AsyncMock()
+
+    return ImagePrePullService(
+        k8s_service=k8s_service,
+        task_runner_service=mock.Mock(),
+        pod_config=PodConfig(manifest=manifest, webdriver_path="", webdriver_port=4444),
+        prepull_config=ImagePrePullConfig(
+            enabled=True,
+            daemon_set_name="callisto-image-prepull",
+            min_node_ratio=0.8,
+            interval=15,
+            pause_image="registry.k8s.io/pause:3.9",
+            helper_image="busybox:1.36",
+        ),
+        status_document=StatusDocument(),
+        metrics_registry=CollectorRegistry(),
+        instance_id="unknown",
+    )
+
+
+async def test_create_daemon_set(run_test_server):
+    service = await _prepull_service(run_test_server, make_manifest("78.0"))
+    service.k8s_service.get_daemon_set = mock.AsyncMock(return_value=None)
+
+    await service.roll_out()
+
+    spec = service.k8s_service.create_daemon_set.call_args.args[0]
+    template = spec["spec"]["template"]
+    init_containers = template["spec"]["initContainers"]
+    assert [container["image"] for container in init_containers] == [
+        "busybox:1.36",
+        "selenoid/vnc:chrome_78.0",
+        "selenoid/video-recorder",
+    ]
+    # the pulled images need no shell
+    assert all(container["command"] == service.PREPULL_COMMAND for container in init_containers[1:])
+    assert template["spec"]["volumes"] == [{"name": service.HELPER_VOLUME, "emptyDir": {}}]
+    assert template["spec"]["nodeSelector"] == {"pool": "browsers"}
+    assert template["metadata"]["labels"]["callisto/manifest-hash"] == service.target_hash
+    assert service.switched
+
+
+async def test_switch_manifest_after_images_are_pulled(run_test_server, k8s_pod):
+    old_manifest, new_manifest = make_manifest("77.0"), make_manifest("78.0")
+    service = await _prepull_service(run_test_server, new_manifest)
+    k8s_service = service.k8s_service
+    old_hash = k8s_service.get_manifest_hash(old_manifest)
+
+    k8s_service.get_daemon_set = mock.AsyncMock(return_value=make_daemon_set(old_hash, old_manifest))
+    await service.roll_out()
+
+    # sessions keep the previous manifest while the new images are pulled
+    assert service.manifest == old_manifest
+    assert service.is_outdated(service.target_hash)
+    patch = k8s_service.patch_daemon_set.call_args.args[1]
+    assert patch[0]["path"] == "/spec/template"
+    assert patch[1]["value"]["callisto/manifest-hash"] == service.target_hash
+
+    k8s_service.get_daemon_set = mock.AsyncMock(
+        return_value=make_daemon_set(service.target_hash, old_manifest, desired=2)
+    )
+    k8s_service.list_pods = mock.AsyncMock(return_value=[make_ready(k8s_pod("prepull-1")), k8s_pod("prepull-2")])
+    await service.check_progress()
+
+    assert not service.switched
+    status = json.loads(service.status_document.render(pending=0).body)
+    assert status["image_prepull"] == {
+        "manifest_hash": service.target_hash,
+        "active_manifest_hash": old_hash,
+        "switched": False,
+        "desired_nodes": 2,
+        "ready_nodes": 1,
+        "failing_nodes": 0,
+    }
+
+    k8s_service.list_pods.return_value = [make_ready(k8s_pod("prepull-1")), make_ready(k8s_pod("prepull-2"))]
+    await service.check_progress()
+
+    assert service.switched
+    assert service.manifest == new_manifest
+    annotations = k8s_service.patch_daemon_set.call_args.args[1][0]["value"]
+    assert json.loads(annotations["callisto/pod-manifest"]) == new_manifest
+    assert service.prepull_switched.labels(instance_id="unknown")._value.get() == 1
+
+
+async def test_report_failing_prepull_pods(run_test_server, k8s_pod):
+    manifest = make_manifest("78.0")
+    service = await _prepull_service(run_test_server, manifest)
+    k8s_service = service.k8s_service
+    k8s_service.get_daemon_set = mock.AsyncMock(return_value=make_daemon_set(service.target_hash, manifest, desired=2))
+
+    failing_pod = k8s_pod("prepull-2")
+    failing_pod.status.init_container_statuses = [
+        V1ContainerStatus(
+            name="image-0",
+            image="selenoid/vnc:chrome_78.0",
+            image_id="",
+            ready=False,
+            restart_count=3,
+            state=V1ContainerState(waiting=V1ContainerStateWaiting(reason="CrashLoopBackOff")),
+        )
+    ]
+    k8s_service.list_pods = mock.AsyncMock(return_value=[make_ready(k8s_pod("prepull-1")), failing_pod])
+    await service.check_progress()
+
+    status = json.loads(service.status_document.render(pending=0).body)
+    assert status["image_prepull"]["failing_nodes"] == 1
+    assert service.prepull_nodes.labels(instance_id="unknown", state="failing")._value.get() == 1
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from unittest import mock
+
+import pytest
+from aiohttp import web
+from kubernetes_asyncio.client.rest import ApiException
+
+from callisto.libs.domains import consts
+from callisto.libs.exceptions import K8sApiUnavailable
+from callisto.libs.services.k8s.circuit_breaker import CircuitState
+from callisto.libs.services.k8s.retry import K8sRetry, RetryPolicy
+
+
+def api_exception(status: int) -> ApiException:
+    return ApiException(http_resp=mock.Mock(status=status, reason="", data=b"", getheaders=mock.Mock(return_value={})))
+
+
+async def test_shed_session_requests_while_circuit_is_open(run_test_server, aiohttp_test_client):
+    app, server = await run_test_server()
+    client = aiohttp_test_client(server)
+    k8s_client = app[consts.SESSION_USE_CASE_KEY].k8s_service.k8s_client
+
+    k8s_client.v1_client.create_namespaced_pod = mock.AsyncMock(side_effect=api_exception(503))
+    for _ in range(k8s_client.circuit_breaker.config.min_calls):
+        k8s_client.circuit_breaker.record(0.1, failed=True)
+
+    resp = await client.post("/api/v1/session", json={"desiredCapabilities": {"browserName": "chrome"}})
+
+    assert resp.status == web.HTTPServiceUnavailable.status_code
+    assert int(resp.headers["Retry-After"]) == 15
+    k8s_client.v1_client.create_namespaced_pod.assert_not_called()
+
+    resp = await client.get("/health")
+
+    assert resp.status == web.HTTPOk.status_code
+    assert (await resp.json())["k8s_api"]["circuit"] == CircuitState.OPEN.value
+    assert not await app[consts.SESSION_USE_CASE_KEY].k8s_service.api_is_available()
+
+
+async def test_open_circuit_on_failures_and_close_after_probe(run_test_server, k8s_pod):
+    app, server = await run_test_server()
+    k8s_client = app[consts.SESSION_USE_CASE_KEY].k8s_service.k8s_client
+    circuit_breaker = k8s_client.circuit_breaker
+
+    k8s_client.v1_client.read_namespaced_pod = mock.AsyncMock(side_effect=api_exception(500))
+    with mock.patch.dict(K8sRetry.POLICIES, {"get": RetryPolicy(attempts=1, backoff=0, max_backoff=0, deadline=1)}):
+        for _ in range(circuit_breaker.config.min_calls):
+            with pytest.raises(ApiException):
+                await k8s_client.get_pod(namespace="default", name="browser-xtc9s")
+
+        assert circuit_breaker.get_state() == CircuitState.OPEN
+        with pytest.raises(K8sApiUnavailable):
+            await k8s_client.get_pod(namespace="default", name="browser-xtc9s")
+
+        # the open duration is over
+        circuit_breaker.opened_at -= circuit_breaker.config.open_duration
+        assert circuit_breaker.get_state() == CircuitState.HALF_OPEN
+
+        k8s_client.v1_client.read_namespaced_pod = mock.AsyncMock(return_value=k8s_pod())
+        assert await k8s_client.get_pod(namespace="default", name="browser-xtc9s")
+
+    assert circuit_breaker.get_state() == CircuitState.CLOSED
+    assert k8s_client.v1_client.read_namespaced_pod.call_count == 1
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from unittest import mock
+
+import pytest
+from kubernetes_asyncio.client.rest import ApiException
+
+from callisto.libs.domains import consts
+from callisto.libs.exceptions import K8sPodNotFound
+from callisto.libs.services.k8s.retry import K8sRetry, RetryPolicy
+
+
+def api_exception(status: int, headers: dict[str, str] | None = None) -> ApiException:
+    return ApiException(
+        http_resp=mock.Mock(status=status, reason="", data=b"", getheaders=mock.Mock(return_value=headers or {}))
+    )
+
+
+async def test_fail_fast_on_client_error(run_test_server):
+    app, server = await run_test_server()
+    k8s_client = app[consts.SESSION_USE_CASE_KEY].k8s_service.k8s_client
+
+    k8s_client.v1_client.read_namespaced_pod = mock.AsyncMock(side_effect=api_exception(404))
+
+    with pytest.raises(K8sPodNotFound):
+        await k8s_client.get_pod(namespace="default", name="browser-xtc9s")
+
+    k8s_client.v1_client.read_namespaced_pod.assert_called_once()
+
+
+async def test_retry_throttled_call_after_retry_after(run_test_server, k8s_pod):
+    app, server = await run_test_server()
+    k8s_client = app[consts.SESSION_USE_CASE_KEY].k8s_service.k8s_client
+    pod = k8s_pod()
+
+    k8s_client.v1_client.create_namespaced_pod = mock.AsyncMock(
+        side_effect=[api_exception(429, {"Retry-After": "0.05"}), api_exception(503), pod]
+    )
+
+    with mock.patch.dict(
+        K8sRetry.POLICIES, {"create": RetryPolicy(attempts=3, backoff=0.001, max_backoff=0.01, deadline=1)}
+    ):
+        assert await k8s_client.create_pod(namespace="default", spec={}) is pod
+
+    labels = {"instance_id": "unknown", "operation": "create"}
+    assert k8s_client.retry.retries.labels(**labels)._value.get() == 2
+    assert k8s_client.retry.retry_pauses.labels(**labels)._value.get() >= 0.05
+
+
+async def test_stop_retries_at_deadline(run_test_server):
+    app, server = await run_test_server()
+    k8s_client = app[consts.SESSION_USE_CASE_KEY].k8s_service.k8s_client
+
+    k8s_client.v1_client.read_namespaced_pod = mock.AsyncMock(side_effect=api_exception(429, {"Retry-After": "10"}))
+
+    with pytest.raises(ApiException):
+        await k8s_client.get_pod(namespace="default", name="browser-xtc9s")
+
+    # the pause from Retry-After ends after the deadline
+    k8s_client.v1_client.read_namespaced_pod.assert_called_once()
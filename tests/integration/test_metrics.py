@@ -1,8 +1,13 @@
 from __future__ import annotations
 
 from textwrap import dedent
+from unittest import mock
 
 from aiohttp import web
+from prometheus_client import CollectorRegistry
+
+from callisto.libs.domains import consts
+from callisto.libs.services.k8s.prober import K8sApiProber
 
 
 async def test_metrics(run_test_server, aiohttp_test_client):
@@ -10,9 +15,34 @@ async def test_metrics(run_test_server, aiohttp_test_client):
     client = aiohttp_test_client(server)
     expected = dedent(
         """
-        # HELP callisto_k8s_api_available Availability of K8s api
-        # TYPE callisto_k8s_api_available gauge
-        callisto_k8s_api_available{instance_id="unknown"} 0.0
+        # HELP callisto_k8s_rate_limiter_wait Time kube-api calls waited for the client-side rate limiter
+        # TYPE callisto_k8s_rate_limiter_wait histogram
+        # HELP callisto_k8s_retries_total Retried kube-api calls
+        # TYPE callisto_k8s_retries_total counter
+        # HELP callisto_k8s_retry_pauses_seconds_total Time spent in pauses between kube-api call retries
+        # TYPE callisto_k8s_retry_pauses_seconds_total counter
+        # HELP callisto_pod_deletion_queue_depth Pods waiting for deletion
+        # TYPE callisto_pod_deletion_queue_depth gauge
+        # HELP callisto_pod_deletion_flush_duration Duration of pod deletion batches
+        # TYPE callisto_pod_deletion_flush_duration histogram
+        # HELP callisto_pod_readiness_failures_total Pods which failed to become Ready
+        # TYPE callisto_pod_readiness_failures_total counter
+        # HELP callisto_pod_readiness_registry_size Pods waited for readiness
+        # TYPE callisto_pod_readiness_registry_size gauge
+        # HELP callisto_pod_readiness_registry_evictions_total Readiness waits evicted from the registry
+        # TYPE callisto_pod_readiness_registry_evictions_total counter
+        # HELP callisto_pod_startup_phase_duration_seconds Duration of pod startup phases derived from pod conditions and container states
+        # TYPE callisto_pod_startup_phase_duration_seconds histogram
+        # HELP callisto_node_pod_startup_latency_seconds Decayed mean time from pod scheduling to readiness on a node
+        # TYPE callisto_node_pod_startup_latency_seconds gauge
+        # HELP callisto_node_pod_failure_ratio Decayed share of pods on a node which failed to become Ready
+        # TYPE callisto_node_pod_failure_ratio gauge
+        # HELP callisto_avoided_nodes Nodes avoided by the node anti-affinity of new pods
+        # TYPE callisto_avoided_nodes gauge
+        # HELP callisto_image_locality_placements_total Ready pods by placement relative to the nodes holding their images
+        # TYPE callisto_image_locality_placements_total counter
+        # HELP callisto_image_locality_pod_ready_duration_seconds Time from pod creation to readiness by placement relative to the nodes holding the images
+        # TYPE callisto_image_locality_pod_ready_duration_seconds histogram
         # HELP callisto_inprocessing_sessions Sessions now in progress
         # TYPE callisto_inprocessing_sessions gauge
         callisto_inprocessing_sessions{instance_id="unknown",stage="active"} 0.0
@@ -24,6 +54,51 @@ async def test_metrics(run_test_server, aiohttp_test_client):
         # TYPE callisto_sessions_duration histogram
         # HELP callisto_stage_steps_duration Steps duration
         # TYPE callisto_stage_steps_duration histogram
+        # HELP callisto_sessions_recovery_duration_seconds Duration of the session state recovery from pod annotations at startup
+        # TYPE callisto_sessions_recovery_duration_seconds gauge
+        # HELP callisto_k8s_api_available Availability of K8s api
+        # TYPE callisto_k8s_api_available gauge
+        callisto_k8s_api_available{instance_id="unknown"} 1.0
+        # HELP callisto_k8s_api_probe_duration_seconds Duration of kube-api availability probes
+        # TYPE callisto_k8s_api_probe_duration_seconds histogram
+        # HELP callisto_webdriver_requests_in_progress WebDriver requests now in progress
+        # TYPE callisto_webdriver_requests_in_progress gauge
+        # HELP callisto_webdriver_connections_total Connections acquired from the WebDriver connection pool
+        # TYPE callisto_webdriver_connections_total counter
+        # HELP callisto_webdriver_connections_queued_total Connection acquisitions which waited for the connection pool limit
+        # TYPE callisto_webdriver_connections_queued_total counter
+        # HELP callisto_image_prepull_nodes Nodes which should hold, which hold and which fail to pull the images of the configured pod manifest
+        # TYPE callisto_image_prepull_nodes gauge
+        # HELP callisto_image_prepull_switched Whether sessions use the configured pod manifest or still the previous one
+        # TYPE callisto_image_prepull_switched gauge
+        # HELP callisto_pool_pods Browser pods in the warm pool
+        # TYPE callisto_pool_pods gauge
+        # HELP callisto_pod_hedges_total Hedge pods launched because the first pod was not Ready in time
+        # TYPE callisto_pod_hedges_total counter
+        # HELP callisto_pod_hedges_skipped_total Hedge pods not launched because too many hedge pods were launched at once
+        # TYPE callisto_pod_hedges_skipped_total counter
+        # HELP callisto_pod_hedge_wins_total Sessions served by a hedge pod
+        # TYPE callisto_pod_hedge_wins_total counter
+        # HELP callisto_pod_hedge_wasted_seconds_total Lifetime of pods which lost the readiness race
+        # TYPE callisto_pod_hedge_wasted_seconds_total counter
+        # HELP callisto_recycled_pods Idle recycled browser pods waiting for a session
+        # TYPE callisto_recycled_pods gauge
+        # HELP callisto_pod_recycle_claims_total Session pod claims from the recycled pods
+        # TYPE callisto_pod_recycle_claims_total counter
+        # HELP callisto_pod_recycle_hit_ratio Share of session pod claims served by recycled pods
+        # TYPE callisto_pod_recycle_hit_ratio gauge
+        # HELP callisto_pod_recycle_saved_seconds_total Estimated pod startup time saved by recycled pods
+        # TYPE callisto_pod_recycle_saved_seconds_total counter
+        # HELP callisto_pod_gc_reclaimed_pods_total Browser pods deleted by the garbage collector
+        # TYPE callisto_pod_gc_reclaimed_pods_total counter
+        # HELP callisto_pod_gc_reclaimed_cpu_cores_total CPU requests of browser pods deleted by the garbage collector
+        # TYPE callisto_pod_gc_reclaimed_cpu_cores_total counter
+        # HELP callisto_pod_gc_reclaimed_memory_bytes_total Memory requests of browser pods deleted by the garbage collector
+        # TYPE callisto_pod_gc_reclaimed_memory_bytes_total counter
+        # HELP callisto_replica_requests_total Requests to other callisto replicas
+        # TYPE callisto_replica_requests_total counter
+        # HELP callisto_reaped_sessions_total Idle sessions deleted by the reaper
+        # TYPE callisto_reaped_sessions_total counter
     """
     ).lstrip()
 
@@ -32,3 +107,62 @@ async def test_metrics(run_test_server, aiohttp_test_client):
 
     assert resp.status == web.HTTPOk.status_code
     assert text == expected
+
+
+async def test_metrics_are_cached_and_negotiated(run_test_server, aiohttp_test_client):
+    app, server = await run_test_server()
+    client = aiohttp_test_client(server)
+    state_service = app[consts.METRICS_USE_CASE_KEY].state_service
+
+    resp = await client.get("/metrics", headers={"Accept": "application/openmetrics-text; version=1.0.0"})
+    text = await resp.text()
+
+    assert resp.headers["Content-Type"].startswith("application/openmetrics-text")
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert text.endswith("# EOF\n")
+
+    with mock.patch.object(state_service, "collect_metrics") as collect_metrics:
+        resp = await client.get("/metrics", headers={"Accept": "application/openmetrics-text; version=1.0.0"})
+
+        assert await resp.text() == text
+        collect_metrics.assert_not_called()
+
+
+async def test_k8s_api_prober(run_test_server):
+    app, server = await run_test_server()
+    k8s_service = app[consts.SESSION_USE_CASE_KEY].k8s_service
+    k8s_service.k8s_client.get_api_versions = mock.AsyncMock()
+    prober = K8sApiProber(
+        k8s_service=k8s_service,
+        task_runner_service=mock.Mock(),
+        interval=1,
+        metrics_registry=CollectorRegistry(),
+        instance_id="unknown",
+    )
+
+    assert await prober.probe()
+    assert prober.k8s_api_available.labels(instance_id="unknown")._value.get() == 1
+
+    k8s_service.k8s_client.get_api_versions = mock.AsyncMock(side_effect=ConnectionError())
+
+    assert not await prober.probe()
+    assert prober.k8s_api_available.labels(instance_id="unknown")._value.get() == 0
+
+
+async def test_k8s_api_availability_without_probes(run_test_server):
+    app, server = await run_test_server()
+    k8s_service = app[consts.SESSION_USE_CASE_KEY].k8s_service
+    metrics_registry = CollectorRegistry()
+    K8sApiProber(
+        k8s_service=k8s_service,
+        task_runner_service=mock.Mock(),
+        interval=0,
+        metrics_registry=metrics_registry,
+        instance_id="unknown",
+    )
+
+    assert metrics_registry.get_sample_value("callisto_k8s_api_available", {"instance_id": "unknown"}) == 1
+
+    k8s_service.k8s_client.circuit_breaker._open()
+
+    assert metrics_registry.get_sample_value("callisto_k8s_api_available", {"instance_id": "unknown"}) == 0
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import dataclasses as dc
+from unittest import mock
+
+from prometheus_client import CollectorRegistry
+
+from callisto.libs.domains import consts
+from callisto.libs.domains.config import NodeAvoidanceConfig
+from callisto.libs.services.k8s.node_stats import NodeStats
+
+
+def _node_stats() -> NodeStats:
+    config = NodeAvoidanceConfig(
+        enabled=True, half_life=1800, min_samples=5, latency_factor=2, max_failure_ratio=0.5, max_nodes=3
+    )
+    return NodeStats(config=config, metrics_registry=CollectorRegistry(), instance_id="unknown")
+
+
+@mock.patch("callisto.libs.services.k8s.node_stats.time.monotonic", return_value=1000)
+async def test_slow_and_failing_nodes_are_avoided(_):
+    node_stats = _node_stats()
+    for _ in range(5):
+        node_stats.record("node-1", 10)
+        node_stats.record("node-2", 12)
+        node_stats.record("node-3", 11)
+        node_stats.record("slow-node", 60)
+        node_stats.record("failing-node", None)
+    # too few observations to judge
+    node_stats.record("new-node", None)
+
+    assert node_stats.get_avoided_nodes() == ["failing-node", "slow-node"]
+
+
+async def test_avoided_nodes_are_forgiven():
+    node_stats = _node_stats()
+    with mock.patch("callisto.libs.services.k8s.node_stats.time.monotonic", return_value=1000):
+        for _ in range(5):
+            node_stats.record("node-1", 10)
+            node_stats.record("node-2", 10)
+            node_stats.record("slow-node", 60)
+        assert node_stats.get_avoided_nodes() == ["slow-node"]
+
+    # the weight of the observations halves after the half-life
+    with mock.patch("callisto.libs.services.k8s.node_stats.time.monotonic", return_value=1000 + 1800):
+        assert node_stats.get_avoided_nodes() == []
+        assert node_stats.nodes["slow-node"].samples == 2.5
+
+
+async def test_pod_spec_avoids_nodes(run_test_server):
+    app, _ = await run_test_server()
+    k8s_service = app[consts.SESSION_QUERY_USE_CASE_KEY].k8s_service
+    spec = {"spec": {"containers": []}}
+
+    k8s_service.node_stats.avoided_nodes = ["slow-node"]
+    k8s_service.node_stats.refreshed_at = float("inf")
+    assert "affinity" not in k8s_service.label_pod_spec(spec)["spec"]
+
+    k8s_service.node_avoidance_config = dc.replace(k8s_service.node_avoidance_config, enabled=True)
+    assert k8s_service.label_pod_spec(spec)["spec"]["affinity"] == {
+        "nodeAffinity": {
+            "preferredDuringSchedulingIgnoredDuringExecution": [
+                {
+                    "weight": 100,
+                    "preference": {
+                        "matchExpressions": [
+                            {"key": "kubernetes.io/hostname", "operator": "NotIn", "values": ["slow-node"]}
+                        ]
+                    },
+                }
+            ]
+        }
+    }
+    # the manifest is not changed
+    assert "affinity" not in spec["spec"]
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from asyncio import CancelledError
+from unittest import mock
+
+import pytest
+
+from callisto.libs.domains import consts
+from callisto.libs.exceptions import K8sWatchExpired
+
+
+def make_ready(pod):
+    pod.status.conditions[0].status = "True"
+    return pod
+
+
+async def test_get_pod_from_cache(run_test_server, k8s_pod):
+    app, server = await run_test_server()
+    k8s_service = app[consts.SESSION_USE_CASE_KEY].k8s_service
+
+    k8s_service.k8s_client.get_pod = mock.AsyncMock()
+    k8s_service.pod_cache.set(k8s_pod())
+
+    pod = await k8s_service.get_pod("browser-xtc9s")
+
+    assert pod.metadata.name == "browser-xtc9s"
+    k8s_service.k8s_client.get_pod.assert_not_called()
+
+
+async def test_wait_until_cached_pod_is_ready(run_test_server, k8s_pod):
+    app, server = await run_test_server()
+    k8s_service = app[consts.SESSION_USE_CASE_KEY].k8s_service
+
+    k8s_service.pod_cache.set(make_ready(k8s_pod()))
+
+    await k8s_service.wait_until_pod_is_ready("browser-xtc9s")
+
+    assert len(k8s_service.readiness_registry) == 0
+
+
+async def test_relist_on_expired_watch(run_test_server, k8s_pod):
+    app, server = await run_test_server()
+    k8s_service = app[consts.SESSION_USE_CASE_KEY].k8s_service
+    watch_calls = []
+
+    async def watch_pod_events(namespace, resource_version, **selectors):
+        watch_calls.append(resource_version)
+        if len(watch_calls) == 1:
+            raise K8sWatchExpired()
+        yield "MODIFIED", make_ready(k8s_pod("browser-new")), "3"
+        raise CancelledError()
+
+    k8s_service.k8s_client.list_pods = mock.AsyncMock(
+        side_effect=[
+            mock.Mock(items=[k8s_pod()], metadata=mock.Mock(resource_version="1")),
+            mock.Mock(items=[], metadata=mock.Mock(resource_version="2")),
+        ]
+    )
+    k8s_service.k8s_client.watch_pod_events = watch_pod_events
+
+    with pytest.raises(CancelledError):
+        await k8s_service.watch_pods()
+
+    assert watch_calls == ["1", "2"]
+    assert k8s_service.k8s_client.list_pods.call_count == 2
+    assert [pod.metadata.name for pod in k8s_service.pod_cache.list()] == ["browser-new"]
+    assert k8s_service.pod_cache.resource_version == "3"
+    # nobody waits for the pod
+    assert len(k8s_service.readiness_registry) == 0
+
+
+async def test_create_labelled_pod(run_test_server, k8s_pod):
+    app, server = await run_test_server()
+    k8s_service = app[consts.SESSION_USE_CASE_KEY].k8s_service
+    manifest = {"metadata": {"generateName": "browser-", "labels": {"team": "qa"}}}
+
+    k8s_service.k8s_client.create_pod = mock.AsyncMock(return_value=k8s_pod())
+
+    await k8s_service.create_pod(spec=manifest)
+
+    spec = k8s_service.k8s_client.create_pod.call_args.kwargs["spec"]
+    assert len(spec["metadata"]["labels"].pop("callisto/pod-id")) == 32
+    assert spec["metadata"]["labels"] == {
+        "team": "qa",
+        "app.kubernetes.io/managed-by": "callisto",
+        "callisto/instance-id": "unknown",
+        "callisto/manifest-hash": k8s_service.get_manifest_hash(manifest),
+    }
+    # the shared manifest is not modified
+    assert manifest == {"metadata": {"generateName": "browser-", "labels": {"team": "qa"}}}
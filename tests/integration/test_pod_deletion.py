@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import asyncio
+from unittest import mock
+
+import pytest
+
+from callisto.libs.domains import consts
+from callisto.libs.exceptions import K8sPodNotFound
+
+
+def make_labelled(pod, pod_id: str):
+    pod.metadata.labels = {"callisto/pod-id": pod_id}
+    return pod
+
+
+async def test_coalesce_pod_deletions(run_test_server, k8s_pod):
+    app, server = await run_test_server()
+    k8s_service = app[consts.SESSION_USE_CASE_KEY].k8s_service
+
+    k8s_service.pod_cache.set(make_labelled(k8s_pod("browser-1"), "id1"))
+    k8s_service.pod_cache.set(make_labelled(k8s_pod("browser-2"), "id2"))
+    k8s_service.k8s_client.delete_pods = mock.AsyncMock()
+    k8s_service.k8s_client.delete_pod = mock.AsyncMock()
+
+    await asyncio.gather(
+        k8s_service.delete_pod("browser-1"),
+        k8s_service.delete_pod("browser-2"),
+        # a repeated deletion waits for the queued one
+        k8s_service.delete_pod("browser-1"),
+    )
+
+    k8s_service.k8s_client.delete_pods.assert_called_once_with(
+        namespace="default", label_selector="callisto/pod-id in (id1,id2)", grace_period_seconds=None
+    )
+    k8s_service.k8s_client.delete_pod.assert_not_called()
+    assert k8s_service.deletion_queue.pending == {}
+
+
+async def test_delete_unknown_pod_one_by_one(run_test_server):
+    app, server = await run_test_server()
+    k8s_service = app[consts.SESSION_USE_CASE_KEY].k8s_service
+
+    k8s_service.k8s_client.delete_pods = mock.AsyncMock()
+    k8s_service.k8s_client.delete_pod = mock.AsyncMock(side_effect=K8sPodNotFound())
+
+    with pytest.raises(K8sPodNotFound):
+        await k8s_service.delete_pod("browser-unknown")
+
+    k8s_service.k8s_client.delete_pod.assert_called_once_with(
+        namespace="default", name="browser-unknown", grace_period_seconds=None
+    )
+    k8s_service.k8s_client.delete_pods.assert_not_called()
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import dataclasses as dc
+from unittest import mock
+
+from kubernetes_asyncio.client import V1ResourceRequirements
+from prometheus_client import CollectorRegistry
+
+from callisto.libs.domains import consts
+from callisto.libs.services.k8s.service import K8sService
+from callisto.libs.services.pod_gc import PodGarbageCollector
+
+
+def _make_collector(uc, gc_config) -> PodGarbageCollector:
+    return PodGarbageCollector(
+        k8s_service=uc.k8s_service,
+        state_service=uc.state_service,
+        pod_pool_service=uc.pod_pool_service,
+        pod_recycle_service=uc.pod_recycle_service,
+        task_runner_service=uc.task_runner_service,
+        gc_config=gc_config,
+        metrics_registry=CollectorRegistry(),
+        instance_id="unknown",
+    )
+
+
+def _own(pod, instance_id: str = "unknown"):
+    pod.metadata.labels = {K8sService.INSTANCE_ID_LABEL: instance_id}
+    pod.spec.containers[0].resources = V1ResourceRequirements(requests={"cpu": "500m", "memory": "1Gi"})
+    return pod
+
+
+async def test_collect_orphaned_pods(run_test_server, k8s_pod, get_config):
+    app, server = await run_test_server()
+    uc = app[consts.SESSION_USE_CASE_KEY]
+    collector = _make_collector(uc, get_config.pod_gc_config)
+
+    pending_pod = _own(k8s_pod("browser-pending"))
+    pending_pod.status.phase = "Pending"
+    uc.k8s_service.pod_cache.replace(
+        [
+            _own(k8s_pod("browser-orphaned")),
+            _own(k8s_pod("browser-session")),
+            _own(k8s_pod("browser-other"), instance_id="other"),
+            pending_pod,
+        ],
+        resource_version="1",
+    )
+    uc.state_service.sessions["browser-session"] = mock.Mock()
+    uc.k8s_service.delete_pod = mock.AsyncMock()
+
+    assert await collector.collect() == {"browser-orphaned": "orphaned", "browser-pending": "stuck_pending"}
+
+    assert uc.k8s_service.delete_pod.call_count == 2
+    labels = {"instance_id": "unknown", "reason": "orphaned", "dry_run": False}
+    assert collector.reclaimed_pods.labels(**labels)._value.get() == 1
+    assert collector.reclaimed_cpu.labels(**labels)._value.get() == 0.5
+    assert collector.reclaimed_memory.labels(**labels)._value.get() == 2**30
+
+
+async def test_dry_run_collects_nothing(run_test_server, k8s_pod, get_config):
+    app, server = await run_test_server()
+    uc = app[consts.SESSION_USE_CASE_KEY]
+    collector = _make_collector(
+        uc, dc.replace(get_config.pod_gc_config, dry_run=True, max_session_age=60, max_deletions=1)
+    )
+
+    uc.k8s_service.pod_cache.replace(
+        [_own(k8s_pod("browser-session")), _own(k8s_pod("browser-orphaned"))], resource_version="1"
+    )
+    uc.state_service.sessions["browser-session"] = mock.Mock()
+    uc.k8s_service.delete_pod = mock.AsyncMock()
+
+    assert await collector.collect() == {"browser-session": "max_session_age"}
+
+    uc.k8s_service.delete_pod.assert_not_called()
+    assert "browser-session" in uc.state_service.sessions
+    assert (
+        collector.reclaimed_pods.labels(instance_id="unknown", reason="max_session_age", dry_run=True)._value.get() == 1
+    )
+
+
+async def test_skip_pods_of_sessions_in_creation(run_test_server, k8s_pod, get_config, session_created_response):
+    app, server = await run_test_server()
+    uc = app[consts.SESSION_USE_CASE_KEY]
+    collector = _make_collector(uc, get_config.pod_gc_config)
+    pod = _own(k8s_pod())
+
+    uc.k8s_service.pod_cache.replace([pod], resource_version="1")
+    uc.k8s_service.create_pod = mock.AsyncMock(return_value=pod)
+    uc.k8s_service.wait_until_pod_is_ready = mock.AsyncMock()
+    uc.k8s_service.get_pod = mock.AsyncMock(return_value=pod)
+    uc.k8s_service.delete_pod = mock.AsyncMock()
+
+    # the pod is Ready and older than the grace period, the session is not created yet
+    async def wait_until_ready(**_):
+        assert await collector.collect() == {}
+        return 1
+
+    uc.webdriver_service.wait_until_ready = wait_until_ready
+    uc.webdriver_service.create_session = mock.AsyncMock(return_value=session_created_response)
+
+    await uc.create_session({"desiredCapabilities": {"browserName": "chrome"}})
+
+    uc.k8s_service.delete_pod.assert_not_called()
+    assert "browser-xtc9s" in uc.state_service.sessions
+    assert not uc.state_service.starting_pods
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import asyncio
+from unittest import mock
+
+from aiohttp import web
+
+from callisto.libs.domains import consts
+from callisto.libs.domains.config import PodHedgeConfig
+from callisto.libs.exceptions import K8sPodNotReady
+
+
+async def test_hedge_pod_serves_session(run_test_server, aiohttp_test_client, k8s_pod, session_created_response):
+    app, server = await run_test_server()
+    client = aiohttp_test_client(server)
+    webdriver_request = {"desiredCapabilities": {"browserName": "chrome"}}
+    uc = app[consts.SESSION_USE_CASE_KEY]
+
+    async def wait_until_pod_is_ready(pod_name):
+        if pod_name == "browser-slow":
+            await asyncio.sleep(10)
+
+    uc.pod_hedge_service.hedge_config = PodHedgeConfig(enabled=True, percentile=95, min_delay=0.01, max_ratio=0.1)
+    uc.pod_hedge_service.ready_durations.extend([0.01] * uc.pod_hedge_service.MIN_SAMPLES)
+    uc.k8s_service.create_pod = mock.AsyncMock(side_effect=[k8s_pod("browser-slow"), k8s_pod("browser-hedge")])
+    uc.k8s_service.wait_until_pod_is_ready = wait_until_pod_is_ready
+    uc.k8s_service.get_pod = mock.AsyncMock(side_effect=k8s_pod)
+    uc.k8s_service.delete_pod = mock.AsyncMock()
+    uc.webdriver_service.wait_until_ready = mock.AsyncMock(return_value=1)
+    uc.webdriver_service.create_session = mock.AsyncMock(return_value=session_created_response)
+
+    resp = await client.post("/api/v1/session", json=webdriver_request)
+
+    assert resp.status == web.HTTPOk.status_code
+    assert list(uc.state_service.sessions) == ["browser-hedge"]
+    uc.k8s_service.delete_pod.assert_called_once_with(name="browser-slow")
+    assert uc.pod_hedge_service.hedges_fired.labels(instance_id="unknown")._value.get() == 1
+    assert uc.pod_hedge_service.hedges_won.labels(instance_id="unknown")._value.get() == 1
+    assert uc.pod_hedge_service.wasted_pod_seconds.labels(instance_id="unknown")._value.get() > 0
+    # the wait of the request counts from the first pod
+    assert uc.pod_hedge_service.ready_durations[-1] >= 0.01
+    assert uc.pod_hedge_service.active_hedges == 0
+
+
+async def test_hedge_budget(run_test_server, aiohttp_test_client, k8s_pod, session_created_response):
+    app, server = await run_test_server()
+    client = aiohttp_test_client(server)
+    webdriver_request = {"desiredCapabilities": {"browserName": "chrome"}}
+    uc = app[consts.SESSION_USE_CASE_KEY]
+
+    async def wait_until_pod_is_ready(pod_name):
+        await asyncio.sleep(0.05)
+
+    uc.pod_hedge_service.hedge_config = PodHedgeConfig(enabled=True, percentile=95, min_delay=0.01, max_ratio=0.1)
+    uc.pod_hedge_service.ready_durations.extend([0.01] * uc.pod_hedge_service.MIN_SAMPLES)
+    # another request already has a hedge pod
+    uc.pod_hedge_service.active_hedges = 1
+    uc.k8s_service.create_pod = mock.AsyncMock(return_value=k8s_pod())
+    uc.k8s_service.wait_until_pod_is_ready = wait_until_pod_is_ready
+    uc.k8s_service.get_pod = mock.AsyncMock(return_value=k8s_pod())
+    uc.webdriver_service.wait_until_ready = mock.AsyncMock(return_value=1)
+    uc.webdriver_service.create_session = mock.AsyncMock(return_value=session_created_response)
+
+    resp = await client.post("/api/v1/session", json=webdriver_request)
+
+    assert resp.status == web.HTTPOk.status_code
+    uc.k8s_service.create_pod.assert_called_once()
+    assert uc.pod_hedge_service.hedges_fired.labels(instance_id="unknown")._value.get() == 0
+    assert uc.pod_hedge_service.hedges_skipped.labels(instance_id="unknown")._value.get() == 1
+    assert uc.pod_hedge_service.waiting_pods == 0
+
+
+async def test_no_hedge_without_enough_samples(run_test_server, aiohttp_test_client, k8s_pod, session_created_response):
+    app, server = await run_test_server()
+    client = aiohttp_test_client(server)
+    webdriver_request = {"desiredCapabilities": {"browserName": "chrome"}}
+    uc = app[consts.SESSION_USE_CASE_KEY]
+
+    uc.pod_hedge_service.hedge_config = PodHedgeConfig(enabled=True, percentile=95, min_delay=0.01, max_ratio=0.1)
+    uc.k8s_service.create_pod = mock.AsyncMock(return_value=k8s_pod())
+    uc.k8s_service.wait_until_pod_is_ready = mock.AsyncMock()
+    uc.k8s_service.get_pod = mock.AsyncMock(return_value=k8s_pod())
+    uc.webdriver_service.wait_until_ready = mock.AsyncMock(return_value=1)
+    uc.webdriver_service.create_session = mock.AsyncMock(return_value=session_created_response)
+
+    resp = await client.post("/api/v1/session", json=webdriver_request)
+
+    assert resp.status == web.HTTPOk.status_code
+    uc.k8s_service.create_pod.assert_called_once()
+    assert len(uc.pod_hedge_service.ready_durations) == 1
+
+
+async def test_failed_wait_is_observed_as_slow(run_test_server, aiohttp_test_client, k8s_pod):
+    app, server = await run_test_server()
+    client = aiohttp_test_client(server)
+    webdriver_request = {"desiredCapabilities": {"browserName": "chrome"}}
+    uc = app[consts.SESSION_USE_CASE_KEY]
+
+    uc.pod_hedge_service.hedge_config = PodHedgeConfig(enabled=True, percentile=95, min_delay=0.01, max_ratio=0.1)
+    uc.k8s_service.create_pod = mock.AsyncMock(return_value=k8s_pod())
+    uc.k8s_service.wait_until_pod_is_ready = mock.AsyncMock(side_effect=K8sPodNotReady("browser-xtc9s", "Evicted"))
+    uc.k8s_service.delete_pod = mock.AsyncMock()
+
+    resp = await client.post("/api/v1/session", json=webdriver_request)
+
+    assert resp.status == web.HTTPInternalServerError.status_code
+    assert list(uc.pod_hedge_service.ready_durations) == [uc.k8s_service.readiness_config.timeout]
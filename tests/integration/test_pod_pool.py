@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from unittest import mock
+
+from aiohttp import web
+
+from callisto.libs.domains import consts
+from callisto.libs.domains.config import PodPoolConfig
+
+
+async def test_create_session_with_pool_pod(run_test_server, aiohttp_test_client, k8s_pod, session_created_response):
+    app, server = await run_test_server()
+    client = aiohttp_test_client(server)
+    webdriver_request = {"desiredCapabilities": {"browserName": "chrome"}}
+    uc = app[consts.SESSION_USE_CASE_KEY]
+
+    uc.pod_pool_service.pool_config = PodPoolConfig(target_size=1, max_size=1, refill_concurrency=1)
+    uc.pod_pool_service.idle.append(k8s_pod("browser-pool1"))
+    uc.k8s_service.create_pod = mock.AsyncMock(return_value=k8s_pod("browser-pool2"))
+    uc.k8s_service.wait_until_pod_is_ready = mock.AsyncMock()
+    uc.k8s_service.get_pod = mock.AsyncMock(return_value=k8s_pod("browser-pool2"))
+    uc.webdriver_service.wait_until_ready = mock.AsyncMock(return_value=1)
+    uc.webdriver_service.create_session = mock.AsyncMock(return_value=session_created_response)
+
+    resp = await client.post("/api/v1/session", json=webdriver_request)
+
+    assert resp.status == web.HTTPOk.status_code
+    assert "browser-pool1" in uc.state_service.sessions
+    assert uc.pod_pool_service.claimed == {"browser-pool1"}
+    # the pool is refilled after the claim
+    uc.k8s_service.create_pod.assert_called_once()
+    assert [uc.k8s_service.get_pod_name(pod) for pod in uc.pod_pool_service.idle] == ["browser-pool2"]
+
+
+async def test_create_session_on_empty_pool(run_test_server, aiohttp_test_client, k8s_pod, session_created_response):
+    app, server = await run_test_server()
+    client = aiohttp_test_client(server)
+    webdriver_request = {"desiredCapabilities": {"browserName": "chrome"}}
+    uc = app[consts.SESSION_USE_CASE_KEY]
+
+    uc.pod_pool_service.pool_config = PodPoolConfig(target_size=1, max_size=2, refill_concurrency=1)
+    uc.pod_pool_service.size = 1
+    uc.k8s_service.create_pod = mock.AsyncMock(side_effect=[k8s_pod(f"browser-pod{i}") for i in range(3)])
+    uc.k8s_service.wait_until_pod_is_ready = mock.AsyncMock()
+    uc.k8s_service.get_pod = mock.AsyncMock(side_effect=k8s_pod)
+    uc.webdriver_service.wait_until_ready = mock.AsyncMock(return_value=1)
+    uc.webdriver_service.create_session = mock.AsyncMock(return_value=session_created_response)
+
+    resp = await client.post("/api/v1/session", json=webdriver_request)
+
+    assert resp.status == web.HTTPOk.status_code
+    # a miss grows the pool up to its max size
+    assert uc.pod_pool_service.size == 2
+    assert len(uc.pod_pool_service.idle) == 2
+    assert "browser-pod2" in uc.state_service.sessions
+
+
+async def test_release_pool_pod_on_session_deletion(run_test_server, aiohttp_test_client):
+    app, server = await run_test_server()
+    client = aiohttp_test_client(server)
+    pod_name = "browser-pool1"
+    uc = app[consts.SESSION_USE_CASE_KEY]
+
+    uc.pod_pool_service.claimed.add(pod_name)
+    uc.k8s_service.delete_pod = mock.AsyncMock()
+
+    resp = await client.delete(f"/api/v1/session/{pod_name}")
+
+    assert resp.status == web.HTTPOk.status_code
+    assert uc.pod_pool_service.claimed == set()
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import asyncio
+import dataclasses as dc
+from datetime import (
+    datetime,
+    timedelta,
+    timezone,
+)
+from unittest import mock
+
+import pytest
+from aiohttp import web
+from kubernetes_asyncio.client import (
+    V1ContainerState,
+    V1ContainerStateWaiting,
+    V1PodCondition,
+)
+
+from callisto.libs.domains import consts
+from callisto.libs.exceptions import K8sPodNotReady
+
+
+def make_waiting(pod, reason: str):
+    pod.status.container_statuses[0].state = V1ContainerState(
+        waiting=V1ContainerStateWaiting(reason=reason, message="Back-off pulling image")
+    )
+    return pod
+
+
+async def test_fail_waiter_on_image_pull_back_off(run_test_server, k8s_pod):
+    app, server = await run_test_server()
+    k8s_service = app[consts.SESSION_USE_CASE_KEY].k8s_service
+
+    waiter = asyncio.ensure_future(k8s_service.wait_until_pod_is_ready("browser-xtc9s"))
+    await asyncio.sleep(0)
+    k8s_service._handle_pod_event("MODIFIED", make_waiting(k8s_pod(), "ContainerCreating"))
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    k8s_service._handle_pod_event("MODIFIED", make_waiting(k8s_pod(), "ImagePullBackOff"))
+
+    with pytest.raises(K8sPodNotReady) as e:
+        await waiter
+
+    assert e.value.reason == "ImagePullBackOff"
+    assert len(k8s_service.readiness_registry) == 0
+    assert k8s_service.readiness_failures.labels(instance_id="unknown", reason="ImagePullBackOff")._value.get() == 1
+    # image errors are not the fault of the node
+    assert not k8s_service.node_stats.nodes
+
+
+async def test_crash_loop_fails_node(run_test_server, k8s_pod):
+    app, server = await run_test_server()
+    k8s_service = app[consts.SESSION_USE_CASE_KEY].k8s_service
+
+    waiter = asyncio.ensure_future(k8s_service.wait_until_pod_is_ready("browser-xtc9s"))
+    await asyncio.sleep(0)
+    k8s_service._handle_pod_event("MODIFIED", make_waiting(k8s_pod(), "CrashLoopBackOff"))
+
+    with pytest.raises(K8sPodNotReady):
+        await waiter
+
+    assert k8s_service.node_stats.nodes["gke-farm-9f6d8393-7qp2"].failures == 1
+
+
+async def test_fail_waiter_after_readiness_timeout(run_test_server, k8s_pod):
+    app, server = await run_test_server()
+    k8s_service = app[consts.SESSION_USE_CASE_KEY].k8s_service
+    k8s_service.readiness_config = dc.replace(k8s_service.readiness_config, timeout=0.01)
+
+    k8s_service.pod_cache.set(k8s_pod())
+
+    with pytest.raises(K8sPodNotReady) as e:
+        await k8s_service.wait_until_pod_is_ready("browser-xtc9s")
+
+    assert e.value.reason == k8s_service.READINESS_TIMEOUT_REASON
+    assert len(k8s_service.readiness_registry) == 0
+
+
+async def test_delete_pod_of_failed_session_request(run_test_server, aiohttp_test_client, k8s_pod):
+    app, server = await run_test_server()
+    client = aiohttp_test_client(server)
+    k8s_service = app[consts.SESSION_USE_CASE_KEY].k8s_service
+
+    k8s_service.create_pod = mock.AsyncMock(return_value=k8s_pod())
+    k8s_service.delete_pod = mock.AsyncMock()
+    k8s_service.pod_cache.set(make_waiting(k8s_pod(), "CrashLoopBackOff"))
+
+    resp = await client.post("/api/v1/session", json={"desiredCapabilities": {"browserName": "chrome"}})
+
+    assert resp.status == web.HTTPInternalServerError.status_code
+    assert "CrashLoopBackOff" in await resp.text()
+    k8s_service.delete_pod.assert_called_once_with(name="browser-xtc9s")
+
+
+def make_unschedulable(pod, age: float):
+    pod.metadata.creation_timestamp = datetime.now(timezone.utc) - timedelta(seconds=age)
+    pod.spec.node_name = None
+    pod.status.conditions = [
+        V1PodCondition(type="PodScheduled", status="False", reason="Unschedulable", message="0/3 nodes are available")
+    ]
+    return pod
+
+
+async def test_fail_waiter_on_unschedulable_pod_after_min_age(run_test_server, k8s_pod):
+    app, server = await run_test_server()
+    k8s_service = app[consts.SESSION_USE_CASE_KEY].k8s_service
+
+    waiter = asyncio.ensure_future(k8s_service.wait_until_pod_is_ready("browser-xtc9s"))
+    await asyncio.sleep(0)
+    # the cluster autoscaler may be adding a node, the pod gets no other event before it is old enough
+    k8s_service._handle_pod_event("MODIFIED", make_unschedulable(k8s_pod(), age=119.95))
+    await asyncio.sleep(0)
+    assert not waiter.done()
+    # scheduler events of the pod don't add rechecks
+    k8s_service._handle_pod_event("MODIFIED", make_unschedulable(k8s_pod(), age=119.95))
+    assert len(k8s_service.unschedulable_rechecks) == 1
+
+    with pytest.raises(K8sPodNotReady) as e:
+        await asyncio.wait_for(waiter, 1)
+
+    assert e.value.reason == "Unschedulable"
+    assert len(k8s_service.readiness_registry) == 0
+    assert not k8s_service.unschedulable_rechecks
+
+
+async def test_cancel_unschedulable_recheck_on_pod_deletion(run_test_server, k8s_pod):
+    app, server = await run_test_server()
+    k8s_service = app[consts.SESSION_USE_CASE_KEY].k8s_service
+
+    waiter = asyncio.ensure_future(k8s_service.wait_until_pod_is_ready("browser-xtc9s"))
+    await asyncio.sleep(0)
+    k8s_service._handle_pod_event("MODIFIED", make_unschedulable(k8s_pod(), age=0))
+    handle = k8s_service.unschedulable_rechecks["browser-xtc9s"]
+
+    k8s_service._handle_pod_event("DELETED", k8s_pod())
+
+    with pytest.raises(K8sPodNotReady) as e:
+        await waiter
+
+    assert e.value.reason == k8s_service.DELETED_REASON
+    assert handle.cancelled()
+    assert not k8s_service.unschedulable_rechecks
+
+
+async def test_fail_waiter_on_pod_deletion(run_test_server, k8s_pod):
+    app, server = await run_test_server()
+    k8s_service = app[consts.SESSION_USE_CASE_KEY].k8s_service
+
+    waiter = asyncio.ensure_future(k8s_service.wait_until_pod_is_ready("browser-xtc9s"))
+    await asyncio.sleep(0)
+    k8s_service._handle_pod_event("DELETED", k8s_pod())
+
+    with pytest.raises(K8sPodNotReady) as e:
+        await waiter
+
+    assert e.value.reason == k8s_service.DELETED_REASON
+    assert len(k8s_service.readiness_registry) == 0
+
+
+async def test_evict_oldest_readiness_wait(run_test_server):
+    app, server = await run_test_server()
+    k8s_service = app[consts.SESSION_USE_CASE_KEY].k8s_service
+    registry = k8s_service.readiness_registry
+
+    with mock.patch.object(registry, "MAX_SIZE", 2):
+        waiters = [asyncio.ensure_future(k8s_service.wait_until_pod_is_ready(f"browser-{i}")) for i in range(3)]
+        await asyncio.sleep(0)
+
+        with pytest.raises(K8sPodNotReady) as e:
+            await waiters[0]
+
+        assert e.value.reason == registry.EVICTED_REASON
+        assert registry.pod_names() == ["browser-1", "browser-2"]
+        assert registry.evictions.labels(instance_id="unknown", reason="size")._value.get() == 1
+
+        registry.set_ready("browser-1")
+        registry.set_ready("browser-2")
+        await asyncio.gather(*waiters[1:])
+
+    assert len(registry) == 0
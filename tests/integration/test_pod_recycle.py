@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import copy
+from unittest import mock
+
+from aiohttp import web
+
+from callisto.libs.domains import consts
+from callisto.libs.domains.config import PodRecycleConfig
+from callisto.libs.services.k8s.service import K8sService
+
+
+def _recycle(uc, k8s_pod, max_reuses: int = 10):
+    pod = k8s_pod()
+    pod.metadata.labels = {K8sService.MANIFEST_HASH_LABEL: uc.k8s_service.get_manifest_hash(uc.pod_config.manifest)}
+
+    # the fixture pod is years old
+    uc.pod_recycle_service.recycle_config = PodRecycleConfig(enabled=True, max_reuses=max_reuses, max_age=10**10)
+    uc.k8s_service.create_pod = mock.AsyncMock(return_value=pod)
+    uc.k8s_service.wait_until_pod_is_ready = mock.AsyncMock()
+    uc.k8s_service.get_pod = mock.AsyncMock(return_value=pod)
+    uc.k8s_service.delete_pod = mock.AsyncMock()
+    uc.webdriver_service.wait_until_ready = mock.AsyncMock(return_value=1)
+    uc.webdriver_service.delete_session = mock.AsyncMock(return_value={"value": None})
+    uc.k8s_service.annotate_pod = mock.AsyncMock()
+
+
+async def test_reuse_recycled_pod(run_test_server, aiohttp_test_client, k8s_pod, session_created_response):
+    app, server = await run_test_server()
+    client = aiohttp_test_client(server)
+    webdriver_request = {"desiredCapabilities": {"browserName": "chrome"}}
+    uc = app[consts.SESSION_USE_CASE_KEY]
+    _recycle(uc, k8s_pod)
+    uc.webdriver_service.create_session = mock.AsyncMock(
+        side_effect=lambda **_: copy.deepcopy(session_created_response)
+    )
+
+    resp = await client.post("/api/v1/session", json=webdriver_request)
+    assert resp.status == web.HTTPOk.status_code
+    resp = await client.delete("/api/v1/session/browser-xtc9s")
+    assert resp.status == web.HTTPOk.status_code
+
+    uc.webdriver_service.delete_session.assert_called_once_with(
+        pod_ip="10.11.56.142", session_id="6cf5098bc390d2add8868e6ff1abad68"
+    )
+    uc.k8s_service.delete_pod.assert_not_called()
+    assert uc.pod_recycle_service.recycled_pods.labels(instance_id="unknown")._value.get() == 1
+    # the session annotations are removed before the pod is recycled
+    assert all(value is None for value in uc.k8s_service.annotate_pod.call_args.kwargs["annotations"].values())
+    assert uc.pod_recycle_service.has_pod("browser-xtc9s")
+
+    resp = await client.post("/api/v1/session", json=webdriver_request)
+
+    assert resp.status == web.HTTPOk.status_code
+    uc.k8s_service.create_pod.assert_called_once()
+    assert uc.pod_recycle_service.reuses == {"browser-xtc9s": 1}
+    assert "browser-xtc9s" in uc.state_service.sessions
+
+
+async def test_delete_pod_after_max_reuses(run_test_server, aiohttp_test_client, k8s_pod, session_created_response):
+    app, server = await run_test_server()
+    client = aiohttp_test_client(server)
+    webdriver_request = {"desiredCapabilities": {"browserName": "chrome"}}
+    uc = app[consts.SESSION_USE_CASE_KEY]
+    _recycle(uc, k8s_pod, max_reuses=0)
+    uc.webdriver_service.create_session = mock.AsyncMock(return_value=session_created_response)
+
+    await client.post("/api/v1/session", json=webdriver_request)
+    resp = await client.delete("/api/v1/session/browser-xtc9s")
+
+    assert resp.status == web.HTTPOk.status_code
+    uc.webdriver_service.delete_session.assert_not_called()
+    uc.k8s_service.delete_pod.assert_called_once_with(name="browser-xtc9s")
+    assert len(uc.state_service.sessions) == 0
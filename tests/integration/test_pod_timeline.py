@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from unittest import mock
+
+from aiohttp import web
+from kubernetes_asyncio.client import (
+    V1Node,
+    V1ObjectMeta,
+    V1PodCondition,
+)
+
+from callisto.libs.domains import consts
+from callisto.libs.domains.state import SessionState
+from callisto.libs.services.k8s.timeline import PodTimeline
+
+
+def _started_pod(k8s_pod):
+    pod = k8s_pod()
+    pod.status.conditions = [
+        V1PodCondition(
+            type=condition_type,
+            status="True",
+            last_transition_time=datetime(2019, 12, 23, 13, 4, second, tzinfo=timezone.utc),
+        )
+        for condition_type, second in (
+            ("PodScheduled", 40),
+            ("Initialized", 41),
+            ("ContainersReady", 58),
+            ("Ready", 58),
+        )
+    ]
+    return pod
+
+
+async def test_pod_timeline(k8s_pod):
+    timeline = PodTimeline.from_pod(_started_pod(k8s_pod))
+
+    assert timeline.get_durations() == {
+        "scheduling": 1,
+        "initializing": 1,
+        "starting_containers": 15,
+        "readiness_probe": 2,
+        "readiness_gates": 0,
+    }
+    assert PodTimeline.from_pod(k8s_pod()).get_durations()["readiness_probe"] is None
+
+
+async def test_session_timeline(run_test_server, aiohttp_test_client, k8s_pod):
+    app, server = await run_test_server()
+    client = aiohttp_test_client(server)
+    uc = app[consts.SESSION_QUERY_USE_CASE_KEY]
+    k8s_service = uc.k8s_service
+
+    pod = _started_pod(k8s_pod)
+    k8s_service.pod_cache.set(pod)
+    k8s_service.k8s_client.v1_client.read_node = mock.AsyncMock(
+        return_value=V1Node(metadata=V1ObjectMeta(labels={"cloud.google.com/gke-nodepool": "farm"}))
+    )
+    uc.state_service.sessions.add(
+        "browser-xtc9s",
+        SessionState(
+            patched_session_id="browser-xtc9s-10.11.56.142-1",
+            browser_name="chrome",
+            test_name="test",
+            browser_version="77.0",
+            vnc_enabled=False,
+            screen_resolution="1920x1080x24",
+            timezone="UTC",
+            node_name="gke-farm-9f6d8393-7qp2",
+            created_at=datetime(2019, 12, 23, 13, 5, 1, tzinfo=timezone.utc).timestamp(),
+        ),
+    )
+
+    resp = await client.get("/api/v1/sessions/browser-xtc9s/timeline")
+    data = await resp.json()
+
+    assert resp.status == web.HTTPOk.status_code
+    assert data["node_pool"] == "farm"
+    assert data["phases"]["starting_containers"] == 15
+    assert data["phases"]["starting_session"] == 3
+
+    await k8s_service.record_pod_timeline("browser-xtc9s")
+
+    histogram = k8s_service.startup_phase_duration.labels(
+        instance_id="unknown", phase="starting_containers", node_pool="farm"
+    )
+    assert histogram._sum.get() == 15
+    # the node is judged from scheduling to readiness
+    assert k8s_service.node_stats.nodes["gke-farm-9f6d8393-7qp2"].latency == 18
+    # the node pool is read once per node
+    k8s_service.k8s_client.v1_client.read_node.assert_called_once()
+
+    resp = await client.get("/api/v1/sessions/browser-unknown/timeline")
+    assert resp.status == web.HTTPNotFound.status_code
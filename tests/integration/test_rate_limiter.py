@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import asyncio
+
+from prometheus_client import CollectorRegistry
+
+from callisto.libs.domains.config import K8sRateLimitConfig, RateLimit
+from callisto.libs.services.k8s.rate_limiter import (
+    K8sRateLimiter,
+    Lane,
+    TokenBucket,
+)
+
+
+async def test_serve_user_lane_first():
+    bucket = TokenBucket(qps=100, burst=1)
+    served = []
+
+    async def acquire(name: str, lane: Lane) -> None:
+        await bucket.acquire(lane)
+        served.append(name)
+
+    await acquire("first", Lane.BACKGROUND)
+    await asyncio.gather(acquire("background", Lane.BACKGROUND), acquire("user", Lane.USER))
+
+    assert served == ["first", "user", "background"]
+
+
+async def test_limit_per_verb():
+    registry = CollectorRegistry()
+    rate_limiter = K8sRateLimiter(
+        config=K8sRateLimitConfig(total=RateLimit(qps=0, burst=1), verbs={"create": RateLimit(qps=20, burst=1)}),
+        metrics_registry=registry,
+        instance_id="unknown",
+    )
+
+    await asyncio.wait_for(asyncio.gather(*[rate_limiter.acquire("get", Lane.USER) for _ in range(100)]), 1)
+    await rate_limiter.acquire("create", Lane.USER)
+    await rate_limiter.acquire("create", Lane.USER)
+
+    labels = {"instance_id": "unknown", "verb": "create", "lane": "user"}
+    # the second create waited for a token
+    assert registry.get_sample_value("callisto_k8s_rate_limiter_wait_sum", labels) >= 0.04
+    assert registry.get_sample_value("callisto_k8s_rate_limiter_wait_count", {**labels, "verb": "get"}) is None
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from unittest import mock
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from callisto.libs.domains import consts
+from callisto.libs.domains.config import ReplicaConfig
+from callisto.libs.services.k8s.service import K8sService
+
+
+PEER_STATUS = {
+    "total": 1,
+    "used": 1,
+    "queued": 0,
+    "pending": 0,
+    "browsers": {"": {"": {"browsers": {"count": 1, "sessions": [{"id": "peer-session"}]}}}},
+}
+
+
+@pytest.fixture
+async def peer_server():
+    """Another callisto replica recording the requests"""
+    requests = []
+
+    async def status_handler(request: web.Request) -> web.Response:
+        requests.append(("status", dict(request.query)))
+        return web.json_response(data=PEER_STATUS)
+
+    async def delete_session_handler(request: web.Request) -> web.Response:
+        requests.append(("delete_session", request.match_info["pod_name"]))
+        return web.json_response(data={"value": None})
+
+    app = web.Application()
+    app.router.add_get("/api/v1/status", status_handler)
+    app.router.add_delete("/api/v1/session/{pod_name}", delete_session_handler)
+
+    server = TestServer(app)
+    await server.start_server()
+    server.requests = requests
+
+    yield server
+
+    await server.close()
+
+
+def _set_peer(replica_service, peer_server):
+    replica_service.config = ReplicaConfig(
+        peers=("unknown", "peer"), peer_url_template=str(peer_server.make_url("")), timeout=5
+    )
+    replica_service.peers = ["peer"]
+
+
+async def test_forward_delete_session_to_owner(run_test_server, aiohttp_test_client, k8s_pod, peer_server):
+    app, server = await run_test_server()
+    client = aiohttp_test_client(server)
+    uc = app[consts.SESSION_USE_CASE_KEY]
+    _set_peer(uc.replica_service, peer_server)
+
+    pod = k8s_pod()
+    pod.metadata.labels = {K8sService.INSTANCE_ID_LABEL: "peer"}
+    uc.k8s_service.k8s_client.v1_client.read_namespaced_pod = mock.AsyncMock(return_value=pod)
+    uc.k8s_service.delete_pod = mock.AsyncMock()
+
+    resp = await client.delete("/api/v1/session/browser-xtc9s")
+
+    assert resp.status == web.HTTPOk.status_code
+    assert peer_server.requests == [("delete_session", "browser-xtc9s")]
+    uc.k8s_service.delete_pod.assert_not_called()
+
+
+async def test_delete_own_session_locally(run_test_server, aiohttp_test_client, k8s_pod, peer_server):
+    app, server = await run_test_server()
+    client = aiohttp_test_client(server)
+    uc = app[consts.SESSION_USE_CASE_KEY]
+    _set_peer(uc.replica_service, peer_server)
+
+    pod = k8s_pod()
+    pod.metadata.labels = {K8sService.INSTANCE_ID_LABEL: "unknown"}
+    uc.k8s_service.k8s_client.v1_client.read_namespaced_pod = mock.AsyncMock(return_value=pod)
+    uc.k8s_service.delete_pod = mock.AsyncMock()
+
+    resp = await client.delete("/api/v1/session/browser-xtc9s")
+
+    assert resp.status == web.HTTPOk.status_code
+    assert peer_server.requests == []
+    uc.k8s_service.delete_pod.assert_called_once_with(name="browser-xtc9s")
+
+
+async def test_aggregate_status(run_test_server, aiohttp_test_client, peer_server):
+    app, server = await run_test_server()
+    client = aiohttp_test_client(server)
+    _set_peer(app[consts.SESSION_USE_CASE_KEY].replica_service, peer_server)
+
+    resp = await client.get("/api/v1/status")
+    data = await resp.json()
+
+    assert resp.status == web.HTTPOk.status_code
+    assert data["total"] == 1
+    assert data["browsers"][""][""]["browsers"]["sessions"] == [{"id": "peer-session"}]
+    assert peer_server.requests == [("status", {"local": "true"})]
+
+    resp = await client.get("/api/v1/status", params={"local": "true"})
+    data = await resp.json()
+
+    assert data["total"] == 0
+    assert len(peer_server.requests) == 1
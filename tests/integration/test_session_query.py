@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from aiohttp import web
+
+from callisto.libs.domains import consts
+from callisto.libs.domains.state import SessionState
+
+
+def _add_session(state_service, pod_name: str, browser_name: str, test_name: str, created_at: float) -> None:
+    state_service.sessions.add(
+        pod_name,
+        SessionState(
+            patched_session_id=f"{pod_name}-10.11.56.142-1",
+            browser_name=browser_name,
+            test_name=test_name,
+            browser_version="120.0",
+            vnc_enabled=False,
+            screen_resolution="1920x1080x24",
+            timezone="UTC",
+            node_name="node-1",
+            created_at=created_at,
+        ),
+    )
+
+
+async def test_filter_and_paginate_sessions(run_test_server, aiohttp_test_client):
+    app, server = await run_test_server()
+    client = aiohttp_test_client(server)
+    state_service = app[consts.SESSION_QUERY_USE_CASE_KEY].state_service
+    _add_session(state_service, "browser-c", "chrome", "test-a", created_at=3)
+    _add_session(state_service, "browser-a", "chrome", "test-a", created_at=1)
+    _add_session(state_service, "browser-b", "firefox", "test-a", created_at=2)
+    _add_session(state_service, "browser-d", "chrome", "test-b", created_at=4)
+
+    resp = await client.get("/api/v1/sessions", params={"browser": "chrome", "test": "test-a", "limit": "1"})
+    data = await resp.json()
+
+    assert resp.status == web.HTTPOk.status_code
+    assert [session["pod_name"] for session in data["sessions"]] == ["browser-a"]
+    assert data["sessions"][0]["node_name"] == "node-1"
+
+    resp = await client.get(
+        "/api/v1/sessions", params={"browser": "chrome", "test": "test-a", "limit": "1", "cursor": data["next_cursor"]}
+    )
+    data = await resp.json()
+
+    assert [session["pod_name"] for session in data["sessions"]] == ["browser-c"]
+    assert data["next_cursor"] is None
+
+    state_service.remove_session("browser-a")
+    resp = await client.get("/api/v1/sessions")
+    data = await resp.json()
+
+    assert [session["pod_name"] for session in data["sessions"]] == ["browser-b", "browser-c", "browser-d"]
+    assert "browser-a" not in state_service.sessions.indexes["browser_name"]["chrome"]
+
+
+async def test_invalid_sessions_query(run_test_server, aiohttp_test_client):
+    app, server = await run_test_server()
+    client = aiohttp_test_client(server)
+
+    resp = await client.get("/api/v1/sessions", params={"limit": "0"})
+    assert resp.status == web.HTTPInternalServerError.status_code
+
+    resp = await client.get("/api/v1/sessions", params={"cursor": "not-a-cursor"})
+    assert resp.status == web.HTTPInternalServerError.status_code
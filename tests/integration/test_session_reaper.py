@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import dataclasses as dc
+from unittest import mock
+
+from prometheus_client import CollectorRegistry
+
+from callisto.libs.domains import consts
+from callisto.libs.exceptions import WebDriverException
+from callisto.libs.use_cases.session_reaper import SessionReaperUseCase
+
+
+def _make_reaper(uc, reaper_config) -> SessionReaperUseCase:
+    return SessionReaperUseCase(
+        session_use_case=uc,
+        k8s_service=uc.k8s_service,
+        webdriver_service=uc.webdriver_service,
+        state_service=uc.state_service,
+        task_runner_service=uc.task_runner_service,
+        reaper_config=reaper_config,
+        metrics_registry=CollectorRegistry(),
+        instance_id="unknown",
+    )
+
+
+async def test_reap_idle_session(run_test_server, aiohttp_test_client, k8s_pod, session_created_response, get_config):
+    app, server = await run_test_server()
+    client = aiohttp_test_client(server)
+    uc = app[consts.SESSION_USE_CASE_KEY]
+    reaper = _make_reaper(uc, dc.replace(get_config.session_reaper_config, idle_timeout=0.05))
+
+    uc.k8s_service.create_pod = mock.AsyncMock(return_value=k8s_pod())
+    uc.k8s_service.wait_until_pod_is_ready = mock.AsyncMock()
+    uc.k8s_service.get_pod = mock.AsyncMock(return_value=k8s_pod())
+    uc.k8s_service.delete_pod = mock.AsyncMock()
+    uc.webdriver_service.wait_until_ready = mock.AsyncMock(return_value=1)
+    uc.webdriver_service.create_session = mock.AsyncMock(return_value=session_created_response)
+    await client.post("/api/v1/session", json={"desiredCapabilities": {"browserName": "chrome", "name": "test"}})
+
+    uc.webdriver_service.get_session_activity = mock.AsyncMock(return_value=("https://example.com", "Example"))
+    assert await reaper.reap() == []
+
+    uc.webdriver_service.get_session_activity.assert_called_once_with(
+        pod_ip="10.11.56.142", session_id="6cf5098bc390d2add8868e6ff1abad68"
+    )
+
+    reaper.activities["browser-xtc9s"].active_at -= 1
+    assert await reaper.reap() == ["browser-xtc9s"]
+
+    uc.k8s_service.delete_pod.assert_called_once_with(name="browser-xtc9s")
+    assert len(uc.state_service.sessions) == 0
+    assert reaper.reaped_sessions.labels(instance_id="unknown", browser="chrome")._value.get() == 1
+
+
+async def test_keep_active_session(run_test_server, k8s_pod, get_config):
+    app, server = await run_test_server()
+    uc = app[consts.SESSION_USE_CASE_KEY]
+    reaper = _make_reaper(uc, dc.replace(get_config.session_reaper_config, idle_timeout=0.05))
+
+    uc.state_service.sessions["browser-xtc9s"] = mock.Mock(patched_session_id="browser-xtc9s-10.11.56.142-1")
+    uc.k8s_service.get_pod = mock.AsyncMock(return_value=k8s_pod())
+    uc.delete_session = mock.AsyncMock()
+    uc.webdriver_service.get_session_activity = mock.AsyncMock(
+        side_effect=[("https://example.com", "Example"), ("https://example.com/2", "Example"), WebDriverException()]
+    )
+
+    await reaper.reap()
+    reaper.activities["browser-xtc9s"].active_at -= 1
+    # the test has opened another page
+    assert await reaper.reap() == []
+
+    reaper.activities["browser-xtc9s"].active_at -= 1
+    # the session is gone
+    assert await reaper.reap() == ["browser-xtc9s"]
+    uc.delete_session.assert_called_once_with(pod_name="browser-xtc9s")
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from unittest import mock
+
+from aiohttp import web
+
+from callisto.libs.domains import consts
+
+
+async def test_annotate_session_pod(run_test_server, aiohttp_test_client, k8s_pod, session_created_response):
+    app, server = await run_test_server()
+    client = aiohttp_test_client(server)
+    uc = app[consts.SESSION_USE_CASE_KEY]
+
+    uc.k8s_service.create_pod = mock.AsyncMock(return_value=k8s_pod())
+    uc.k8s_service.wait_until_pod_is_ready = mock.AsyncMock()
+    uc.k8s_service.get_pod = mock.AsyncMock(return_value=k8s_pod())
+    uc.k8s_service.k8s_client.v1_client.patch_namespaced_pod = mock.AsyncMock()
+    uc.webdriver_service.wait_until_ready = mock.AsyncMock(return_value=1)
+    uc.webdriver_service.create_session = mock.AsyncMock(return_value=session_created_response)
+
+    resp = await client.post("/api/v1/session", json={"desiredCapabilities": {"browserName": "chrome", "name": "test"}})
+
+    assert resp.status == web.HTTPOk.status_code
+    uc.k8s_service.k8s_client.v1_client.patch_namespaced_pod.assert_called_once_with(
+        namespace="default",
+        name="browser-xtc9s",
+        body={
+            "metadata": {
+                "annotations": {
+                    "callisto/session-id": (await resp.json())["sessionId"],
+                    "callisto/browser-name": "chrome",
+                    "callisto/browser-version": "79.0.3945.88",
+                    "callisto/test-name": "test",
+                    "callisto/session-created-at": mock.ANY,
+                }
+            }
+        },
+    )
+
+
+async def test_restore_sessions_from_annotations(run_test_server, k8s_pod):
+    app, server = await run_test_server()
+    state_service = app[consts.SESSION_USE_CASE_KEY].state_service
+
+    session_pod = k8s_pod("browser-session")
+    session_pod.metadata.annotations = {
+        "callisto/session-id": "browser-session-10.11.56.142-1",
+        "callisto/browser-name": "chrome",
+        "callisto/browser-version": "77.0",
+        "callisto/test-name": "test",
+        "callisto/session-created-at": "1700000000.5",
+    }
+    state_service.k8s_service.list_instance_pods = mock.AsyncMock(return_value=[session_pod, k8s_pod("browser-idle")])
+
+    assert await state_service.restore_sessions() == 1
+
+    session = state_service.sessions["browser-session"]
+    assert session.patched_session_id == "browser-session-10.11.56.142-1"
+    assert session.browser_name == "chrome"
+    assert session.test_name == "test"
+    assert session.timezone == "UTC"
+    assert session.created_at == 1700000000.5
+    assert state_service.sessions.query(filters={"browser_name": "chrome"}, limit=10)[0] == [
+        ("browser-session", session)
+    ]
+    assert state_service.recovery_duration.labels(instance_id="unknown")._value.get() > 0
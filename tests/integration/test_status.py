@@ -2,6 +2,9 @@ from __future__ import annotations
 
 from aiohttp import web
 
+from callisto.libs.domains import consts
+from callisto.libs.services.status_document import StatusDocument
+
 
 async def test_status_on_start(run_test_server, aiohttp_test_client):
     app, server = await run_test_server()
@@ -11,3 +14,39 @@ async def test_status_on_start(run_test_server, aiohttp_test_client):
     data = await resp.json()
 
     assert resp.status == web.HTTPOk.status_code and len(data.keys()) > 0
+
+
+async def test_status_is_updated_on_session_changes(
+    run_test_server, aiohttp_test_client, k8s_pod, session_created_response
+):
+    app, server = await run_test_server()
+    client = aiohttp_test_client(server)
+    state_service = app[consts.STATUS_USE_CASE_KEY].state_service
+
+    resp = await client.get("/api/v1/status")
+    etag = resp.headers["ETag"]
+
+    assert resp.headers["Content-Encoding"] == "gzip"
+    resp = await client.get("/api/v1/status", headers={"If-None-Match": etag})
+    assert resp.status == web.HTTPNotModified.status_code
+
+    state_service.add_session(
+        pod=k8s_pod(),
+        session_request={"desiredCapabilities": {"browserName": "chrome", "name": "test"}},
+        patched_session_response=session_created_response,
+    )
+    resp = await client.get("/api/v1/status", headers={"If-None-Match": etag})
+    data = await resp.json()
+
+    assert resp.status == web.HTTPOk.status_code
+    assert resp.headers["ETag"] != etag
+    assert data["total"] == data["used"] == 1
+    assert data["browsers"][""][""]["browsers"]["sessions"] == [
+        StatusDocument.get_session_dict(state_service.sessions["browser-xtc9s"])
+    ]
+
+    state_service.remove_session("browser-xtc9s")
+    resp = await client.get("/api/v1/status")
+    data = await resp.json()
+
+    assert data["total"] == 0 and data["browsers"][""][""]["browsers"]["sessions"] == []
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import pytest
+from aiohttp import hdrs, web
+from aiohttp.test_utils import TestServer
+
+from callisto.libs.domains import consts
+from callisto.libs.exceptions import WebDriverException
+
+
+async def test_webdriver_connections_are_reused(run_test_server, session_created_response):
+    app, server = await run_test_server()
+    client = app[consts.SESSION_USE_CASE_KEY].webdriver_service.client
+
+    async def create_session(request: web.Request) -> web.Response:
+        return web.json_response(session_created_response)
+
+    webdriver_app = web.Application()
+    webdriver_app.router.add_post("/session", create_session)
+    webdriver = TestServer(webdriver_app)
+    await webdriver.start_server()
+
+    try:
+        for _ in range(3):
+            response = await client.request(url=str(webdriver.make_url("/session")), method=hdrs.METH_POST, json={})
+            assert response == session_created_response
+    finally:
+        await webdriver.close()
+
+    assert client.connections.labels(instance_id="unknown", reused=False)._value.get() == 1
+    assert client.connections.labels(instance_id="unknown", reused=True)._value.get() == 2
+
+
+async def test_wait_until_webdriver_is_ready(run_test_server):
+    app, server = await run_test_server()
+    webdriver_service = app[consts.SESSION_USE_CASE_KEY].webdriver_service
+    statuses = [web.HTTPServiceUnavailable.status_code, web.HTTPOk.status_code, web.HTTPOk.status_code]
+
+    async def status(request: web.Request) -> web.Response:
+        ready = len(statuses) == 1
+        return web.json_response({"value": {"ready": ready}}, status=statuses.pop(0))
+
+    webdriver_app = web.Application()
+    webdriver_app.router.add_get("/status", status)
+    webdriver = TestServer(webdriver_app)
+    await webdriver.start_server()
+    webdriver_service.webdriver_port = webdriver.port
+
+    try:
+        attempts = await webdriver_service.wait_until_ready(pod_ip=webdriver.host)
+    finally:
+        await webdriver.close()
+
+    assert attempts == 3
+
+
+async def test_webdriver_is_not_ready_until_deadline(run_test_server):
+    app, server = await run_test_server()
+    webdriver_service = app[consts.SESSION_USE_CASE_KEY].webdriver_service
+    webdriver_service.ready_timeout = 0.3
+
+    async def status(request: web.Request) -> web.Response:
+        return web.json_response({"value": {"ready": False}})
+
+    webdriver_app = web.Application()
+    webdriver_app.router.add_get("/status", status)
+    webdriver = TestServer(webdriver_app)
+    await webdriver.start_server()
+    webdriver_service.webdriver_port = webdriver.port
+
+    try:
+        with pytest.raises(WebDriverException):
+            await webdriver_service.wait_until_ready(pod_ip=webdriver.host)
+    finally:
+        await webdriver.close()